@@ -0,0 +1 @@
+"""Offline benchmarks for the Custom Conversation integration."""
@@ -0,0 +1,144 @@
+"""Fixtures for the Custom Conversation benchmarks.
+
+The benchmarks talk to a local fake LLM server, so they need no API keys
+and no network access beyond the loopback interface.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_socket import enable_socket, socket_allow_hosts
+
+from custom_components.custom_conversation.const import (
+    CONF_AGENTS_SECTION,
+    CONF_ENABLE_HASS_AGENT,
+    CONF_ENABLE_LANGFUSE,
+    CONF_ENABLE_LLM_AGENT,
+    CONF_LANGFUSE_SECTION,
+    CONF_LANGFUSE_TRACING_ENABLED,
+    CONF_PRIMARY_API_KEY,
+    CONF_PRIMARY_BASE_URL,
+    CONF_PRIMARY_CHAT_MODEL,
+    CONF_PRIMARY_PROVIDER,
+    CONFIG_VERSION,
+    DOMAIN,
+    LLM_API_ID,
+)
+from homeassistant.components import switch
+from homeassistant.const import CONF_LLM_HASS_API
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from .fake_llm import FakeLLMServer
+from .large_home import HomeSpec, async_populate_home, generate_home
+from .report import LatencyReport
+
+REPORT_PATH = Path(__file__).parent.parent / "bench_output.txt"
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_setup():
+    """Allow connections to the local fake LLM server."""
+    enable_socket()
+    socket_allow_hosts(["localhost", "127.0.0.1", "::1"], allow_unix_socket=True)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations for benchmarking."""
+    return
+
+
+LATENCY_REPORT = pytest.StashKey[LatencyReport]()
+
+
+@pytest.fixture(scope="session")
+def latency_report(pytestconfig: pytest.Config):
+    """Collect latencies for the whole session and write them out at the end."""
+    report = pytestconfig.stash[LATENCY_REPORT] = LatencyReport()
+    yield report
+    if report.samples or report.summaries:
+        report.write(REPORT_PATH)
+
+
+def pytest_terminal_summary(
+    terminalreporter: pytest.TerminalReporter, config: pytest.Config
+) -> None:
+    """Show the latency report after the test results."""
+    report = config.stash.get(LATENCY_REPORT, None)
+    if report is None or not (report.samples or report.summaries):
+        return
+    terminalreporter.section("latency report")
+    terminalreporter.write_line(report.render())
+    terminalreporter.write_line(f"Written to {REPORT_PATH}")
+
+
+@pytest.fixture
+async def fake_llm():
+    """Run a fake LLM server for the duration of a benchmark."""
+    server = FakeLLMServer(speed=float(os.getenv("BENCH_REPLAY_SPEED", "1")))
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def bench_entry(hass: HomeAssistant, fake_llm: FakeLLMServer):
+    """Set up the integration against the fake LLM server and yield the entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=CONFIG_VERSION,
+        title="Benchmark",
+        data={
+            CONF_PRIMARY_PROVIDER: "openai",
+            CONF_PRIMARY_BASE_URL: fake_llm.base_url,
+            CONF_PRIMARY_API_KEY: "bench",
+            CONF_PRIMARY_CHAT_MODEL: "bench-model",
+        },
+        options={
+            CONF_LLM_HASS_API: LLM_API_ID,
+            CONF_AGENTS_SECTION: {
+                CONF_ENABLE_HASS_AGENT: True,
+                CONF_ENABLE_LLM_AGENT: True,
+            },
+            CONF_LANGFUSE_SECTION: {
+                CONF_ENABLE_LANGFUSE: False,
+                CONF_LANGFUSE_TRACING_ENABLED: False,
+            },
+        },
+        entry_id="benchmark_entry",
+    )
+    entry.add_to_hass(hass)
+
+    assert await async_setup_component(hass, "homeassistant", {})
+    assert await async_setup_component(hass, "conversation", {})
+    assert await async_setup_component(hass, switch.DOMAIN, {})
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    hass.states.async_set(
+        "switch.kitchen", "off", {"friendly_name": "Kitchen Switch"}
+    )
+    hass.states.async_set("switch.porch", "off", {"friendly_name": "Porch Switch"})
+    await hass.async_block_till_done()
+
+    yield entry
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+
+@pytest.fixture
+def large_home(hass: HomeAssistant):
+    """Return a function that fills hass with a generated home of a given size."""
+
+    async def _async_populate(spec: HomeSpec) -> dict:
+        home = generate_home(spec)
+        await async_populate_home(hass, home)
+        return home
+
+    return _async_populate
@@ -0,0 +1,232 @@
+"""A local OpenAI compatible chat completions server with scripted streams.
+
+Each scripted response is a list of ``(delay, chunk)`` pairs: the server
+sleeps for ``delay`` seconds, then sends ``chunk`` as one server-sent event.
+Responses are served in the order they were queued; once the queue is empty
+every request gets the responder's answer, or the default response. Streams are stored on disk as JSON
+lines of ``{"delay": ..., "chunk": ...}``, the same format the integration
+writes when recording provider streams.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+import json
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+type ScriptedStream = list[tuple[float, dict[str, Any]]]
+
+
+def make_chunk(
+    delta: dict[str, Any], finish_reason: str | None = None
+) -> dict[str, Any]:
+    """Return an OpenAI chat.completion.chunk with a single choice."""
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "bench-model",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def text_response(
+    text: str, *, ttft: float = 0.05, chunk_delay: float = 0.005
+) -> ScriptedStream:
+    """Script a plain text answer streamed one word per chunk."""
+    words = text.split(" ")
+    stream: ScriptedStream = [(ttft, make_chunk({"role": "assistant", "content": ""}))]
+    stream.extend(
+        (chunk_delay, make_chunk({"content": word if i == 0 else f" {word}"}))
+        for i, word in enumerate(words)
+    )
+    stream.append((0, make_chunk({}, "stop")))
+    return stream
+
+
+def tool_call_response(
+    calls: list[tuple[str, dict[str, Any]]],
+    *,
+    ttft: float = 0.05,
+    chunk_delay: float = 0.005,
+    fragment_size: int = 8,
+) -> ScriptedStream:
+    """Script tool calls whose arguments arrive in small fragments."""
+    stream: ScriptedStream = [(ttft, make_chunk({"role": "assistant", "content": None}))]
+    for index, (name, args) in enumerate(calls):
+        stream.append(
+            (
+                chunk_delay,
+                make_chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "id": f"call_{index}",
+                                "type": "function",
+                                "function": {"name": name, "arguments": ""},
+                            }
+                        ]
+                    }
+                ),
+            )
+        )
+        arguments = json.dumps(args)
+        stream.extend(
+            (
+                chunk_delay,
+                make_chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "function": {
+                                    "arguments": arguments[i : i + fragment_size]
+                                },
+                            }
+                        ]
+                    }
+                ),
+            )
+            for i in range(0, len(arguments), fragment_size)
+        )
+    stream.append((0, make_chunk({}, "tool_calls")))
+    return stream
+
+
+def load_stream(path: Path) -> ScriptedStream:
+    """Load a stream saved with save_stream."""
+    with path.open(encoding="utf-8") as file:
+        return [
+            (record["delay"], record["chunk"])
+            for line in file
+            if line.strip() and (record := json.loads(line))
+        ]
+
+
+def save_stream(path: Path, stream: ScriptedStream) -> None:
+    """Save a stream as JSON lines."""
+    with path.open("w", encoding="utf-8") as file:
+        for delay, chunk in stream:
+            file.write(json.dumps({"delay": round(delay, 6), "chunk": chunk}) + "\n")
+
+
+class FakeLLMServer:
+    """Serve scripted streams on /v1/chat/completions."""
+
+    def __init__(
+        self,
+        default: ScriptedStream | None = None,
+        speed: float = 1.0,
+        responder: Callable[[dict[str, Any]], ScriptedStream] | None = None,
+        prefill_per_1k_tokens: float = 0.0,
+    ) -> None:
+        """Initialize the server.
+
+        Delays are divided by speed, so 2 replays a stream twice as fast.
+        The responder, if any, picks a response from the request body, which
+        keeps answers matched to requests when many run at once. With
+        prefill_per_1k_tokens, the first chunk is also held back for that many
+        seconds per thousand prompt tokens, like a provider reading the prompt.
+        """
+        self.default = default or text_response("OK")
+        self.speed = speed
+        self.responder = responder
+        self.prefill_per_1k_tokens = prefill_per_1k_tokens
+        self.responses: deque[ScriptedStream] = deque()
+        self.requests: list[dict[str, Any]] = []
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    def queue(self, *responses: ScriptedStream) -> None:
+        """Queue responses for the next requests."""
+        self.responses.extend(responses)
+
+    async def start(self) -> str:
+        """Start listening on a free local port and return the base URL."""
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._handle_chat)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_chat(self, request: web.Request) -> web.StreamResponse:
+        """Answer a chat completion request with the next scripted stream."""
+        body = await request.json()
+        self.requests.append(body)
+        if self.responses:
+            script = self.responses.popleft()
+        elif self.responder is not None:
+            script = self.responder(body)
+        else:
+            script = self.default
+
+        if not body.get("stream"):
+            await asyncio.sleep(sum(delay for delay, _ in script) / self.speed)
+            return web.json_response(_as_completion(script))
+
+        if self.prefill_per_1k_tokens:
+            prompt_tokens = len(json.dumps(body["messages"])) // 4
+            await asyncio.sleep(
+                prompt_tokens / 1000 * self.prefill_per_1k_tokens / self.speed
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for delay, chunk in script:
+            if delay:
+                await asyncio.sleep(delay / self.speed)
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if body.get("stream_options", {}).get("include_usage"):
+            usage = {
+                **make_chunk({}),
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": len(json.dumps(body["messages"])) // 4,
+                    "completion_tokens": len(script),
+                    "total_tokens": len(json.dumps(body["messages"])) // 4
+                    + len(script),
+                },
+            }
+            await response.write(f"data: {json.dumps(usage)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def _as_completion(script: ScriptedStream) -> dict[str, Any]:
+    """Collapse a scripted text stream into a non-streaming completion."""
+    content = "".join(
+        choice["delta"].get("content") or ""
+        for _, chunk in script
+        for choice in chunk.get("choices", [])
+    )
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "bench-model",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
@@ -0,0 +1,394 @@
+"""Generate a synthetic large home for scaling benchmarks.
+
+A home is generated from a seed as plain JSON-serializable data, so the same
+home can be rebuilt on any machine and saved alongside benchmark results.
+`async_populate_home` then loads it into a test Home Assistant instance:
+floors, areas with aliases, devices in areas, entities that either inherit
+their device's area or override it, a mix of exposed and unexposed entities,
+and scripts with selector fields.
+
+Usage:
+    python -m benchmarks.large_home --entities 1000 -o home.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+import random
+import sys
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components.conversation import DOMAIN as CONVERSATION_DOMAIN
+from homeassistant.components.homeassistant.exposed_entities import async_expose_entity
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    floor_registry as fr,
+    service,
+)
+
+PLATFORM = "large_home"
+
+ROOMS = (
+    "Kitchen",
+    "Living Room",
+    "Bedroom",
+    "Bathroom",
+    "Office",
+    "Hallway",
+    "Garage",
+    "Dining Room",
+    "Laundry",
+    "Nursery",
+    "Guest Room",
+    "Attic",
+    "Basement",
+    "Porch",
+    "Garden",
+)
+ROOM_ALIASES = {
+    "Living Room": "Lounge",
+    "Bathroom": "Washroom",
+    "Office": "Study",
+    "Hallway": "Corridor",
+    "Laundry": "Utility Room",
+}
+FLOORS = ("Ground Floor", "First Floor", "Second Floor", "Basement Level")
+
+# Relative share of each domain among generated entities
+DOMAIN_WEIGHTS = {
+    "light": 30,
+    "sensor": 30,
+    "switch": 15,
+    "binary_sensor": 10,
+    "cover": 5,
+    "fan": 4,
+    "climate": 3,
+    "media_player": 3,
+}
+ENTITIES_PER_DEVICE = 3
+
+SCRIPT_FIELDS = {
+    "brightness": {
+        "name": "Brightness",
+        "description": "Brightness in percent",
+        "required": True,
+        "selector": {"number": {"min": 0, "max": 100, "unit_of_measurement": "%"}},
+    },
+    "mode": {
+        "name": "Mode",
+        "selector": {"select": {"options": ["relax", "focus", "party"]}},
+    },
+    "message": {
+        "description": "Message to announce",
+        "selector": {"text": {}},
+    },
+    "target": {
+        "name": "Target",
+        "required": True,
+        "selector": {"entity": {"domain": "light"}},
+    },
+    "silent": {"name": "Silent", "selector": {"boolean": {}}},
+}
+
+
+@dataclass
+class HomeSpec:
+    """Size and mix of a generated home."""
+
+    entities: int
+    areas: int
+    floors: int
+    scripts: int
+    exposed_ratio: float = 0.7
+    seed: int = 0
+
+    @classmethod
+    def for_size(cls, entities: int, seed: int = 0) -> HomeSpec:
+        """Return a spec with area, floor and script counts scaled to entities."""
+        areas = max(entities // 20, 1)
+        return cls(
+            entities=entities,
+            areas=areas,
+            floors=min(max(areas // 15, 1), 10),
+            scripts=max(entities // 50, 1),
+            seed=seed,
+        )
+
+
+def generate_home(spec: HomeSpec) -> dict[str, Any]:
+    """Generate a home from a spec. The same spec always gives the same home."""
+    rng = random.Random(spec.seed)
+
+    floors = [
+        {
+            "id": f"floor_{i}",
+            "name": _numbered(FLOORS, i),
+            "level": i,
+        }
+        for i in range(spec.floors)
+    ]
+
+    areas = []
+    for i in range(spec.areas):
+        name = _numbered(ROOMS, i)
+        room = ROOMS[i % len(ROOMS)]
+        aliases = []
+        if room in ROOM_ALIASES:
+            aliases.append(name.replace(room, ROOM_ALIASES[room]))
+        areas.append(
+            {
+                "id": f"area_{i}",
+                "name": name,
+                "floor": floors[i % spec.floors]["id"],
+                "aliases": aliases,
+            }
+        )
+
+    area_names = {area["id"]: area["name"] for area in areas}
+    devices = []
+    entities = []
+    domains = list(DOMAIN_WEIGHTS)
+    weights = list(DOMAIN_WEIGHTS.values())
+    for i in range(spec.entities):
+        if i % ENTITIES_PER_DEVICE == 0:
+            area = rng.choice(areas)
+            devices.append(
+                {
+                    "id": f"device_{len(devices)}",
+                    "name": f"{area['name']} Device {len(devices)}",
+                    "area": area["id"],
+                }
+            )
+        device = devices[-1]
+        domain = rng.choices(domains, weights)[0]
+
+        # Most entities inherit the device's area, some are moved elsewhere
+        area_override = rng.choice(areas)["id"] if rng.random() < 0.1 else None
+        area_name = area_names[area_override or device["area"]]
+
+        name = f"{area_name} {domain.replace('_', ' ').title()} {i}"
+        aliases = [f"{name} alias {n}" for n in range(rng.choice((0, 0, 0, 1, 2)))]
+        state, attributes = _state_for(rng, domain)
+        entities.append(
+            {
+                "entity_id": f"{domain}.large_home_{i}",
+                "name": name,
+                "aliases": aliases,
+                "device": device["id"],
+                "area": area_override,
+                "exposed": rng.random() < spec.exposed_ratio,
+                "state": state,
+                "attributes": attributes,
+            }
+        )
+
+    scripts = []
+    field_names = list(SCRIPT_FIELDS)
+    for i in range(spec.scripts):
+        # Half the scripts take fields, the other half are listed as entities
+        fields = (
+            {
+                field: SCRIPT_FIELDS[field]
+                for field in rng.sample(field_names, rng.randint(1, 3))
+            }
+            if i % 2
+            else {}
+        )
+        scripts.append(
+            {
+                "object_id": f"large_home_script_{i}",
+                "name": f"Scene Script {i}",
+                "description": f"Runs routine number {i}",
+                "fields": fields,
+                "exposed": rng.random() < spec.exposed_ratio,
+            }
+        )
+
+    return {
+        "spec": asdict(spec),
+        "floors": floors,
+        "areas": areas,
+        "devices": devices,
+        "entities": entities,
+        "scripts": scripts,
+    }
+
+
+async def async_populate_home(hass: HomeAssistant, home: dict[str, Any]) -> None:
+    """Load a generated home into the registries and state machine."""
+    floor_registry = fr.async_get(hass)
+    area_registry = ar.async_get(hass)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    config_entry = MockConfigEntry(domain=PLATFORM)
+    config_entry.add_to_hass(hass)
+
+    floor_ids = {
+        floor["id"]: floor_registry.async_create(
+            floor["name"], level=floor["level"]
+        ).floor_id
+        for floor in home["floors"]
+    }
+    area_ids = {
+        area["id"]: area_registry.async_create(
+            area["name"],
+            floor_id=floor_ids[area["floor"]],
+            aliases=set(area["aliases"]),
+        ).id
+        for area in home["areas"]
+    }
+
+    device_ids = {}
+    for device in home["devices"]:
+        entry = device_registry.async_get_or_create(
+            config_entry_id=config_entry.entry_id,
+            identifiers={(PLATFORM, device["id"])},
+            name=device["name"],
+        )
+        device_registry.async_update_device(entry.id, area_id=area_ids[device["area"]])
+        device_ids[device["id"]] = entry.id
+
+    for entity in home["entities"]:
+        domain, object_id = entity["entity_id"].split(".", 1)
+        entry = entity_registry.async_get_or_create(
+            domain,
+            PLATFORM,
+            object_id,
+            suggested_object_id=object_id,
+            device_id=device_ids[entity["device"]],
+            original_name=entity["name"],
+        )
+        entity_registry.async_update_entity(
+            entry.entity_id,
+            aliases=set(entity["aliases"]),
+            area_id=area_ids[entity["area"]] if entity["area"] else None,
+        )
+        hass.states.async_set(
+            entry.entity_id,
+            entity["state"],
+            {"friendly_name": entity["name"], **entity["attributes"]},
+        )
+        async_expose_entity(
+            hass, CONVERSATION_DOMAIN, entry.entity_id, entity["exposed"]
+        )
+
+    async def _async_run_script(call: ServiceCall) -> None:
+        """Do nothing, the benchmarks only describe scripts."""
+
+    for script in home["scripts"]:
+        object_id = script["object_id"]
+        entry = entity_registry.async_get_or_create(
+            "script",
+            "script",
+            object_id,
+            suggested_object_id=object_id,
+            original_name=script["name"],
+        )
+        hass.services.async_register("script", object_id, _async_run_script)
+        service.async_set_service_schema(
+            hass,
+            "script",
+            object_id,
+            {
+                "name": script["name"],
+                "description": script["description"],
+                "fields": script["fields"],
+            },
+        )
+        hass.states.async_set(
+            entry.entity_id, "off", {"friendly_name": script["name"]}
+        )
+        async_expose_entity(
+            hass, CONVERSATION_DOMAIN, entry.entity_id, script["exposed"]
+        )
+
+    await hass.async_block_till_done()
+
+
+def load_home(path: Path) -> dict[str, Any]:
+    """Load a home written by the command line generator."""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _numbered(names: tuple[str, ...], index: int) -> str:
+    """Return a unique name, numbering repeats once the list runs out."""
+    name = names[index % len(names)]
+    if index >= len(names):
+        name = f"{name} {index // len(names) + 1}"
+    return name
+
+
+def _state_for(rng: random.Random, domain: str) -> tuple[str, dict[str, Any]]:
+    """Return a plausible state and attributes for a domain."""
+    on_off = rng.choice(("on", "off"))
+    if domain == "light":
+        return on_off, {"brightness": rng.randint(1, 255)} if on_off == "on" else {}
+    if domain == "sensor":
+        device_class, unit = rng.choice(
+            (("temperature", "°C"), ("humidity", "%"), ("power", "W"))
+        )
+        return str(round(rng.uniform(0, 100), 1)), {
+            "device_class": device_class,
+            "unit_of_measurement": unit,
+        }
+    if domain == "binary_sensor":
+        return on_off, {"device_class": rng.choice(("door", "motion", "window"))}
+    if domain == "cover":
+        position = rng.randint(0, 100)
+        return ("open" if position else "closed"), {"current_position": position}
+    if domain == "fan":
+        return on_off, {"percentage": rng.randint(0, 100)}
+    if domain == "climate":
+        return rng.choice(("heat", "cool", "off")), {
+            "temperature": rng.randint(17, 24),
+            "current_temperature": round(rng.uniform(15, 26), 1),
+        }
+    if domain == "media_player":
+        return rng.choice(("playing", "paused", "idle")), {
+            "volume_level": round(rng.random(), 2),
+            "media_title": f"Track {rng.randint(1, 500)}",
+        }
+    return on_off, {}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Write a generated home as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--entities", type=int, required=True)
+    parser.add_argument("--areas", type=int, help="default: entities / 20")
+    parser.add_argument("--floors", type=int, help="default: areas / 15, at most 10")
+    parser.add_argument("--scripts", type=int, help="default: entities / 50")
+    parser.add_argument("--exposed-ratio", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-o", "--output", type=Path, help="file to write, default: stdout"
+    )
+    args = parser.parse_args(argv)
+
+    spec = HomeSpec.for_size(args.entities, seed=args.seed)
+    spec.exposed_ratio = args.exposed_ratio
+    if args.areas:
+        spec.areas = args.areas
+    if args.floors:
+        spec.floors = args.floors
+    if args.scripts is not None:
+        spec.scripts = args.scripts
+
+    output = json.dumps(generate_home(spec), indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
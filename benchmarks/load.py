@@ -0,0 +1,206 @@
+"""Concurrent conversation load against the fake LLM server.
+
+Each simulated satellite is a device in its own area that runs a session of
+several turns on one conversation id, mixing commands the Home Assistant
+agent handles, questions for the LLM and requests that make the LLM call a
+tool. Satellites start at the same time, like a morning burst.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.components import conversation
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import area_registry as ar, device_registry as dr
+
+from .fake_llm import ScriptedStream, text_response, tool_call_response
+
+SATELLITE_PLATFORM = "load_satellite"
+MOOD_PREFIX = "Set the mood with the "
+# How often the loop lag monitor wakes up, in seconds
+LAG_INTERVAL = 0.01
+
+
+def satellite_responder(body: dict[str, Any]) -> ScriptedStream:
+    """Answer a request according to the message that prompted it."""
+    message = body["messages"][-1]
+    if message["role"] == "tool":
+        return text_response("Done, enjoy.")
+    content = message.get("content")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content)
+    if content and content.startswith(MOOD_PREFIX):
+        return tool_call_response(
+            [("HassTurnOn", {"name": content.removeprefix(MOOD_PREFIX)})]
+        )
+    return text_response("It looks like a clear day, with a high of eighteen degrees.")
+
+
+@dataclass
+class Satellite:
+    """A simulated voice satellite."""
+
+    device_id: str
+    light_name: str
+
+    def turns(self, count: int) -> list[str]:
+        """Return the sentences spoken in a session."""
+        sentences = [
+            f"turn on {self.light_name}",
+            "What's the weather going to be like today?",
+            f"{MOOD_PREFIX}{self.light_name}",
+        ]
+        return [sentences[turn % len(sentences)] for turn in range(count)]
+
+
+async def async_setup_satellites(hass: HomeAssistant, count: int) -> list[Satellite]:
+    """Create satellites, each with an area and a light in that area."""
+    area_registry = ar.async_get(hass)
+    device_registry = dr.async_get(hass)
+    config_entry = MockConfigEntry(domain=SATELLITE_PLATFORM)
+    config_entry.add_to_hass(hass)
+
+    satellites = []
+    for number in range(count):
+        area = area_registry.async_create(f"Room {number}")
+        device = device_registry.async_get_or_create(
+            config_entry_id=config_entry.entry_id,
+            identifiers={(SATELLITE_PLATFORM, str(number))},
+            name=f"Satellite {number}",
+        )
+        device_registry.async_update_device(device.id, area_id=area.id)
+        light_name = f"Room {number} Lamp"
+        hass.states.async_set(
+            f"light.room_{number}_lamp", "off", {"friendly_name": light_name}
+        )
+        satellites.append(Satellite(device.id, light_name))
+    await hass.async_block_till_done()
+    return satellites
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs a task that sleeps in a loop."""
+
+    def __init__(self, interval: float = LAG_INTERVAL) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _async_run(self) -> None:
+        """Sleep repeatedly and record how late each wake up was."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - started - self.interval, 0))
+
+    def start(self) -> None:
+        """Start monitoring."""
+        self._task = asyncio.create_task(self._async_run())
+
+    async def async_stop(self) -> None:
+        """Stop monitoring."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+@dataclass
+class LoadResult:
+    """Results of a load run."""
+
+    turns: int
+    seconds: float
+    latencies: list[float]
+    loop_lags: list[float]
+    errors: int
+    peak_rss_growth_kib: int
+    allocations: list[str] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Return completed turns per second."""
+        return self.turns / self.seconds
+
+
+def _peak_rss_kib() -> int:
+    """Return the peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def async_run_load(
+    hass: HomeAssistant,
+    agent_id: str,
+    satellites: list[Satellite],
+    turns_per_session: int,
+    trace_allocations: bool = False,
+) -> LoadResult:
+    """Run one session per satellite, all at once, and measure them.
+
+    With trace_allocations, tracemalloc is used to list the code that
+    allocated the most memory during the run. It slows everything down, so
+    latencies from such a run should not be compared with others.
+    """
+    latencies: list[float] = []
+    errors = 0
+
+    async def _async_session(satellite: Satellite) -> None:
+        nonlocal errors
+        conversation_id = None
+        for text in satellite.turns(turns_per_session):
+            started = time.perf_counter()
+            result = await conversation.async_converse(
+                hass,
+                text,
+                conversation_id,
+                Context(),
+                agent_id=agent_id,
+                device_id=satellite.device_id,
+            )
+            latencies.append(time.perf_counter() - started)
+            if result.response.error_code is not None:
+                errors += 1
+            conversation_id = result.conversation_id
+
+    if trace_allocations:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+    rss_before = _peak_rss_kib()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(_async_session(sat) for sat in satellites))
+    finally:
+        seconds = time.perf_counter() - started
+        await monitor.async_stop()
+
+    allocations = []
+    if trace_allocations:
+        growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        tracemalloc.stop()
+        allocations = [str(stat) for stat in growth[:10]]
+
+    return LoadResult(
+        turns=len(latencies),
+        seconds=seconds,
+        latencies=latencies,
+        loop_lags=monitor.lags,
+        errors=errors,
+        peak_rss_growth_kib=_peak_rss_kib() - rss_before,
+        allocations=allocations,
+    )
@@ -0,0 +1 @@
+"""Microbenchmarks for the per-response helpers."""
@@ -0,0 +1,22 @@
+"""Fixtures for the microbenchmarks.
+
+These time pure functions, so they don't need a Home Assistant instance.
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations():
+    """Don't set up Home Assistant for microbenchmarks."""
+    return
+
+
+@pytest.fixture
+def event_loop_runner():
+    """Return a function that runs a coroutine on a private event loop."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
@@ -0,0 +1,130 @@
+"""Microbenchmarks for the functions that run on every LLM response.
+
+Run with pytest-benchmark, see docs/benchmarks.md for comparing against a
+saved baseline.
+"""
+
+from collections.abc import AsyncGenerator
+import json
+from pathlib import Path
+
+from litellm.types.utils import ModelResponseStream
+import pytest
+
+from benchmarks.fake_llm import load_stream
+from custom_components.custom_conversation.conversation import (
+    _fix_invalid_arguments,
+    _get_llm_details,
+    _parse_tool_args,
+    _transform_litellm_stream,
+)
+
+STREAMS_DIR = Path(__file__).parent.parent / "streams"
+STREAMS = sorted(path.stem for path in STREAMS_DIR.glob("*.jsonl"))
+
+
+async def _replay(chunks: list[ModelResponseStream]) -> AsyncGenerator:
+    """Yield recorded chunks without any delay."""
+    for chunk in chunks:
+        yield chunk
+
+
+async def _consume(chunks: list[ModelResponseStream]) -> list[dict]:
+    """Transform a recorded stream and collect the deltas."""
+    return [delta async for delta in _transform_litellm_stream(_replay(chunks))]
+
+
+@pytest.mark.parametrize("stream", STREAMS)
+def test_transform_litellm_stream(benchmark, event_loop_runner, stream: str) -> None:
+    """Benchmark transforming a recorded stream into chat log deltas."""
+    chunks = [
+        ModelResponseStream(**chunk)
+        for _, chunk in load_stream(STREAMS_DIR / f"{stream}.jsonl")
+    ]
+
+    deltas = benchmark(lambda: event_loop_runner(_consume(chunks)))
+
+    assert deltas
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {"name": "Kitchen Light", "area": "Kitchen", "domain": ["light"]},
+        {
+            "name": "Kitchen Light",
+            "domain": '["light"]',
+            "area": "",
+            "floor": None,
+            "data": '{"brightness": 40}',
+        },
+        '{"name": "Kitchen Light", "domain": ["light"], "floor": null, "area": ""}',
+    ],
+    ids=["clean", "malformed_values", "string"],
+)
+def test_parse_tool_args(benchmark, arguments) -> None:
+    """Benchmark cleaning up the arguments of a tool call."""
+    result = benchmark(_parse_tool_args, arguments)
+
+    assert result["name"] == "Kitchen Light"
+
+
+def test_fix_invalid_arguments(benchmark) -> None:
+    """Benchmark repairing a mix of valid and JSON encoded argument values."""
+    values = [
+        "Kitchen Light",
+        '["light", "switch"]',
+        '{"brightness": 40}',
+        "[not json]",
+        40,
+        ["light"],
+    ] * 20
+
+    result = benchmark(lambda: [_fix_invalid_arguments(value) for value in values])
+
+    assert result[1] == ["light", "switch"]
+
+
+def test_get_llm_details(benchmark) -> None:
+    """Benchmark summarizing a turn with many tool calls for tracing."""
+    messages = [{"role": "user", "content": "Turn everything off"}]
+    for call in range(10):
+        messages.append(
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{call}",
+                        "type": "function",
+                        "function": {
+                            "name": "HassTurnOff",
+                            "arguments": json.dumps({"area": f"Room {call}"}),
+                        },
+                    }
+                ],
+            }
+        )
+        messages.append(
+            {
+                "role": "tool",
+                "tool_call_id": f"call_{call}",
+                "content": json.dumps(
+                    {
+                        "response_type": "action_done",
+                        "data": {
+                            "success": [
+                                {"id": f"light.room_{call}_{n}", "type": "entity"}
+                                for n in range(20)
+                            ],
+                            "failure": [],
+                        },
+                    }
+                ),
+            }
+        )
+
+    llm_details, tags = benchmark(_get_llm_details, messages)
+
+    assert len(llm_details["tool_calls"]) == 10
+    assert len(tags) == 210
@@ -0,0 +1,69 @@
+"""Latency percentile reporting for the benchmarks."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+import math
+from pathlib import Path
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LatencyReport:
+    """Collect latency samples per scenario and stage and render a table."""
+
+    def __init__(self) -> None:
+        """Initialize the report."""
+        self.samples: defaultdict[str, defaultdict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        self.summaries: defaultdict[str, dict[str, str]] = defaultdict(dict)
+
+    def add(self, scenario: str, stage: str, seconds: float) -> None:
+        """Add a sample, in seconds."""
+        self.samples[scenario][stage].append(seconds)
+
+    def add_summary(self, scenario: str, name: str, value: str) -> None:
+        """Add a value that isn't a latency, such as throughput."""
+        self.summaries[scenario][name] = value
+
+    def render(self) -> str:
+        """Render all samples as a fixed width table in milliseconds."""
+        header = ["scenario", "stage", "n"] + [f"p{pct}" for pct in PERCENTILES]
+        header.append("max")
+        rows = [header]
+        for scenario, stages in self.samples.items():
+            for stage, samples in stages.items():
+                rows.append(
+                    [scenario, stage, str(len(samples))]
+                    + [
+                        f"{percentile(samples, pct) * 1000:.1f}"
+                        for pct in PERCENTILES
+                    ]
+                    + [f"{max(samples) * 1000:.1f}"]
+                )
+        widths = [max(len(row[col]) for row in rows) for col in range(len(header))]
+        lines = [
+            "  ".join(
+                cell.ljust(width) if col < 2 else cell.rjust(width)
+                for col, (cell, width) in enumerate(zip(row, widths, strict=True))
+            )
+            for row in rows
+        ]
+        lines.insert(1, "-" * len(lines[0]))
+        for scenario, summary in self.summaries.items():
+            lines.append("")
+            lines.append(f"{scenario}:")
+            lines.extend(f"  {name}: {value}" for name, value in summary.items())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write the rendered table to path."""
+        path.write_text(self.render(), encoding="utf-8")
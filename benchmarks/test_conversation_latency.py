@@ -0,0 +1,119 @@
+"""Latency benchmarks for a conversation turn against a fake LLM server."""
+
+import os
+import time
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.custom_conversation.metrics import STAGE_TURN, get_metrics
+from homeassistant.components import conversation
+from homeassistant.core import Context, HomeAssistant
+
+from .fake_llm import FakeLLMServer, text_response, tool_call_response
+from .report import LatencyReport
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+# Turns run before measuring, so connection setup is not counted
+WARMUP_TURNS = 2
+
+
+async def _run_scenario(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    report: LatencyReport,
+    scenario: str,
+    text: str,
+    *,
+    fake_llm: FakeLLMServer | None = None,
+    responses: tuple = (),
+) -> None:
+    """Run a scenario repeatedly and add its latencies to the report."""
+    metrics = get_metrics(hass, entry)
+    for turn in range(WARMUP_TURNS + ITERATIONS):
+        if fake_llm is not None:
+            fake_llm.queue(*responses)
+        metrics.timings.clear()
+        started = time.perf_counter()
+        result = await conversation.async_converse(
+            hass, text, None, Context(), agent_id=entry.entry_id
+        )
+        elapsed = time.perf_counter() - started
+        assert result.response.error_code is None, result.response.speech
+
+        if turn < WARMUP_TURNS:
+            continue
+        report.add(scenario, "total", elapsed)
+        for stage, samples in metrics.timings.items():
+            if stage != STAGE_TURN:
+                report.add(scenario, stage, sum(samples))
+
+
+async def test_hass_agent_hit(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    latency_report: LatencyReport,
+) -> None:
+    """Benchmark a command the Home Assistant agent handles on its own."""
+    calls = async_mock_service(hass, "switch", "turn_on")
+
+    await _run_scenario(
+        hass, bench_entry, latency_report, "hass_agent_hit", "turn on kitchen switch"
+    )
+
+    assert len(calls) == WARMUP_TURNS + ITERATIONS
+    assert fake_llm.requests == []
+
+
+async def test_llm_answer(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    latency_report: LatencyReport,
+) -> None:
+    """Benchmark a question the Home Assistant agent passes on to the LLM."""
+    await _run_scenario(
+        hass,
+        bench_entry,
+        latency_report,
+        "llm_answer",
+        "Why is the sky blue?",
+        fake_llm=fake_llm,
+        responses=(text_response("Sunlight scatters off air molecules, blue light most of all."),),
+    )
+
+    assert len(fake_llm.requests) == WARMUP_TURNS + ITERATIONS
+
+
+async def test_multi_tool_turn(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    latency_report: LatencyReport,
+) -> None:
+    """Benchmark a turn where the LLM calls two tools before answering."""
+    calls = async_mock_service(hass, "switch", "turn_on")
+
+    await _run_scenario(
+        hass,
+        bench_entry,
+        latency_report,
+        "multi_tool",
+        "I'm home, get the place ready",
+        fake_llm=fake_llm,
+        responses=(
+            tool_call_response(
+                [
+                    ("HassTurnOn", {"name": "Kitchen Switch"}),
+                    ("HassTurnOn", {"name": "Porch Switch"}),
+                ]
+            ),
+            text_response("Welcome home, the kitchen and porch are on."),
+        ),
+    )
+
+    assert len(calls) == 2 * (WARMUP_TURNS + ITERATIONS)
+    assert len(fake_llm.requests) == 2 * (WARMUP_TURNS + ITERATIONS)
@@ -0,0 +1,92 @@
+"""Compare the exposed entity encodings by prompt size and time to first token."""
+
+import os
+
+import litellm
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.const import (
+    CONF_ENTITY_ENCODING,
+    CONF_PERFORMANCE_SECTION,
+    ENTITY_ENCODING_COMPACT,
+    ENTITY_ENCODING_YAML,
+)
+from custom_components.custom_conversation.metrics import STAGE_FIRST_TOKEN, get_metrics
+from homeassistant.components import conversation
+from homeassistant.core import Context, HomeAssistant
+
+from .fake_llm import FakeLLMServer, text_response
+from .large_home import HomeSpec
+from .report import LatencyReport
+
+HOME_SIZES = [
+    int(size)
+    for size in os.getenv("BENCH_ENCODING_HOME_SIZES", "100,1000").split(",")
+]
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+# Seconds the fake server spends per thousand prompt tokens before answering.
+# Hosted models read prompts at very different speeds, this is only a rough
+# figure so prompt size shows up in time to first token.
+PREFILL_PER_1K_TOKENS = float(os.getenv("BENCH_PREFILL_PER_1K_TOKENS", "0.05"))
+# Tokenizer used to count prompt tokens
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+
+@pytest.mark.timeout(1200)
+@pytest.mark.parametrize("size", HOME_SIZES)
+async def test_entity_encoding(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    large_home,
+    latency_report: LatencyReport,
+    size: int,
+) -> None:
+    """Run the same question with each encoding and compare the requests."""
+    await large_home(HomeSpec.for_size(size))
+    fake_llm.prefill_per_1k_tokens = PREFILL_PER_1K_TOKENS
+    scenario = f"entity_encoding_{size}"
+
+    prompt_tokens = {}
+    for encoding in (ENTITY_ENCODING_YAML, ENTITY_ENCODING_COMPACT):
+        hass.config_entries.async_update_entry(
+            bench_entry,
+            options={
+                **bench_entry.options,
+                CONF_PERFORMANCE_SECTION: {CONF_ENTITY_ENCODING: encoding},
+            },
+        )
+        await hass.async_block_till_done()
+
+        for _ in range(ITERATIONS):
+            fake_llm.queue(text_response("It will be sunny."))
+            metrics = get_metrics(hass, bench_entry)
+            metrics.timings.clear()
+            result = await conversation.async_converse(
+                hass,
+                "What's the weather going to be like?",
+                None,
+                Context(),
+                agent_id=bench_entry.entry_id,
+            )
+            assert result.response.error_code is None, result.response.speech
+            latency_report.add(
+                scenario,
+                f"{encoding}_first_token",
+                sum(metrics.timings[STAGE_FIRST_TOKEN]),
+            )
+
+        prompt_tokens[encoding] = litellm.token_counter(
+            model=TOKENIZER_MODEL, messages=fake_llm.requests[-1]["messages"]
+        )
+        latency_report.add_summary(
+            scenario, f"{encoding}_prompt_tokens", str(prompt_tokens[encoding])
+        )
+
+    latency_report.add_summary(
+        scenario,
+        "compact_vs_yaml",
+        f"{prompt_tokens[ENTITY_ENCODING_COMPACT] / prompt_tokens[ENTITY_ENCODING_YAML]:.0%}",
+    )
+    assert prompt_tokens[ENTITY_ENCODING_COMPACT] < prompt_tokens[ENTITY_ENCODING_YAML]
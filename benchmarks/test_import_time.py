@@ -0,0 +1,91 @@
+"""Measure how long the integration takes to import when Home Assistant starts."""
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from .report import LatencyReport
+
+ITERATIONS = int(os.getenv("BENCH_IMPORT_ITERATIONS", "5"))
+REPO_ROOT = Path(__file__).parent.parent
+
+# Home Assistant modules the integration depends on. They are loaded at
+# startup whether or not the integration is installed, so they are imported
+# before timing starts.
+HOME_ASSISTANT_MODULES = [
+    "homeassistant.components.conversation",
+    "homeassistant.components.homeassistant",
+    "homeassistant.components.intent",
+    "homeassistant.components.script",
+    "homeassistant.components.sensor",
+    "homeassistant.helpers.llm",
+]
+# The modules Home Assistant imports to set up the integration and its
+# platforms
+INTEGRATION_MODULES = [
+    "custom_components.custom_conversation",
+    "custom_components.custom_conversation.config_flow",
+    "custom_components.custom_conversation.conversation",
+    "custom_components.custom_conversation.sensor",
+]
+DEFERRED_MODULES = ["litellm", "langfuse"]
+
+IMPORT_SCRIPT = """
+import importlib
+import json
+import sys
+import time
+
+for name in {home_assistant}:
+    importlib.import_module(name)
+
+started = time.perf_counter()
+for name in {integration}:
+    importlib.import_module(name)
+integration = time.perf_counter() - started
+loaded = [name for name in {deferred} if name in sys.modules]
+
+started = time.perf_counter()
+for name in {deferred}:
+    importlib.import_module(name)
+deferred = time.perf_counter() - started
+
+print(json.dumps({{"integration": integration, "deferred": deferred, "loaded": loaded}}))
+"""
+
+
+def _measure_imports() -> dict:
+    """Import the integration in a fresh interpreter and return the timings."""
+    script = IMPORT_SCRIPT.format(
+        home_assistant=HOME_ASSISTANT_MODULES,
+        integration=INTEGRATION_MODULES,
+        deferred=DEFERRED_MODULES,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.timeout(600)
+def test_import_time(latency_report: LatencyReport) -> None:
+    """Time the integration import against the LiteLLM and Langfuse imports.
+
+    Each run uses a new interpreter so nothing is already in sys.modules.
+    The integration should load without LiteLLM or Langfuse, which are
+    imported by the first conversation turn or by the warm-up instead.
+    """
+    scenario = "import_time"
+    for _ in range(ITERATIONS):
+        timings = _measure_imports()
+        assert timings["loaded"] == []
+        latency_report.add(scenario, "integration", timings["integration"])
+        latency_report.add(scenario, "litellm_langfuse", timings["deferred"])
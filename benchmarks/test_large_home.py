@@ -0,0 +1,142 @@
+"""Scaling benchmarks for the prompt and tool building code paths."""
+
+from collections.abc import Awaitable, Callable
+import inspect
+import os
+import time
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.api import (
+    CustomLLMAPI,
+    GetLiveContextTool,
+    _get_exposed_entities,
+)
+from custom_components.custom_conversation.const import DOMAIN
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import llm
+
+from .large_home import HomeSpec
+from .report import LatencyReport
+
+HOME_SIZES = [
+    int(size) for size in os.getenv("BENCH_HOME_SIZES", "100,1000,10000").split(",")
+]
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+
+
+async def _measure(
+    report: LatencyReport,
+    scenario: str,
+    stage: str,
+    func: Callable[[], Any | Awaitable[Any]],
+) -> Any:
+    """Call func repeatedly, adding each call's latency to the report."""
+    result = None
+    for _ in range(ITERATIONS):
+        started = time.perf_counter()
+        result = func()
+        if inspect.isawaitable(result):
+            result = await result
+        report.add(scenario, stage, time.perf_counter() - started)
+    return result
+
+
+@pytest.mark.timeout(600)
+@pytest.mark.parametrize("size", HOME_SIZES)
+async def test_large_home(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    large_home: Callable[[HomeSpec], Awaitable[dict]],
+    latency_report: LatencyReport,
+    size: int,
+) -> None:
+    """Benchmark building the prompt, tools and live context for a large home."""
+    home = await large_home(HomeSpec.for_size(size))
+    scenario = f"large_home_{size}"
+    llm_context = llm.LLMContext(
+        platform=DOMAIN,
+        context=Context(),
+        language="en",
+        assistant="conversation",
+        device_id=None,
+    )
+    api = CustomLLMAPI(hass, user_name="Bench", conversation_config_entry=bench_entry)
+    tool = GetLiveContextTool()
+
+    exposed = await _measure(
+        latency_report,
+        scenario,
+        "exposed_entities",
+        lambda: _get_exposed_entities(hass, "conversation", include_state=False),
+    )
+    await _measure(
+        latency_report,
+        scenario,
+        "exposed_entities_state",
+        lambda: _get_exposed_entities(hass, "conversation", include_state=True),
+    )
+    await _measure(
+        latency_report,
+        scenario,
+        "api_prompt",
+        lambda: api._async_get_api_prompt(llm_context, exposed),  # noqa: SLF001
+    )
+    tools = await _measure(
+        latency_report,
+        scenario,
+        "tools",
+        lambda: api._async_get_tools(llm_context, exposed),  # noqa: SLF001
+    )
+    await _measure(
+        latency_report,
+        scenario,
+        "live_context",
+        lambda: tool.async_call(
+            hass, llm.ToolInput(tool.name, {}), llm_context
+        ),
+    )
+    live = await _measure(
+        latency_report,
+        scenario,
+        "live_context_domain",
+        lambda: tool.async_call(
+            hass, llm.ToolInput(tool.name, {"domain": "light"}), llm_context
+        ),
+    )
+    kitchen_lights = await _measure(
+        latency_report,
+        scenario,
+        "live_context_area_domain",
+        lambda: tool.async_call(
+            hass,
+            llm.ToolInput(tool.name, {"area": "Kitchen", "domain": "light"}),
+            llm_context,
+        ),
+    )
+
+    # Scripts with fields are offered as tools rather than listed as entities
+    expected = {
+        entity["entity_id"] for entity in home["entities"] if entity["exposed"]
+    } | {
+        f"script.{script['object_id']}"
+        for script in home["scripts"]
+        if script["exposed"] and not script["fields"]
+    }
+    assert expected <= exposed.keys()
+    assert not {
+        f"script.{script['object_id']}"
+        for script in home["scripts"]
+        if script["fields"]
+    } & exposed.keys()
+    assert {
+        t.name for t in tools if isinstance(t, llm.ScriptTool)
+    } == {
+        f"large_home_script_{i}"
+        for i, script in enumerate(home["scripts"])
+        if script["exposed"]
+    }
+    assert live["success"]
+    assert kitchen_lights["success"]
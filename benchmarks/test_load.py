@@ -0,0 +1,71 @@
+"""Load benchmarks for many satellites talking at once."""
+
+import os
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from homeassistant.core import HomeAssistant
+
+from .fake_llm import FakeLLMServer
+from .load import async_run_load, async_setup_satellites, satellite_responder
+from .report import LatencyReport, percentile
+
+SATELLITE_COUNTS = [
+    int(count) for count in os.getenv("BENCH_LOAD_SATELLITES", "10,50").split(",")
+]
+TURNS_PER_SESSION = int(os.getenv("BENCH_LOAD_TURNS", "3"))
+TRACE_ALLOCATIONS = os.getenv("BENCH_TRACEMALLOC") == "1"
+
+
+@pytest.mark.timeout(600)
+@pytest.mark.parametrize("satellites", SATELLITE_COUNTS)
+async def test_concurrent_satellites(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    latency_report: LatencyReport,
+    satellites: int,
+) -> None:
+    """Benchmark a burst of sessions from many satellites at once."""
+    calls = async_mock_service(hass, "light", "turn_on")
+    fake_llm.responder = satellite_responder
+    devices = await async_setup_satellites(hass, satellites)
+
+    result = await async_run_load(
+        hass, bench_entry.entry_id, devices, TURNS_PER_SESSION, TRACE_ALLOCATIONS
+    )
+
+    scenario = f"load_{satellites}_satellites"
+    for latency in result.latencies:
+        latency_report.add(scenario, "turn", latency)
+    for lag in result.loop_lags:
+        latency_report.add(scenario, "loop_lag", lag)
+    latency_report.add_summary(scenario, "turns", str(result.turns))
+    latency_report.add_summary(
+        scenario, "throughput", f"{result.throughput:.1f} turns/s"
+    )
+    if result.loop_lags:
+        latency_report.add_summary(
+            scenario,
+            "worst loop lag",
+            f"{percentile(result.loop_lags, 100) * 1000:.1f} ms",
+        )
+    latency_report.add_summary(
+        scenario, "peak RSS growth", f"{result.peak_rss_growth_kib} KiB"
+    )
+    for number, allocation in enumerate(result.allocations, 1):
+        latency_report.add_summary(scenario, f"allocation {number}", allocation)
+
+    assert result.errors == 0
+    assert result.turns == satellites * TURNS_PER_SESSION
+    # Lamps are turned on directly and through a tool, but not by questions
+    lamp_turns = sum(
+        1
+        for text in devices[0].turns(TURNS_PER_SESSION)
+        if devices[0].light_name in text
+    )
+    assert len(calls) == satellites * lamp_turns
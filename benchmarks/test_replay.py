@@ -0,0 +1,66 @@
+"""Replay recorded provider streams through a full conversation turn.
+
+Set BENCH_RECORDINGS to a folder of recordings made with the Record provider
+streams option. The recordings of each conversation are replayed in order,
+one per LLM request, so a turn with tool calls gets the same sequence of
+responses it got in production.
+"""
+
+from collections import defaultdict
+import os
+from pathlib import Path
+import time
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.metrics import STAGE_TURN, get_metrics
+from homeassistant.components import conversation
+from homeassistant.core import Context, HomeAssistant
+
+from .fake_llm import FakeLLMServer, load_stream
+from .report import LatencyReport
+
+RECORDINGS = os.getenv("BENCH_RECORDINGS")
+
+
+def _recorded_conversations(folder: Path) -> dict[str, list[Path]]:
+    """Group recordings by conversation, in the order they were made."""
+    conversations: defaultdict[str, list[Path]] = defaultdict(list)
+    for path in sorted(folder.glob("*.jsonl")):
+        # Names are <timestamp>_<conversation id>.jsonl
+        conversations[path.stem.split("_", 1)[1]].append(path)
+    return conversations
+
+
+@pytest.mark.skipif(not RECORDINGS, reason="BENCH_RECORDINGS is not set")
+async def test_replay_recordings(
+    hass: HomeAssistant,
+    bench_entry: MockConfigEntry,
+    fake_llm: FakeLLMServer,
+    latency_report: LatencyReport,
+) -> None:
+    """Replay each recorded conversation as one turn."""
+    conversations = _recorded_conversations(Path(RECORDINGS))
+    assert conversations, f"No recordings in {RECORDINGS}"
+    metrics = get_metrics(hass, bench_entry)
+
+    for conversation_id, paths in conversations.items():
+        fake_llm.queue(*(load_stream(path) for path in paths))
+        metrics.timings.clear()
+        started = time.perf_counter()
+        await conversation.async_converse(
+            hass,
+            # Anything the Home Assistant agent won't handle
+            "Replay the recorded conversation",
+            None,
+            Context(),
+            agent_id=bench_entry.entry_id,
+        )
+        latency_report.add("replay", "total", time.perf_counter() - started)
+        for stage, samples in metrics.timings.items():
+            if stage != STAGE_TURN:
+                latency_report.add("replay", stage, sum(samples))
+        assert not fake_llm.responses, (
+            f"Conversation {conversation_id} made fewer requests than recorded"
+        )
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+from functools import partial
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv, llm
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.typing import ConfigType
 
-from .api import CustomLLMAPI
+from .api import CustomLLMAPI, async_get_script_tool_cache
+from .batch import async_get_pending_batches, async_resume_batches
 from .const import (
     CONF_BASE_URL,
     CONF_CHAT_MODEL,
@@ -16,7 +20,11 @@ from .const import (
     CONF_LANGFUSE_SCORE_ENABLED,
     CONF_LANGFUSE_SECTION,
     CONF_LLM_PARAMETERS_SECTION,
+    CONF_LOOP_MONITOR,
+    CONF_LOOP_MONITOR_THRESHOLD,
     CONF_MAX_TOKENS,
+    CONF_PERFORMANCE_SECTION,
+    CONF_PREWARM_ENABLED,
     CONF_PRIMARY_API_KEY,
     CONF_PRIMARY_BASE_URL,
     CONF_PRIMARY_CHAT_MODEL,
@@ -24,15 +32,20 @@ from .const import (
     CONF_TEMPERATURE,
     CONF_TOP_P,
     CONFIG_VERSION,
+    DEFAULT_LOOP_MONITOR,
+    DEFAULT_LOOP_MONITOR_THRESHOLD,
+    DEFAULT_PREWARM_ENABLED,
     DEFAULT_PROVIDER,
     DOMAIN,
     LLM_API_ID,
     LOGGER,
 )
+from .loop_monitor import get_loop_monitor
 from .prompt_manager import LangfuseClient, LangfuseError
 from .service import async_setup_services
+from .warmup import async_warm_up
 
-PLATFORMS = (Platform.CONVERSATION,)
+PLATFORMS = (Platform.CONVERSATION, Platform.SENSOR)
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 type CustomConversationConfigEntry = ConfigEntry
@@ -47,6 +60,13 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
     await async_setup_services(hass)
 
+    # Build every script tool once scripts have loaded, not on the first request
+    @callback
+    def _async_warm_up_script_tools(hass: HomeAssistant) -> None:
+        async_get_script_tool_cache(hass).async_warm_up()
+
+    async_at_started(hass, _async_warm_up_script_tools)
+
     return True
 
 
@@ -65,8 +85,34 @@ async def async_setup_entry(
     hass.data[DOMAIN][entry.entry_id] = {
         "langfuse_client": langfuse_client,
     }
+
+    performance = entry.options.get(CONF_PERFORMANCE_SECTION, {})
+    if performance.get(CONF_LOOP_MONITOR, DEFAULT_LOOP_MONITOR):
+        loop_monitor = get_loop_monitor(hass)
+        loop_monitor.enable(
+            entry.entry_id,
+            performance.get(
+                CONF_LOOP_MONITOR_THRESHOLD, DEFAULT_LOOP_MONITOR_THRESHOLD
+            ),
+        )
+        entry.async_on_unload(partial(loop_monitor.disable, entry.entry_id))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Pick up batch jobs that were still running when the entry was unloaded
+    await async_resume_batches(hass, entry)
+
+    # Warm up providers once Home Assistant has started so setup is never blocked
+    if performance.get(CONF_PREWARM_ENABLED, DEFAULT_PREWARM_ENABLED):
+
+        @callback
+        def _async_start_warm_up(hass: HomeAssistant) -> None:
+            entry.async_create_background_task(
+                hass, async_warm_up(hass, entry), f"{DOMAIN}_warm_up_{entry.entry_id}"
+            )
+
+        entry.async_on_unload(async_at_started(hass, _async_start_warm_up))
+
     # Set up Langfuse trace config if enabled
     if entry.options.get(CONF_LANGFUSE_SECTION, {}).get(CONF_LANGFUSE_SCORE_ENABLED):
         # Get existing score configs
@@ -84,6 +130,10 @@ async def async_setup_entry(
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Clean up clients."""
+    # The sensors read the entry's data while they are removed
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+
     # Clean up Langfuse client if it exists
     if (
         DOMAIN in hass.data
@@ -99,7 +149,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Remove data
     if DOMAIN in hass.data and entry.entry_id in hass.data[DOMAIN]:
         hass.data[DOMAIN].pop(entry.entry_id)
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget batch jobs that a removed entry can no longer collect."""
+    pending = await async_get_pending_batches(hass)
+    await pending.async_remove(*pending.for_entry(entry.entry_id))
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
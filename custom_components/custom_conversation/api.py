@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
 from functools import cache, partial
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
-from langfuse.model import Prompt
 import slugify as unicode_slug
 import voluptuous as vol
 
+from homeassistant.components.conversation import ChatLog, ToolResultContent
 from homeassistant.components.homeassistant import async_should_expose
 from homeassistant.components.intent import async_device_supports_timers
 from homeassistant.components.script import DOMAIN as SCRIPT_DOMAIN
@@ -19,27 +23,53 @@ from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_SERVICE,
     EVENT_HOMEASSISTANT_CLOSE,
+    EVENT_SERVICE_REGISTERED,
     EVENT_SERVICE_REMOVED,
+    EVENT_STATE_CHANGED,
 )
-from homeassistant.core import Event, HomeAssistant, callback, split_entity_id
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+    split_entity_id,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import (
     area_registry as ar,
     config_validation as cv,
     device_registry as dr,
     entity_registry as er,
-    floor_registry as fr,
     intent,
     llm,
     selector,
     service,
 )
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.util import yaml as yaml_util
 from homeassistant.util.hass_dict import HassKey
 from homeassistant.util.json import JsonObjectType
-from homeassistant.util import yaml as yaml_util
 
-from .const import CONF_IGNORED_INTENTS, CONF_IGNORED_INTENTS_SECTION, LLM_API_ID
+from . import deadline
+from .const import (
+    CONF_IGNORED_INTENTS,
+    CONF_IGNORED_INTENTS_SECTION,
+    DOMAIN,
+    LLM_API_ID,
+    LOGGER,
+)
+from .context_memory import get_live_context_memory
+from .device_location import async_get_device_location
+from .entity_index import async_get_exposed_entity_index
+from .loop_monitor import SECTION_DUMP_ENTITIES, loop_section
+from .metrics import Metrics, get_cache_stats, get_metrics
 from .prompt_manager import PromptContext, PromptManager
 
+if TYPE_CHECKING:
+    from langfuse.model import Prompt
+
 
 class CustomLLMAPI(llm.API):
     """An API for the Custom Conversation integration to use to call Home Assistant services."""
@@ -49,6 +79,7 @@ class CustomLLMAPI(llm.API):
         hass: HomeAssistant,
         user_name: str | None = None,
         conversation_config_entry: ConfigEntry | None = None,
+        chat_log: ChatLog | None = None,
     ) -> None:
         """Initialize the API."""
         super().__init__(hass=hass, id=LLM_API_ID, name="Custom Conversation LLM API")
@@ -60,6 +91,7 @@ class CustomLLMAPI(llm.API):
         self._prompt_manager = PromptManager(hass)
         self.prompt_object = None
         self.conversation_config_entry = conversation_config_entry
+        self.chat_log = chat_log
 
     def set_langfuse_client(self, langfuse_client: Any) -> None:
         """Set the Langfuse client."""
@@ -76,12 +108,23 @@ class CustomLLMAPI(llm.API):
         else:
             exposed_entities = None
 
-        return llm.APIInstance(
+        api_prompt = self._async_get_api_prompt(llm_context, exposed_entities)
+        tools = self._async_get_tools(llm_context, exposed_entities)
+        if self.conversation_config_entry is None:
+            return llm.APIInstance(
+                api=self,
+                api_prompt=api_prompt,
+                llm_context=llm_context,
+                tools=tools,
+                custom_serializer=llm.selector_serializer,
+            )
+        return MeteredAPIInstance(
             api=self,
-            api_prompt=self._async_get_api_prompt(llm_context, exposed_entities),
+            api_prompt=api_prompt,
             llm_context=llm_context,
-            tools=self._async_get_tools(llm_context, exposed_entities),
+            tools=tools,
             custom_serializer=llm.selector_serializer,
+            metrics=get_metrics(self.hass, self.conversation_config_entry),
         )
 
     @callback
@@ -94,21 +137,12 @@ class CustomLLMAPI(llm.API):
         floor_name = None
         supports_timers = False
 
-        area: ar.AreaEntry | None = None
-        floor: fr.FloorEntry | None = None
         if llm_context.device_id:
-            device_reg = dr.async_get(self.hass)
-            device = device_reg.async_get(llm_context.device_id)
-
-            if device:
-                area_reg = ar.async_get(self.hass)
-                if device.area_id and (area := area_reg.async_get_area(device.area_id)):
-                    area_name = area.name
-                    floor_reg = fr.async_get(self.hass)
-                    if area.floor_id and (
-                        floor := floor_reg.async_get_floor(area.floor_id)
-                    ):
-                        floor_name = floor.name
+            if device_location := async_get_device_location(
+                self.hass, llm_context.device_id
+            ):
+                area_name = device_location.area_name
+                floor_name = device_location.floor_name
 
             supports_timers = async_device_supports_timers(
                 self.hass, llm_context.device_id
@@ -161,40 +195,30 @@ class CustomLLMAPI(llm.API):
                 intent.INTENT_TIMER_STATUS,
             }
 
-        intent_handlers = [
-            intent_handler
-            for intent_handler in intent.async_get(self.hass)
-            if intent_handler.intent_type not in ignore_intents
-        ]
-
         exposed_domains: set[str] | None = None
         if exposed_entities is not None:
             exposed_domains = {
                 split_entity_id(entity_id)[0] for entity_id in exposed_entities
             }
-            intent_handlers = [
-                intent_handler
-                for intent_handler in intent_handlers
-                if intent_handler.platforms is None
-                or intent_handler.platforms & exposed_domains
-            ]
 
-        tools: list[llm.Tool] = [
-            IntentTool(self.cached_slugify(intent_handler.intent_type), intent_handler)
-            for intent_handler in intent_handlers
-        ]
+        tools: list[llm.Tool] = list(
+            async_get_intent_tool_catalog(self.hass).async_get(
+                ignore_intents, exposed_domains, self.cached_slugify
+            )
+        )
 
         if llm_context.assistant is not None:
+            script_tools = async_get_script_tool_cache(self.hass)
             for state in self.hass.states.async_all(SCRIPT_DOMAIN):
                 if not async_should_expose(
                     self.hass, llm_context.assistant, state.entity_id
                 ):
                     continue
 
-                tools.append(llm.ScriptTool(self.hass, state.entity_id))
+                tools.append(script_tools.async_get(state.entity_id))
 
             if exposed_entities:
-                tools.append(GetLiveContextTool())
+                tools.append(GetLiveContextTool(self.chat_log))
 
         return tools
 
@@ -238,45 +262,117 @@ class IntentTool(llm.Tool):
         slots = {key: {"value": val} for key, val in tool_input.tool_args.items()}
 
         if self.extra_slots and llm_context.device_id:
-            device_reg = dr.async_get(hass)
-            device = device_reg.async_get(llm_context.device_id)
-
-            area: ar.AreaEntry | None = None
-            floor: fr.FloorEntry | None = None
-            if device:
-                area_reg = ar.async_get(hass)
-                if device.area_id and (area := area_reg.async_get_area(device.area_id)):
-                    if area.floor_id:
-                        floor_reg = fr.async_get(hass)
-                        floor = floor_reg.async_get_floor(area.floor_id)
-
+            device_location = async_get_device_location(hass, llm_context.device_id)
             for slot_name, slot_value in (
-                ("preferred_area_id", area.id if area else None),
-                ("preferred_floor_id", floor.floor_id if floor else None),
+                (
+                    "preferred_area_id",
+                    device_location.area_id if device_location else None,
+                ),
+                (
+                    "preferred_floor_id",
+                    device_location.floor_id if device_location else None,
+                ),
             ):
                 if slot_value and slot_name in self.extra_slots:
                     slots[slot_name] = {"value": slot_value}
 
-        intent_response = await intent.async_handle(
-            hass=hass,
-            platform=llm_context.platform,
-            intent_type=self.name,
-            slots=slots,
-            text_input=None,
-            context=llm_context.context,
-            language=llm_context.language,
-            assistant=llm_context.assistant,
-            device_id=llm_context.device_id,
-        )
+        try:
+            async with asyncio.timeout(deadline.remaining()):
+                intent_response = await intent.async_handle(
+                    hass=hass,
+                    platform=llm_context.platform,
+                    intent_type=self.name,
+                    slots=slots,
+                    text_input=None,
+                    context=llm_context.context,
+                    language=llm_context.language,
+                    assistant=llm_context.assistant,
+                    device_id=llm_context.device_id,
+                )
+        except TimeoutError as err:
+            # Surface as a tool error so the model can still tell the user
+            raise HomeAssistantError(f"Timed out handling {self.name}") from err
         response = intent_response.as_dict()
         del response["language"]
         return response
 
 
+
+class IntentToolCatalog:
+    """Intent tool lists shared by requests that would build the same one.
+
+    The list only depends on the registered intents, the ignored intents and
+    the exposed domains, so satellites with the same capabilities share one.
+    All lists are dropped when an intent is registered or unregistered.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the catalog."""
+        self.hass = hass
+        self._intent_handlers: list[intent.IntentHandler] = []
+        self._tools: dict[
+            tuple[frozenset[str], frozenset[str] | None], list[IntentTool]
+        ] = {}
+
+    @callback
+    def async_get(
+        self,
+        ignore_intents: set[str],
+        exposed_domains: set[str] | None,
+        slugify: Callable[[str], str],
+    ) -> list[IntentTool]:
+        """Return the intent tools for a set of ignored intents and domains."""
+        stats = get_cache_stats(self.hass, "intent_tools")
+        # Handlers are compared by identity, so re-registering one is noticed
+        intent_handlers = list(intent.async_get(self.hass))
+        if len(intent_handlers) != len(self._intent_handlers) or any(
+            new is not old
+            for new, old in zip(intent_handlers, self._intent_handlers, strict=True)
+        ):
+            self._intent_handlers = intent_handlers
+            self._tools.clear()
+
+        key = (
+            frozenset(ignore_intents),
+            frozenset(exposed_domains) if exposed_domains is not None else None,
+        )
+        if (tools := self._tools.get(key)) is not None:
+            stats.hit()
+            return tools
+        stats.miss()
+
+        tools = self._tools[key] = [
+            IntentTool(slugify(intent_handler.intent_type), intent_handler)
+            for intent_handler in intent_handlers
+            if intent_handler.intent_type not in ignore_intents
+            and (
+                exposed_domains is None
+                or intent_handler.platforms is None
+                or intent_handler.platforms & exposed_domains
+            )
+        ]
+        stats.size = len(self._tools)
+        return tools
+
+
+INTENT_TOOL_CATALOG: HassKey[IntentToolCatalog] = HassKey(f"{DOMAIN}_intent_tools")
+
+
+@callback
+def async_get_intent_tool_catalog(hass: HomeAssistant) -> IntentToolCatalog:
+    """Return the intent tool catalog, creating it if needed."""
+    if (catalog := hass.data.get(INTENT_TOOL_CATALOG)) is None:
+        catalog = hass.data[INTENT_TOOL_CATALOG] = IntentToolCatalog(hass)
+    return catalog
+
+
 def _get_exposed_entities(
-    hass: HomeAssistant, assistant: str, include_state: bool = True
+    hass: HomeAssistant,
+    assistant: str,
+    include_state: bool = True,
+    states: Iterable[State] | None = None,
 ) -> dict[str, dict[str, Any]]:
-    """Get exposed entities."""
+    """Get exposed entities, optionally only those among the given states."""
     area_registry = ar.async_get(hass)
     entity_registry = er.async_get(hass)
     device_registry = dr.async_get(hass)
@@ -298,7 +394,7 @@ def _get_exposed_entities(
 
     entities = {}
 
-    for state in hass.states.async_all():
+    for state in hass.states.async_all() if states is None else states:
         if not async_should_expose(hass, assistant, state.entity_id):
             continue
 
@@ -401,8 +497,11 @@ def _get_cached_script_parameters(
                 EVENT_HOMEASSISTANT_CLOSE, on_homeassistant_close
             )
 
+        stats = get_cache_stats(hass, "script_parameters")
         if entity_entry.unique_id in parameters_cache:
+            stats.hit()
             return parameters_cache[entity_entry.unique_id]
+        stats.miss()
 
         if service_desc := service.async_get_cached_service_description(
             hass, SCRIPT_DOMAIN, entity_entry.unique_id
@@ -443,14 +542,188 @@ def _get_cached_script_parameters(
                     description = "Aliases: " + str(list(aliases))
 
             parameters_cache[entity_entry.unique_id] = (description, parameters)
+            stats.size = len(parameters_cache)
 
     return description, parameters
 
 
+def _is_script_with_fields(hass: HomeAssistant, state: State) -> bool:
+    """Return whether a state is a script that is offered as a tool instead."""
+    if state.domain != SCRIPT_DOMAIN:
+        return False
+    return bool(_get_cached_script_parameters(hass, state.entity_id)[1].schema)
+
+
 SCRIPT_PARAMETERS_CACHE: HassKey[dict[str, tuple[str | None, vol.Schema]]] = HassKey(
     "llm_script_parameters_cache"
 )
 
+# Seconds to wait after the last script service is registered before warming up
+SCRIPT_WARM_UP_COOLDOWN = 1
+
+
+class ScriptToolCache:
+    """Script tools reused across requests instead of built for each one.
+
+    A tool holds the script's name, description and parameter schema, so it
+    is dropped when the script is reloaded or removed, or when its entity is
+    renamed. After a reload, every script is rebuilt again in one pass.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._tools: dict[str, llm.ScriptTool] = {}
+        self._unsubscribes: list[CALLBACK_TYPE] = []
+        self._warm_up_debouncer = Debouncer(
+            hass,
+            LOGGER,
+            cooldown=SCRIPT_WARM_UP_COOLDOWN,
+            immediate=False,
+            function=self.async_warm_up,
+        )
+
+    @callback
+    def async_get(self, entity_id: str) -> llm.ScriptTool:
+        """Return the tool for a script, building it if needed."""
+        stats = get_cache_stats(self.hass, "script_tools")
+        if (tool := self._tools.get(entity_id)) is not None:
+            stats.hit()
+            return tool
+        stats.miss()
+        tool = self._tools[entity_id] = llm.ScriptTool(self.hass, entity_id)
+        stats.size = len(self._tools)
+        return tool
+
+    @callback
+    def async_warm_up(self) -> None:
+        """Build the parameters and tool of every script that isn't cached."""
+        start = time.perf_counter()
+        built = 0
+        for state in self.hass.states.async_all(SCRIPT_DOMAIN):
+            if state.entity_id in self._tools:
+                continue
+            _get_cached_script_parameters(self.hass, state.entity_id)
+            self._tools[state.entity_id] = llm.ScriptTool(self.hass, state.entity_id)
+            built += 1
+        get_cache_stats(self.hass, "script_tools").size = len(self._tools)
+        LOGGER.debug(
+            "Built %d script tools in %.1f ms",
+            built,
+            (time.perf_counter() - start) * 1000,
+        )
+
+    @callback
+    def async_invalidate(self, event: Event | None = None) -> None:
+        """Drop every tool."""
+        self._tools.clear()
+
+    @callback
+    def _async_service_changed(self, event: Event) -> None:
+        """Drop tools when scripts are removed and rebuild them once re-added."""
+        if event.data[ATTR_DOMAIN] != SCRIPT_DOMAIN:
+            return
+        if event.event_type == EVENT_SERVICE_REMOVED:
+            self.async_invalidate()
+        else:
+            self._warm_up_debouncer.async_schedule_call()
+
+    @callback
+    def _async_script_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Drop the tool of a script that was removed or renamed."""
+        self._tools.pop(event.data["entity_id"], None)
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for changes that make tools stale."""
+        bus = self.hass.bus
+        self._unsubscribes.extend(
+            (
+                bus.async_listen(EVENT_SERVICE_REMOVED, self._async_service_changed),
+                bus.async_listen(
+                    EVENT_SERVICE_REGISTERED, self._async_service_changed
+                ),
+                bus.async_listen(
+                    er.EVENT_ENTITY_REGISTRY_UPDATED,
+                    self._async_script_changed,
+                    event_filter=_is_script_event,
+                ),
+                bus.async_listen(
+                    EVENT_STATE_CHANGED,
+                    self._async_script_changed,
+                    event_filter=_script_removed_or_renamed,
+                ),
+            )
+        )
+        bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_stop)
+
+    @callback
+    def _async_stop(self, event: Event) -> None:
+        """Stop listening."""
+        self._warm_up_debouncer.async_cancel()
+        while self._unsubscribes:
+            self._unsubscribes.pop()()
+
+
+@callback
+def _is_script_event(event_data: er.EventEntityRegistryUpdatedData) -> bool:
+    """Return whether a registry update is for a script."""
+    return split_entity_id(event_data["entity_id"])[0] == SCRIPT_DOMAIN
+
+
+@callback
+def _script_removed_or_renamed(event_data: EventStateChangedData) -> bool:
+    """Return whether a state change removes or renames a script."""
+    if split_entity_id(event_data["entity_id"])[0] != SCRIPT_DOMAIN:
+        return False
+    old_state = event_data["old_state"]
+    new_state = event_data["new_state"]
+    return (
+        old_state is not None
+        and (new_state is None or old_state.name != new_state.name)
+    )
+
+
+SCRIPT_TOOL_CACHE: HassKey[ScriptToolCache] = HassKey(f"{DOMAIN}_script_tools")
+
+
+@callback
+def async_get_script_tool_cache(hass: HomeAssistant) -> ScriptToolCache:
+    """Return the script tool cache, creating it if needed."""
+    if (cache := hass.data.get(SCRIPT_TOOL_CACHE)) is None:
+        cache = hass.data[SCRIPT_TOOL_CACHE] = ScriptToolCache(hass)
+        cache.async_start()
+    return cache
+
+
+@dataclass(kw_only=True)
+class MeteredAPIInstance(llm.APIInstance):
+    """An API instance that records the count and duration of tool calls."""
+
+    metrics: Metrics
+
+    async def async_call_tool(self, tool_input: llm.ToolInput) -> JsonObjectType:
+        """Call a tool, recording it in the entry's metrics."""
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await super().async_call_tool(tool_input)
+            failed = False
+            return result
+        finally:
+            self.metrics.record_tool_call(
+                tool_input.tool_name, time.perf_counter() - started, failed
+            )
+
+
+LIVE_CONTEXT_UNCHANGED = (
+    "Live Context: Nothing has changed since the last call with the same filters."
+)
+LIVE_CONTEXT_CHANGED = (
+    "Live Context: Only the devices that changed since the last call with the "
+    "same filters; all others are as they were:"
+)
+
 
 def _live_context_match_error(
     match_result: intent.MatchTargetsResult,
@@ -490,7 +763,9 @@ class GetLiveContextTool(llm.Tool):
         "rainy, turn off sprinklers' requires checking the weather first). "
         "You may filter for devices by name, domain, and area, including "
         "combining those filters. Prefer filtering by domain when searching "
-        "for multiple devices of the same type."
+        "for multiple devices of the same type. "
+        "When called again with the same filters, only devices that changed "
+        "since the last call are returned; set full to get all of them."
     )
     parameters = vol.Schema(
         {
@@ -509,9 +784,20 @@ class GetLiveContextTool(llm.Tool):
                 "area",
                 description="Filter entities by area name or alias (case-insensitive).",
             ): cv.string,
+            vol.Optional(
+                "full",
+                description=(
+                    "Return every matching entity, even those unchanged since "
+                    "the last call."
+                ),
+            ): cv.boolean,
         }
     )
 
+    def __init__(self, chat_log: ChatLog | None = None) -> None:
+        """Initialize the tool, remembering results per conversation if given a chat log."""
+        self.chat_log = chat_log
+
     async def async_call(
         self,
         hass: HomeAssistant,
@@ -520,13 +806,6 @@ class GetLiveContextTool(llm.Tool):
     ) -> JsonObjectType:
         """Get the current state of exposed entities."""
         args = self.parameters(tool_input.tool_args)
-        exposed_entities = _get_exposed_entities(
-            hass, llm_context.assistant, include_state=True
-        )
-
-        if not exposed_entities:
-            return {"success": False, "error": "No entities are exposed"}
-
         name_filter = args.get("name")
         area_filter = args.get("area")
         domain_filter = args.get("domain")
@@ -541,11 +820,25 @@ class GetLiveContextTool(llm.Tool):
                 if (normalized_domain := domain.strip().lower())
             ]
 
-        if name_filter or area_filter or domain_filter:
+        if not (name_filter or area_filter or domain_filter):
+            entities = _get_exposed_entities(
+                hass, llm_context.assistant, include_state=True
+            )
+            if not entities:
+                return {"success": False, "error": "No entities are exposed"}
+        else:
+            # Narrow down with the index, so only likely matches are matched
+            # and only the matches are serialized
+            index = async_get_exposed_entity_index(hass, llm_context.assistant)
+            if not index.entity_ids:
+                return {"success": False, "error": "No entities are exposed"}
             exposed_states = [
                 state
-                for entity_id in exposed_entities
+                for entity_id in index.candidates(
+                    name_filter, area_filter, domain_filter
+                )
                 if (state := hass.states.get(entity_id)) is not None
+                and not _is_script_with_fields(hass, state)
             ]
             match_result = intent.async_match_targets(
                 hass,
@@ -569,19 +862,45 @@ class GetLiveContextTool(llm.Tool):
                     ),
                 }
 
-            matched_ids = {state.entity_id for state in match_result.states}
-            entities = [
-                info
-                for entity_id, info in exposed_entities.items()
-                if entity_id in matched_ids
-            ]
-        else:
-            entities = list(exposed_entities.values())
+            entities = _get_exposed_entities(
+                hass,
+                llm_context.assistant,
+                include_state=True,
+                states=match_result.states,
+            )
 
-        prompt = [
-            "Live Context: An overview of the areas and the devices in this smart home:",
-            yaml_util.dump(entities),
-        ]
+        delta = None
+        if self.chat_log is not None:
+            delta = get_live_context_memory(
+                hass, self.chat_log.conversation_id
+            ).remember(
+                (name_filter, area_filter, tuple(domain_filter or ())),
+                entities,
+                tool_input.id,
+                {
+                    content.tool_call_id
+                    for content in self.chat_log.content
+                    if isinstance(content, ToolResultContent)
+                },
+                full=args.get("full", False),
+            )
+
+        with loop_section(hass, SECTION_DUMP_ENTITIES):
+            if delta is None:
+                prompt = [
+                    "Live Context: An overview of the areas and the devices in this smart home:",
+                    yaml_util.dump(list(entities.values())),
+                ]
+            elif not (delta.changed or delta.removed):
+                prompt = [LIVE_CONTEXT_UNCHANGED]
+            else:
+                prompt = [LIVE_CONTEXT_CHANGED]
+                if delta.changed:
+                    prompt.append(yaml_util.dump(list(delta.changed.values())))
+                if delta.removed:
+                    prompt.append(
+                        "No longer matching: " + "; ".join(delta.removed)
+                    )
         return {
             "success": True,
             "result": "\n".join(prompt),
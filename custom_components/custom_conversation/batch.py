@@ -0,0 +1,531 @@
+"""Provider batch jobs for prompts that don't need an answer right away.
+
+OpenAI and Gemini run batches of requests at a discount in exchange for
+answering within a day instead of immediately. A batch is submitted with
+the entry's primary provider credentials, then polled in the background
+with a growing interval, and an event with every result is fired when the
+job finishes. Jobs still running are saved, so polling picks up again
+after Home Assistant restarts or the entry is reloaded.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass, field
+import json
+import time
+from typing import Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    BATCH_COMPLETED_EVENT,
+    CONF_PRIMARY_API_KEY,
+    CONF_PRIMARY_BASE_URL,
+    CONF_PRIMARY_CHAT_MODEL,
+    CONF_PRIMARY_PROVIDER,
+    DOMAIN,
+    LOGGER,
+)
+
+BATCH_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60)
+# Seconds between polls, doubling after each one up to the maximum
+BATCH_POLL_INITIAL_INTERVAL = 30
+BATCH_POLL_MAX_INTERVAL = 1800
+# Providers promise results within 24 hours; give up a little after that
+BATCH_MAX_WAIT = 25 * 3600
+
+BATCH_STATUS_COMPLETED = "completed"
+BATCH_STATUS_FAILED = "failed"
+BATCH_STATUS_EXPIRED = "expired"
+BATCH_STATUS_CANCELLED = "cancelled"
+
+# Batches still being polled, so they can be resumed after a restart
+STORAGE_KEY = f"{DOMAIN}_batch_jobs"
+STORAGE_VERSION = 1
+
+OPENAI_DEFAULT_BASE_URL = "https://api.openai.com/v1"
+GEMINI_DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+_OPENAI_STATUSES = {
+    "completed": BATCH_STATUS_COMPLETED,
+    "failed": BATCH_STATUS_FAILED,
+    "expired": BATCH_STATUS_EXPIRED,
+    "cancelled": BATCH_STATUS_CANCELLED,
+}
+_GEMINI_STATUSES = {
+    "BATCH_STATE_SUCCEEDED": BATCH_STATUS_COMPLETED,
+    "BATCH_STATE_FAILED": BATCH_STATUS_FAILED,
+    "BATCH_STATE_EXPIRED": BATCH_STATUS_EXPIRED,
+    "BATCH_STATE_CANCELLED": BATCH_STATUS_CANCELLED,
+}
+
+
+class BatchError(HomeAssistantError):
+    """A batch job could not be submitted or checked."""
+
+
+def _error_message(error: Any) -> str:
+    """Return the message of an error object from a batch result."""
+    if isinstance(error, dict):
+        return str(error.get("message", ""))
+    return str(error)
+
+
+@dataclass
+class BatchJob:
+    """The state of a submitted batch job."""
+
+    batch_id: str
+    # None while the job is still running
+    status: str | None = None
+    # Answer or error for each prompt id, once the job has finished
+    results: dict[str, dict[str, Any]] = field(default_factory=dict)
+    error: str | None = None
+
+
+class BatchClient(ABC):
+    """Submits and checks batch jobs on one provider."""
+
+    default_base_url: str
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str | None,
+        base_url: str | None,
+        model: str,
+    ) -> None:
+        """Initialize the client."""
+        self.session = session
+        self.api_key = api_key
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        self.model = model
+
+    async def _async_request(
+        self, method: str, path: str, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """Send a request and return the response, raising on an error status."""
+        try:
+            response = await self.session.request(
+                method,
+                f"{self.base_url}{path}",
+                headers=self._headers(),
+                timeout=BATCH_REQUEST_TIMEOUT,
+                **kwargs,
+            )
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise BatchError(f"Error talking to the batch API: {err}") from err
+        if response.status >= 400:
+            raise BatchError(
+                f"Batch API returned {response.status}: {await response.text()}"
+            )
+        return response
+
+    async def _async_request_json(
+        self, method: str, path: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Send a request and return its JSON body."""
+        response = await self._async_request(method, path, **kwargs)
+        try:
+            return await response.json(content_type=None)
+        except ValueError as err:
+            raise BatchError("Batch API returned invalid JSON") from err
+
+    @abstractmethod
+    def _headers(self) -> dict[str, str]:
+        """Return the headers that authenticate a request."""
+
+    @abstractmethod
+    async def async_submit(self, prompts: dict[str, str]) -> str:
+        """Submit prompts, keyed by id, and return the batch id."""
+
+    @abstractmethod
+    async def async_check(self, batch_id: str) -> BatchJob:
+        """Return the state of a batch, with its results once finished."""
+
+
+class OpenAIBatchClient(BatchClient):
+    """Batch jobs through the OpenAI files and batches endpoints."""
+
+    default_base_url = OPENAI_DEFAULT_BASE_URL
+
+    def _headers(self) -> dict[str, str]:
+        """Return the headers that authenticate a request."""
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    async def async_submit(self, prompts: dict[str, str]) -> str:
+        """Upload the prompts as a JSON lines file and start a batch on it."""
+        lines = "\n".join(
+            json.dumps(
+                {
+                    "custom_id": prompt_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": [{"role": "user", "content": prompt}],
+                    },
+                }
+            )
+            for prompt_id, prompt in prompts.items()
+        )
+        form = aiohttp.FormData()
+        form.add_field("purpose", "batch")
+        form.add_field(
+            "file",
+            lines.encode(),
+            filename="batch.jsonl",
+            content_type="application/jsonl",
+        )
+        upload = await self._async_request_json("POST", "/files", data=form)
+        batch = await self._async_request_json(
+            "POST",
+            "/batches",
+            json={
+                "input_file_id": upload["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+        return batch["id"]
+
+    async def async_check(self, batch_id: str) -> BatchJob:
+        """Check a batch and download its output and error files when done."""
+        batch = await self._async_request_json("GET", f"/batches/{batch_id}")
+        job = BatchJob(batch_id, _OPENAI_STATUSES.get(batch.get("status", "")))
+        if job.status is None:
+            return job
+        if errors := (batch.get("errors") or {}).get("data"):
+            job.error = "; ".join(error.get("message", "") for error in errors)
+        for file_key in ("output_file_id", "error_file_id"):
+            if file_id := batch.get(file_key):
+                response = await self._async_request(
+                    "GET", f"/files/{file_id}/content"
+                )
+                for line in (await response.text()).splitlines():
+                    if line.strip():
+                        self._add_result(job, line)
+        return job
+
+    @staticmethod
+    def _add_result(job: BatchJob, line: str) -> None:
+        """Add the answer or error from one line of an output file.
+
+        A line that can't be tied to a prompt is skipped, which leaves that
+        prompt without a result.
+        """
+        try:
+            result = json.loads(line)
+            prompt_id = result["custom_id"]
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Skipping unreadable batch output line: %s", line[:200])
+            return
+        response = result.get("response") or {}
+        body = response.get("body") or {}
+        if error := result.get("error") or body.get("error"):
+            job.results[prompt_id] = {"error": _error_message(error)}
+            return
+        try:
+            content = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            job.results[prompt_id] = {"error": "No answer in the batch output"}
+            return
+        job.results[prompt_id] = {"response": content}
+
+
+class GeminiBatchClient(BatchClient):
+    """Batch jobs through the Gemini batchGenerateContent endpoint."""
+
+    default_base_url = GEMINI_DEFAULT_BASE_URL
+
+    def _headers(self) -> dict[str, str]:
+        """Return the headers that authenticate a request."""
+        return {"x-goog-api-key": self.api_key or ""}
+
+    async def async_submit(self, prompts: dict[str, str]) -> str:
+        """Start a batch with the prompts sent inline."""
+        operation = await self._async_request_json(
+            "POST",
+            f"/v1beta/models/{self.model}:batchGenerateContent",
+            json={
+                "batch": {
+                    "display_name": "custom_conversation",
+                    "input_config": {
+                        "requests": {
+                            "requests": [
+                                {
+                                    "request": {
+                                        "contents": [
+                                            {
+                                                "role": "user",
+                                                "parts": [{"text": prompt}],
+                                            }
+                                        ]
+                                    },
+                                    "metadata": {"key": prompt_id},
+                                }
+                                for prompt_id, prompt in prompts.items()
+                            ]
+                        }
+                    },
+                }
+            },
+        )
+        return operation["name"]
+
+    async def async_check(self, batch_id: str) -> BatchJob:
+        """Check a batch, reading its inline results when done."""
+        operation = await self._async_request_json("GET", f"/v1beta/{batch_id}")
+        metadata = operation.get("metadata") or {}
+        job = BatchJob(batch_id, _GEMINI_STATUSES.get(metadata.get("state", "")))
+        if job.status is None:
+            return job
+        if error := operation.get("error"):
+            job.error = error.get("message")
+        output = (operation.get("response") or metadata.get("output") or {}).get(
+            "inlinedResponses"
+        ) or {}
+        for index, item in enumerate(output.get("inlinedResponses", [])):
+            prompt_id = (item.get("metadata") or {}).get("key", str(index))
+            job.results[prompt_id] = self._parse_result(item)
+        return job
+
+    @staticmethod
+    def _parse_result(item: dict[str, Any]) -> dict[str, Any]:
+        """Return the answer or error from one inline response."""
+        if error := item.get("error"):
+            return {"error": _error_message(error)}
+        response = item.get("response") or {}
+        try:
+            parts = response["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError):
+            # Prompts blocked for safety come back without candidates
+            feedback = response.get("promptFeedback") or {}
+            return {
+                "error": f"No answer: {feedback['blockReason']}"
+                if feedback.get("blockReason")
+                else "No answer in the batch output"
+            }
+        return {"response": "".join(part.get("text", "") for part in parts)}
+
+
+BATCH_CLIENTS: dict[str, type[BatchClient]] = {
+    "openai": OpenAIBatchClient,
+    "gemini": GeminiBatchClient,
+}
+
+
+def get_batch_client(
+    hass: HomeAssistant, entry: ConfigEntry, model: str | None = None
+) -> BatchClient:
+    """Return a batch client for the entry's primary provider."""
+    provider_key = entry.data.get(CONF_PRIMARY_PROVIDER)
+    if (client_class := BATCH_CLIENTS.get(provider_key)) is None:
+        raise BatchError(f"Batch jobs are not supported for {provider_key}")
+    return client_class(
+        async_get_clientsession(hass),
+        entry.data.get(CONF_PRIMARY_API_KEY),
+        entry.data.get(CONF_PRIMARY_BASE_URL),
+        model or entry.data[CONF_PRIMARY_CHAT_MODEL],
+    )
+
+
+class PendingBatches:
+    """Batch jobs that are still being polled, saved across restarts."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the pending batches."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the saved jobs, once."""
+        async with self._load_lock:
+            if not self._loaded:
+                self._jobs = await self._store.async_load() or {}
+                self._loaded = True
+
+    def for_entry(self, entry_id: str) -> dict[str, dict[str, Any]]:
+        """Return the saved jobs of an entry, by batch id."""
+        return {
+            batch_id: job
+            for batch_id, job in self._jobs.items()
+            if job["entry_id"] == entry_id
+        }
+
+    async def async_add(
+        self,
+        batch_id: str,
+        entry_id: str,
+        model: str,
+        prompt_ids: list[str],
+        submitted_at: float,
+    ) -> None:
+        """Save a job that was just submitted."""
+        await self.async_load()
+        self._jobs[batch_id] = {
+            "entry_id": entry_id,
+            "model": model,
+            "prompt_ids": prompt_ids,
+            "submitted_at": submitted_at,
+        }
+        await self._store.async_save(self._jobs)
+
+    async def async_remove(self, *batch_ids: str) -> None:
+        """Forget jobs that have finished or can't be followed anymore."""
+        await self.async_load()
+        removed = [self._jobs.pop(batch_id, None) for batch_id in batch_ids]
+        if any(job is not None for job in removed):
+            await self._store.async_save(self._jobs)
+
+
+PENDING_BATCHES: HassKey[PendingBatches] = HassKey(f"{DOMAIN}_pending_batches")
+
+
+async def async_get_pending_batches(hass: HomeAssistant) -> PendingBatches:
+    """Return the saved batch jobs, loading them on first use."""
+    if (pending := hass.data.get(PENDING_BATCHES)) is None:
+        pending = hass.data[PENDING_BATCHES] = PendingBatches(hass)
+    await pending.async_load()
+    return pending
+
+
+def _fire_batch_completed(
+    hass: HomeAssistant, entry_id: str, job: BatchJob, prompt_ids: list[str]
+) -> None:
+    """Fire the event with the result of every prompt in a batch."""
+    hass.bus.async_fire(
+        BATCH_COMPLETED_EVENT,
+        {
+            "config_entry": entry_id,
+            "batch_id": job.batch_id,
+            "status": job.status,
+            "error": job.error,
+            "results": [
+                {
+                    "id": prompt_id,
+                    **job.results.get(prompt_id, {"error": "No result returned"}),
+                }
+                for prompt_id in prompt_ids
+            ],
+        },
+    )
+
+
+async def async_wait_for_batch(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    client: BatchClient,
+    batch_id: str,
+    prompt_ids: list[str],
+    *,
+    submitted_at: float | None = None,
+) -> None:
+    """Poll a batch until it finishes, then fire an event with the results.
+
+    Errors from the batch API while polling are logged and retried at the
+    next interval, so a short provider or network outage doesn't lose the
+    job. Any other error ends polling with a failed event. If polling is
+    cancelled, by a restart or reload, the job stays saved to be resumed.
+    """
+    interval = BATCH_POLL_INITIAL_INTERVAL
+    # Wall clock time, since a resumed job was submitted before a restart
+    give_up_at = (submitted_at or time.time()) + BATCH_MAX_WAIT
+    job = BatchJob(batch_id)
+    while time.time() < give_up_at:
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, BATCH_POLL_MAX_INTERVAL)
+        try:
+            job = await client.async_check(batch_id)
+        except BatchError as err:
+            LOGGER.warning("Error checking batch %s: %s", batch_id, err)
+            continue
+        except Exception as err:  # noqa: BLE001 - the job must still be reported
+            LOGGER.exception("Unexpected error checking batch %s", batch_id)
+            job = BatchJob(batch_id, BATCH_STATUS_FAILED, error=str(err))
+            break
+        if job.status is not None:
+            break
+    else:
+        job.status = BATCH_STATUS_EXPIRED
+        job.error = "Gave up waiting for the batch to finish"
+
+    LOGGER.debug("Batch %s finished with status %s", batch_id, job.status)
+    await (await async_get_pending_batches(hass)).async_remove(batch_id)
+    _fire_batch_completed(hass, entry.entry_id, job, prompt_ids)
+
+
+def _async_start_polling(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    client: BatchClient,
+    batch_id: str,
+    prompt_ids: list[str],
+    *,
+    submitted_at: float,
+) -> None:
+    """Poll a batch in a task that is cancelled when the entry unloads."""
+    entry.async_create_background_task(
+        hass,
+        async_wait_for_batch(
+            hass, entry, client, batch_id, prompt_ids, submitted_at=submitted_at
+        ),
+        f"{DOMAIN}_batch_{batch_id}",
+    )
+
+
+async def async_track_batch(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    client: BatchClient,
+    batch_id: str,
+    prompt_ids: list[str],
+) -> None:
+    """Save a submitted batch and start polling it."""
+    submitted_at = time.time()
+    await (await async_get_pending_batches(hass)).async_add(
+        batch_id, entry.entry_id, client.model, prompt_ids, submitted_at
+    )
+    _async_start_polling(
+        hass, entry, client, batch_id, prompt_ids, submitted_at=submitted_at
+    )
+
+
+async def async_resume_batches(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Resume polling the batches an entry had running before it was unloaded."""
+    pending = await async_get_pending_batches(hass)
+    for batch_id, job in pending.for_entry(entry.entry_id).items():
+        try:
+            client = get_batch_client(hass, entry, job["model"])
+        except BatchError as err:
+            # The entry's primary provider was changed to one without batches
+            await pending.async_remove(batch_id)
+            _fire_batch_completed(
+                hass,
+                entry.entry_id,
+                BatchJob(batch_id, BATCH_STATUS_FAILED, error=str(err)),
+                job["prompt_ids"],
+            )
+            continue
+        LOGGER.debug("Resuming batch %s", batch_id)
+        _async_start_polling(
+            hass,
+            entry,
+            client,
+            batch_id,
+            job["prompt_ids"],
+            submitted_at=job["submitted_at"],
+        )
@@ -1,5 +1,4 @@
 """Replaces Some of Home Assistant's helpers/llm.py code to allow us to choose the correct prompt."""
-from langfuse import get_client as get_langfuse_client, observe
 
 from homeassistant.components.conversation import (
     ChatLog,
@@ -15,9 +14,21 @@ from homeassistant.helpers import intent, llm
 from . import CustomConversationConfigEntry
 from .api import CustomLLMAPI
 from .const import DOMAIN, LLM_API_ID, LOGGER
+from .lazy_imports import get_langfuse_client, observe
 from .prompt_manager import PromptContext, PromptManager
 
 
+def build_llm_context(user_input: ConversationInput) -> llm.LLMContext:
+    """Return the context tools are called with for a conversation input."""
+    return llm.LLMContext(
+        platform=DOMAIN,
+        context=user_input.context,
+        language=user_input.language,
+        assistant="conversation", # Todo: Confirm
+        device_id=user_input.device_id,
+    )
+
+
 @observe(name="cc_update_llm_data", capture_input=False)
 async def async_update_llm_data(
     hass: HomeAssistant,
@@ -33,13 +44,7 @@ async def async_update_llm_data(
     to allow us to implement prompt management
     """
 
-    llm_context = llm.LLMContext(
-        platform=DOMAIN,
-        context=user_input.context,
-        language=user_input.language,
-        assistant="conversation", # Todo: Confirm
-        device_id=user_input.device_id,
-    )
+    llm_context = build_llm_context(user_input)
 
     user_name: str | None = None
 
@@ -62,6 +67,7 @@ async def async_update_llm_data(
                     hass,
                     user_name,
                     conversation_config_entry=config_entry,
+                    chat_log=chat_log,
                 )
                 if (
                     langfuse_client := hass.data.get(DOMAIN,{})
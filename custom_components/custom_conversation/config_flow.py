@@ -4,7 +4,6 @@ from __future__ import annotations
 
 from typing import Any
 
-from litellm.exceptions import APIConnectionError, AuthenticationError
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
@@ -15,6 +14,7 @@ from homeassistant.helpers import intent, llm
 from homeassistant.helpers.selector import (
     NumberSelector,
     NumberSelectorConfig,
+    NumberSelectorMode,
     SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
@@ -30,6 +30,10 @@ from .const import (
     CONF_ENABLE_HASS_AGENT,
     CONF_ENABLE_LANGFUSE,
     CONF_ENABLE_LLM_AGENT,
+    CONF_ENTITY_ENCODING,
+    CONF_FIRST_TOKEN_TIMEOUT,
+    CONF_HEDGE_DELAY,
+    CONF_HEDGE_TARGET,
     CONF_IGNORED_INTENTS,
     CONF_IGNORED_INTENTS_SECTION,
     CONF_INSTRUCTIONS_PROMPT,
@@ -44,7 +48,12 @@ from .const import (
     CONF_LANGFUSE_SECTION,
     CONF_LANGFUSE_TAGS,
     CONF_LANGFUSE_TRACING_ENABLED,
+    CONF_LOOP_MONITOR,
+    CONF_LOOP_MONITOR_THRESHOLD,
     CONF_MAX_TOKENS,
+    CONF_PERFORMANCE_SECTION,
+    CONF_PREWARM_COMPLETION,
+    CONF_PREWARM_ENABLED,
     CONF_PRIMARY_API_KEY,
     CONF_PRIMARY_BASE_URL,
     CONF_PRIMARY_CHAT_MODEL,
@@ -55,6 +64,9 @@ from .const import (
     CONF_PROMPT_EXPOSED_ENTITIES,
     CONF_PROMPT_NO_ENABLED_ENTITIES,
     CONF_PROMPT_TIMERS_UNSUPPORTED,
+    CONF_PROMPT_TOKEN_LIMIT,
+    CONF_RECORD_STREAMS,
+    CONF_ROUTING_MODE,
     CONF_SECONDARY_API_KEY,
     CONF_SECONDARY_BASE_URL,
     CONF_SECONDARY_CHAT_MODEL,
@@ -62,6 +74,7 @@ from .const import (
     CONF_SECONDARY_PROVIDER_ENABLED,
     CONF_TEMPERATURE,
     CONF_TOP_P,
+    CONF_TURN_TIMEOUT,
     CONFIG_VERSION,
     CONFIGURING_SECONDARY_PROVIDER,
     DEFAULT_API_PROMPT_BASE,
@@ -70,15 +83,40 @@ from .const import (
     DEFAULT_API_PROMPT_EXPOSED_ENTITIES,
     DEFAULT_API_PROMPT_TIMERS_UNSUPPORTED,
     DEFAULT_BASE_PROMPT,
+    DEFAULT_ENTITY_ENCODING,
+    DEFAULT_FIRST_TOKEN_TIMEOUT,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_TARGET,
     DEFAULT_INSTRUCTIONS_PROMPT,
+    DEFAULT_LOOP_MONITOR,
+    DEFAULT_LOOP_MONITOR_THRESHOLD,
     DEFAULT_MAX_TOKENS,
+    DEFAULT_PREWARM_COMPLETION,
+    DEFAULT_PREWARM_ENABLED,
     DEFAULT_PROMPT_NO_ENABLED_ENTITIES,
+    DEFAULT_PROMPT_TOKEN_LIMIT,
+    DEFAULT_RECORD_STREAMS,
+    DEFAULT_ROUTING_MODE,
     DEFAULT_TEMPERATURE,
     DEFAULT_TOP_P,
+    DEFAULT_TURN_TIMEOUT,
     DOMAIN,
+    ENTITY_ENCODING_COMPACT,
+    ENTITY_ENCODING_YAML,
+    HEDGE_TARGET_SAME,
+    HEDGE_TARGET_SECONDARY,
     LOGGER,
+    ROUTING_MODE_FALLBACK,
+    ROUTING_MODE_LATENCY,
+)
+from .lazy_imports import LITELLM, async_import
+from .providers import (
+    CannotConnect,
+    InvalidAuth,
+    LiteLLMProvider,
+    get_provider,
+    get_supported_providers,
 )
-from .providers import SUPPORTED_PROVIDERS, LiteLLMProvider, get_provider
 
 _LOGGER = LOGGER
 
@@ -111,6 +149,20 @@ DEFAULT_OPTIONS = {
         CONF_LANGFUSE_TAGS: [],
         CONF_LANGFUSE_SCORE_ENABLED: False,
     },
+    CONF_PERFORMANCE_SECTION: {
+        CONF_PREWARM_ENABLED: DEFAULT_PREWARM_ENABLED,
+        CONF_PREWARM_COMPLETION: DEFAULT_PREWARM_COMPLETION,
+        CONF_ROUTING_MODE: DEFAULT_ROUTING_MODE,
+        CONF_HEDGE_DELAY: DEFAULT_HEDGE_DELAY,
+        CONF_HEDGE_TARGET: DEFAULT_HEDGE_TARGET,
+        CONF_TURN_TIMEOUT: DEFAULT_TURN_TIMEOUT,
+        CONF_FIRST_TOKEN_TIMEOUT: DEFAULT_FIRST_TOKEN_TIMEOUT,
+        CONF_ENTITY_ENCODING: DEFAULT_ENTITY_ENCODING,
+        CONF_PROMPT_TOKEN_LIMIT: DEFAULT_PROMPT_TOKEN_LIMIT,
+        CONF_RECORD_STREAMS: DEFAULT_RECORD_STREAMS,
+        CONF_LOOP_MONITOR: DEFAULT_LOOP_MONITOR,
+        CONF_LOOP_MONITOR_THRESHOLD: DEFAULT_LOOP_MONITOR_THRESHOLD,
+    },
 }
 
 
@@ -136,8 +188,8 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         api_key = user_input.get(conf_api_key)
         base_url = user_input.get(conf_base_url)
 
-        return await self.hass.async_add_executor_job(
-            lambda: provider.get_supported_models(base_url=base_url, api_key=api_key),
+        return await provider.async_get_supported_models(
+            self.hass, base_url=base_url, api_key=api_key
         )
 
     def _build_credentials_schema(
@@ -245,12 +297,12 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         schema = vol.Schema(
             {
                 vol.Required(
-                    conf_provider, default=SUPPORTED_PROVIDERS[0].key
+                    conf_provider, default=get_supported_providers()[0].key
                 ): SelectSelector(
                     SelectSelectorConfig(
                         options=[
                             SelectOptionDict(label=p.provider_name, value=p.key)
-                            for p in SUPPORTED_PROVIDERS
+                            for p in get_supported_providers()
                         ]
                     )
                 )
@@ -262,6 +314,8 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the credentials step."""
+        # Provider base URLs come from LiteLLM
+        await async_import(LITELLM)
         errors: dict[str, str] = {}
         is_secondary = self._flow_data.get(CONFIGURING_SECONDARY_PROVIDER)
         if is_secondary:
@@ -277,9 +331,9 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
                     self._flow_data, is_secondary=is_secondary
                 )
                 return await self.async_step_model(valid_models=valid_models)
-            except AuthenticationError:
+            except InvalidAuth:
                 errors["base"] = "invalid_auth"
-            except APIConnectionError:
+            except CannotConnect:
                 errors["base"] = "cannot_connect"
 
         schema = self._build_credentials_schema(is_secondary=is_secondary)
@@ -384,7 +438,7 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
                     SelectSelectorConfig(
                         options=[
                             SelectOptionDict(label=p.provider_name, value=p.key)
-                            for p in SUPPORTED_PROVIDERS
+                            for p in get_supported_providers()
                         ]
                     )
                 )
@@ -398,6 +452,8 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle credentials during reconfiguration."""
+        # Provider base URLs come from LiteLLM
+        await async_import(LITELLM)
         errors: dict[str, str] = {}
         is_secondary = self._flow_data.get(CONFIGURING_SECONDARY_PROVIDER)
         if is_secondary:
@@ -415,9 +471,9 @@ class CustomConversationConfigFlow(ConfigFlow, domain=DOMAIN):
                 return await self.async_step_reconfigure_model(
                     valid_models=valid_models
                 )
-            except AuthenticationError:
+            except InvalidAuth:
                 errors["base"] = "invalid_auth"
-            except APIConnectionError:
+            except CannotConnect:
                 errors["base"] = "cannot_connect"
 
         schema = self._build_credentials_schema(
@@ -749,6 +805,129 @@ class CustomConversationOptionsFlow(OptionsFlow):
                         }
                     )
                 ),
+                # Performance Section
+                vol.Required(CONF_PERFORMANCE_SECTION, default={}): section(
+                    vol.Schema(
+                        {
+                            vol.Optional(
+                                CONF_PREWARM_ENABLED,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_PREWARM_ENABLED, DEFAULT_PREWARM_ENABLED
+                                ),
+                            ): bool,
+                            vol.Optional(
+                                CONF_PREWARM_COMPLETION,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_PREWARM_COMPLETION, DEFAULT_PREWARM_COMPLETION
+                                ),
+                            ): bool,
+                            vol.Optional(
+                                CONF_ROUTING_MODE,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_ROUTING_MODE, DEFAULT_ROUTING_MODE
+                                ),
+                            ): SelectSelector(
+                                SelectSelectorConfig(
+                                    options=[ROUTING_MODE_FALLBACK, ROUTING_MODE_LATENCY],
+                                    translation_key=CONF_ROUTING_MODE,
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_HEDGE_DELAY,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY
+                                ),
+                            ): NumberSelector(
+                                NumberSelectorConfig(
+                                    min=0, max=10000, step=50, unit_of_measurement="ms"
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_HEDGE_TARGET,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_HEDGE_TARGET, DEFAULT_HEDGE_TARGET
+                                ),
+                            ): SelectSelector(
+                                SelectSelectorConfig(
+                                    options=[HEDGE_TARGET_SECONDARY, HEDGE_TARGET_SAME],
+                                    translation_key=CONF_HEDGE_TARGET,
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_TURN_TIMEOUT,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_TURN_TIMEOUT, DEFAULT_TURN_TIMEOUT
+                                ),
+                            ): NumberSelector(
+                                NumberSelectorConfig(
+                                    min=0, max=300, step=1, unit_of_measurement="s"
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_FIRST_TOKEN_TIMEOUT,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_FIRST_TOKEN_TIMEOUT, DEFAULT_FIRST_TOKEN_TIMEOUT
+                                ),
+                            ): NumberSelector(
+                                NumberSelectorConfig(
+                                    min=0, max=300, step=1, unit_of_measurement="s"
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_ENTITY_ENCODING,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_ENTITY_ENCODING, DEFAULT_ENTITY_ENCODING
+                                ),
+                            ): SelectSelector(
+                                SelectSelectorConfig(
+                                    options=[
+                                        ENTITY_ENCODING_YAML,
+                                        ENTITY_ENCODING_COMPACT,
+                                    ],
+                                    translation_key=CONF_ENTITY_ENCODING,
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_PROMPT_TOKEN_LIMIT,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_PROMPT_TOKEN_LIMIT, DEFAULT_PROMPT_TOKEN_LIMIT
+                                ),
+                            ): NumberSelector(
+                                NumberSelectorConfig(
+                                    min=0,
+                                    max=1000000,
+                                    step=500,
+                                    unit_of_measurement="tokens",
+                                    mode=NumberSelectorMode.BOX,
+                                )
+                            ),
+                            vol.Optional(
+                                CONF_RECORD_STREAMS,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_RECORD_STREAMS, DEFAULT_RECORD_STREAMS
+                                ),
+                            ): bool,
+                            vol.Optional(
+                                CONF_LOOP_MONITOR,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_LOOP_MONITOR, DEFAULT_LOOP_MONITOR
+                                ),
+                            ): bool,
+                            vol.Optional(
+                                CONF_LOOP_MONITOR_THRESHOLD,
+                                default=options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                                    CONF_LOOP_MONITOR_THRESHOLD,
+                                    DEFAULT_LOOP_MONITOR_THRESHOLD,
+                                ),
+                            ): NumberSelector(
+                                NumberSelectorConfig(
+                                    min=1, max=1000, step=1, unit_of_measurement="ms"
+                                )
+                            ),
+                        }
+                    ),
+                    {"collapsed": True},
+                ),
             }
         )
 
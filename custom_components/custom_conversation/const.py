@@ -24,6 +24,16 @@ CONFIGURING_SECONDARY_PROVIDER = "configuring_secondary_provider"
 DEFAULT_PROVIDER = "openai"
 
 SERVICE_GENERATE_IMAGE = "generate_image"
+DEFAULT_IMAGE_MODEL = "dall-e-3"
+# Images rendered at once per entry; further requests wait their turn
+IMAGE_GENERATION_CONCURRENCY = 2
+IMAGE_GENERATION_TIMEOUT = 120
+MAX_IMAGES_PER_PROMPT = 10
+SERVICE_GET_ROUTING_STATUS = "get_routing_status"
+SERVICE_PROCESS_BATCH = "process_batch"
+SERVICE_SUBMIT_BATCH_JOB = "submit_batch_job"
+DEFAULT_BATCH_PARALLELISM = 3
+MAX_BATCH_PARALLELISM = 10
 CONF_ENABLE_HASS_AGENT = "enable_home_assistant_agent"
 CONF_ENABLE_LLM_AGENT = "enable_llm_agent"
 CONF_AGENTS_SECTION = "agents"
@@ -43,6 +53,7 @@ HOME_ASSISTANT_AGENT = "conversation.home_assistant"
 CONVERSATION_STARTED_EVENT = f"{DOMAIN}_conversation_started"
 CONVERSATION_ENDED_EVENT = f"{DOMAIN}_conversation_ended"
 CONVERSATION_ERROR_EVENT = f"{DOMAIN}_conversation_error"
+BATCH_COMPLETED_EVENT = f"{DOMAIN}_batch_completed"
 
 CONF_CUSTOM_PROMPTS_SECTION = "custom_prompts"
 CONF_PROMPT_BASE = "prompt_base"
@@ -91,6 +102,12 @@ DEFAULT_API_PROMPT_EXPOSED_ENTITIES = (
     "An overview of the areas and the devices in this smart home:"
 )
 
+API_PROMPT_EXPOSED_ENTITIES_SUMMARY = (
+    "There are too many devices to list here, so these are only the number of "
+    "each kind of device in each area. Use the GetLiveContext tool to find "
+    "their names and current states."
+)
+
 # Langfuse Constants
 CONF_LANGFUSE_SECTION = "langfuse"
 CONF_ENABLE_LANGFUSE = "enable_langfuse"
@@ -108,6 +125,45 @@ LANGFUSE_SCORE_NAME = "cc_score"
 LANGFUSE_SCORE_POSITIVE = "positive"
 LANGFUSE_SCORE_NEGATIVE = "negative"
 
+# Performance Constants
+CONF_PERFORMANCE_SECTION = "performance"
+CONF_PREWARM_ENABLED = "prewarm_enabled"
+DEFAULT_PREWARM_ENABLED = True
+CONF_PREWARM_COMPLETION = "prewarm_completion"
+DEFAULT_PREWARM_COMPLETION = False
+CONF_ROUTING_MODE = "routing_mode"
+ROUTING_MODE_FALLBACK = "fallback"
+ROUTING_MODE_LATENCY = "latency"
+DEFAULT_ROUTING_MODE = ROUTING_MODE_FALLBACK
+# Milliseconds to wait for a first chunk before hedging; 0 disables hedging
+CONF_HEDGE_DELAY = "hedge_delay"
+DEFAULT_HEDGE_DELAY = 0
+CONF_HEDGE_TARGET = "hedge_target"
+HEDGE_TARGET_SECONDARY = "secondary"
+HEDGE_TARGET_SAME = "same"
+DEFAULT_HEDGE_TARGET = HEDGE_TARGET_SECONDARY
+# Seconds a whole turn may take, and seconds to wait for a first chunk (0: no limit)
+CONF_TURN_TIMEOUT = "turn_timeout"
+DEFAULT_TURN_TIMEOUT = 0
+CONF_FIRST_TOKEN_TIMEOUT = "first_token_timeout"
+DEFAULT_FIRST_TOKEN_TIMEOUT = 0
+# How exposed entities are written into the API prompt
+CONF_ENTITY_ENCODING = "entity_encoding"
+ENTITY_ENCODING_YAML = "yaml"
+ENTITY_ENCODING_COMPACT = "compact"
+DEFAULT_ENTITY_ENCODING = ENTITY_ENCODING_YAML
+# Estimated tokens the API prompt may use before entities are only summarized; 0 disables
+CONF_PROMPT_TOKEN_LIMIT = "prompt_token_limit"
+DEFAULT_PROMPT_TOKEN_LIMIT = 0
+CONF_RECORD_STREAMS = "record_streams"
+DEFAULT_RECORD_STREAMS = False
+# Log synchronous work on the event loop that takes longer than the threshold (ms)
+CONF_LOOP_MONITOR = "loop_monitor"
+DEFAULT_LOOP_MONITOR = False
+CONF_LOOP_MONITOR_THRESHOLD = "loop_monitor_threshold"
+DEFAULT_LOOP_MONITOR_THRESHOLD = 20
+TURN_TIMEOUT_RESPONSE = "Sorry, that took too long. Please try again."
+
 # These intents are deprecated, but also in the IGNORE_INTENTS list
 HASS_DEPRECATED_INTENTS = [
     "HassOpenCover",
@@ -0,0 +1,112 @@
+"""Memory of what GetLiveContext returned in each conversation.
+
+When the model calls GetLiveContext again with the same filters, it can be
+told that nothing changed, or be given only the entities that did, instead
+of the same full snapshot piling up in the message history. This is only
+safe while every earlier result the answer builds on is still in the chat
+log, so a full snapshot is sent whenever one of them is gone.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+# Conversations remembered at once; the least recently used is forgotten
+MAX_CONVERSATIONS = 100
+
+
+@dataclass
+class LiveContextSnapshot:
+    """The entities the model was last told about for one set of filters."""
+
+    entities: dict[str, dict[str, Any]]
+    # Tool calls whose results together add up to the entities above
+    tool_call_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class LiveContextDelta:
+    """Entities that changed or stopped matching since the last result."""
+
+    changed: dict[str, dict[str, Any]]
+    removed: list[str]
+
+
+class LiveContextMemory:
+    """What GetLiveContext returned in one conversation, per set of filters."""
+
+    def __init__(self) -> None:
+        """Initialize the memory."""
+        self.snapshots: dict[Hashable, LiveContextSnapshot] = {}
+
+    def remember(
+        self,
+        filters: Hashable,
+        entities: dict[str, dict[str, Any]],
+        tool_call_id: str,
+        visible_tool_call_ids: set[str],
+        full: bool = False,
+    ) -> LiveContextDelta | None:
+        """Remember a result and return what changed since the previous one.
+
+        Returns None when the full result should be sent: when asked for, on
+        the first call with these filters, when an earlier result is no
+        longer visible to the model, or when most entities changed anyway.
+        """
+        previous = self.snapshots.get(filters)
+        if (
+            full
+            or previous is None
+            or not visible_tool_call_ids.issuperset(previous.tool_call_ids)
+        ):
+            self.snapshots[filters] = LiveContextSnapshot(entities, [tool_call_id])
+            return None
+
+        delta = LiveContextDelta(
+            changed={
+                entity_id: info
+                for entity_id, info in entities.items()
+                if previous.entities.get(entity_id) != info
+            },
+            removed=[
+                previous.entities[entity_id]["names"]
+                for entity_id in previous.entities
+                if entity_id not in entities
+            ],
+        )
+        if len(delta.changed) + len(delta.removed) > max(
+            len(entities), len(previous.entities)
+        ) / 2:
+            self.snapshots[filters] = LiveContextSnapshot(entities, [tool_call_id])
+            return None
+
+        previous.entities = entities
+        previous.tool_call_ids.append(tool_call_id)
+        return delta
+
+
+LIVE_CONTEXT_MEMORY: HassKey[OrderedDict[str, LiveContextMemory]] = HassKey(
+    f"{DOMAIN}_live_context_memory"
+)
+
+
+def get_live_context_memory(
+    hass: HomeAssistant, conversation_id: str
+) -> LiveContextMemory:
+    """Return the memory for a conversation."""
+    memories = hass.data.setdefault(LIVE_CONTEXT_MEMORY, OrderedDict())
+    if (memory := memories.get(conversation_id)) is None:
+        memory = memories[conversation_id] = LiveContextMemory()
+        while len(memories) > MAX_CONVERSATIONS:
+            memories.popitem(last=False)
+    else:
+        memories.move_to_end(conversation_id)
+    return memory
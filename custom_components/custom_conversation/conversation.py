@@ -1,42 +1,36 @@
 """Conversation support for Custom Conversation APIs."""
 
+from __future__ import annotations
+
 import ast
-from collections.abc import AsyncGenerator, Callable
+import asyncio
+from collections.abc import AsyncGenerator, Callable, Hashable
+from dataclasses import dataclass, replace
 import json
-from typing import TYPE_CHECKING, Any, Literal, Union, cast
-
-from langfuse import get_client as get_langfuse_client, observe
+import time
+from typing import TYPE_CHECKING, Any, Literal, cast
 
-if TYPE_CHECKING:
-    from langfuse.model import PromptClient
-from litellm import OpenAIError, RateLimitError, Router
-from litellm.types.completion import (
-    ChatCompletionAssistantMessageParam,
-    ChatCompletionMessageParam,
-    ChatCompletionMessageToolCallParam,
-    ChatCompletionToolMessageParam,
-)
-from litellm.types.llms.openai import ChatCompletionToolParam, Function
-from litellm.types.utils import StreamingChatCompletionChunk
 from voluptuous_openapi import convert
 
 from homeassistant.components import conversation
 from homeassistant.components.conversation.chat_log import (
     AssistantContent,
     AssistantContentDeltaDict,
+    SystemContent,
     UserContent,
     async_get_chat_log,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_LLM_HASS_API, MATCH_ALL
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Context, HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import chat_session, device_registry as dr, intent, llm
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import CustomConversationConfigEntry
-from .api import IntentTool
-from .cc_llm import async_update_llm_data
+from . import CustomConversationConfigEntry, deadline
+from .api import GetLiveContextTool, IntentTool
+from .cc_llm import async_update_llm_data, build_llm_context
 from .const import (
     CONF_AGENTS_SECTION,
     CONF_ENABLE_HASS_AGENT,
@@ -48,28 +42,57 @@ from .const import (
     CONF_LANGFUSE_TAGS,
     CONF_LANGFUSE_TRACING_ENABLED,
     CONF_MAX_TOKENS,
-    CONF_PRIMARY_API_KEY,
-    CONF_PRIMARY_BASE_URL,
-    CONF_PRIMARY_CHAT_MODEL,
-    CONF_PRIMARY_PROVIDER,
-    CONF_SECONDARY_API_KEY,
-    CONF_SECONDARY_BASE_URL,
-    CONF_SECONDARY_CHAT_MODEL,
-    CONF_SECONDARY_PROVIDER,
-    CONF_SECONDARY_PROVIDER_ENABLED,
+    CONF_PERFORMANCE_SECTION,
+    CONF_RECORD_STREAMS,
     CONF_TEMPERATURE,
     CONF_TOP_P,
+    CONF_TURN_TIMEOUT,
     CONVERSATION_ENDED_EVENT,
     CONVERSATION_ERROR_EVENT,
     CONVERSATION_STARTED_EVENT,
     DEFAULT_MAX_TOKENS,
+    DEFAULT_RECORD_STREAMS,
     DEFAULT_TEMPERATURE,
     DEFAULT_TOP_P,
+    DEFAULT_TURN_TIMEOUT,
     DOMAIN,
     HOME_ASSISTANT_AGENT,
     LOGGER,
+    TURN_TIMEOUT_RESPONSE,
+)
+from .device_location import async_get_device_location
+from .lazy_imports import (
+    LITELLM,
+    async_import,
+    get_langfuse_client,
+    langfuse,
+    litellm,
+    observe,
+)
+from .loop_monitor import (
+    SECTION_EVENT_PAYLOAD,
+    SECTION_SPAN_INPUT,
+    SECTION_SPAN_OUTPUT,
+    loop_section,
+)
+from .metrics import (
+    SIGNAL_METRICS_UPDATED,
+    STAGE_HASS_AGENT,
+    STAGE_LLM_AGENT,
+    STAGE_LLM_ITERATION,
+    STAGE_PROMPT,
+    STAGE_TURN,
+    get_metrics,
 )
 from .prompt_manager import PromptManager
+from .recorder import async_record_stream, recording_path
+from .routing import async_stream_completion
+
+if TYPE_CHECKING:
+    from langfuse.model import PromptClient
+    from litellm.types.completion import ChatCompletionMessageParam
+    from litellm.types.llms.openai import ChatCompletionToolParam
+    from litellm.types.utils import StreamingChatCompletionChunk
 
 # Max number of back and forth with the LLM to generate a response
 MAX_TOOL_ITERATIONS = 10
@@ -165,9 +188,61 @@ async def async_setup_entry(
     if langfuse_client:
         prompt_manager.set_langfuse_client(langfuse_client)
     agent = CustomConversationEntity(config_entry, prompt_manager, hass)
+    hass.data.setdefault(DOMAIN, {}).setdefault(config_entry.entry_id, {})[
+        "agent"
+    ] = agent
     async_add_entities([agent])
 
 
+@dataclass(slots=True)
+class PreparedLLMData:
+    """The system prompt and tools prepared for one turn, to reuse in others."""
+
+    prompt_object: Any
+    system_content: SystemContent
+    llm_api: llm.APIInstance | None
+    extra_system_prompt: str | None
+
+    @classmethod
+    def from_chat_log(
+        cls, chat_log: conversation.ChatLog, prompt_object: Any
+    ) -> PreparedLLMData:
+        """Capture what async_update_llm_data set up on a chat log."""
+        return cls(
+            prompt_object,
+            cast(SystemContent, chat_log.content[0]),
+            chat_log.llm_api,
+            chat_log.extra_system_prompt,
+        )
+
+    def apply(
+        self,
+        chat_log: conversation.ChatLog,
+        user_input: conversation.ConversationInput,
+    ) -> None:
+        """Set up another chat log the same way, for its own conversation input.
+
+        Only the prompt and tools are shared; tools are called with the
+        context of the input they run for.
+        """
+        llm_api = self.llm_api
+        if llm_api is not None:
+            # GetLiveContext remembers what it returned per conversation
+            llm_api = replace(
+                llm_api,
+                llm_context=build_llm_context(user_input),
+                tools=[
+                    GetLiveContextTool(chat_log)
+                    if isinstance(tool, GetLiveContextTool)
+                    else tool
+                    for tool in llm_api.tools
+                ],
+            )
+        chat_log.llm_api = llm_api
+        chat_log.extra_system_prompt = self.extra_system_prompt
+        chat_log.content[0] = self.system_content
+
+
 def _format_tool(
     tool: IntentTool, custom_serializer: Callable[[Any], Any] | None
 ) -> ChatCompletionToolParam:
@@ -178,7 +253,7 @@ def _format_tool(
     }
     if tool.description:
         tool_spec["description"] = tool.description
-    return ChatCompletionToolParam(type="function", function=tool_spec)
+    return {"type": "function", "function": tool_spec}
 
 
 def _convert_content_to_param(
@@ -187,17 +262,17 @@ def _convert_content_to_param(
     """Convert any native chat message for this agent to the native format."""
     if content.role == "tool_result":
         assert type(content) is conversation.ToolResultContent
-        return ChatCompletionToolMessageParam(
-            role="tool",
-            tool_call_id=content.tool_call_id,
-            content=json.dumps(content.tool_result, default=str),
-        )
+        return {
+            "role": "tool",
+            "tool_call_id": content.tool_call_id,
+            "content": json.dumps(content.tool_result, default=str),
+        }
     if content.role != "assistant" or not content.tool_calls:
         role = content.role
         if role == "system":
             role = "developer"
         return cast(
-            ChatCompletionMessageParam,
+            "ChatCompletionMessageParam",
             {
                 "role": content.role,
                 "content": content.content,
@@ -205,27 +280,32 @@ def _convert_content_to_param(
         )
 
     assert type(content) is conversation.AssistantContent
-    return ChatCompletionAssistantMessageParam(
-        role="assistant",
-        content=content.content,
-        tool_calls=[
-            ChatCompletionMessageToolCallParam(
-                id=tool_call.id,
-                function=Function(
-                    arguments=json.dumps(tool_call.tool_args),
-                    name=tool_call.tool_name,
-                ),
-                type="function",
-            )
+    return {
+        "role": "assistant",
+        "content": content.content,
+        "tool_calls": [
+            {
+                "id": tool_call.id,
+                "function": {
+                    "arguments": json.dumps(tool_call.tool_args),
+                    "name": tool_call.tool_name,
+                },
+                "type": "function",
+            }
             for tool_call in content.tool_calls
         ],
-    )
+    }
 
 
 async def _transform_litellm_stream(
     result: AsyncGenerator[StreamingChatCompletionChunk, None],
+    on_usage: Callable[[Any], None] | None = None,
 ) -> AsyncGenerator[AssistantContentDeltaDict, None]:
-    """Transform a LiteLLM delta stream into HA format."""
+    """Transform a LiteLLM delta stream into HA format.
+
+    If on_usage is given, it is called with the token usage the provider sends
+    at the end of the stream.
+    """
     current_tool_call: dict | None = None
 
     async for chunk in result:
@@ -233,6 +313,8 @@ async def _transform_litellm_stream(
         if not chunk.choices:
             if chunk.usage:
                 LOGGER.debug("Received usage chunk: %s", chunk.usage)
+                if on_usage is not None:
+                    on_usage(chunk.usage)
             continue
 
         choice = chunk.choices[0]
@@ -350,10 +432,9 @@ class CustomConversationEntity(
             CONF_LANGFUSE_TRACING_ENABLED, False
         ):
             try:
-                from langfuse import Langfuse
-
+                # Langfuse is imported in the executor along with the client
                 hass.async_add_executor_job(
-                    lambda: Langfuse(
+                    lambda: langfuse().Langfuse(
                         host=entry.options[CONF_LANGFUSE_SECTION][CONF_LANGFUSE_HOST],
                         public_key=entry.options[CONF_LANGFUSE_SECTION][
                             CONF_LANGFUSE_PUBLIC_KEY
@@ -389,7 +470,21 @@ class CustomConversationEntity(
         self, user_input: conversation.ConversationInput
     ) -> conversation.ConversationResult:
         """Process a sentence."""
-        return await self._async_handle_message(user_input)
+        await async_import(LITELLM)
+        try:
+            with (
+                deadline.turn_deadline(
+                    self.entry.options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                        CONF_TURN_TIMEOUT, DEFAULT_TURN_TIMEOUT
+                    )
+                ),
+                get_metrics(self.hass, self.entry).timed(STAGE_TURN),
+            ):
+                return await self._async_handle_message(user_input)
+        finally:
+            async_dispatcher_send(
+                self.hass, SIGNAL_METRICS_UPDATED.format(self.entry.entry_id)
+            )
 
     @observe(name="cc_handle_message")
     async def _async_handle_message(
@@ -400,12 +495,11 @@ class CustomConversationEntity(
         LOGGER.debug("Processing user input: %s", user_input)
         assert user_input.agent_id
         options = self.entry.options
-        device_registry = dr.async_get(self.hass)
-        device = device_registry.async_get(user_input.device_id)
+        device_location = async_get_device_location(self.hass, user_input.device_id)
         device_data = {
             "device_id": user_input.device_id,
-            "device_name": device.name if device else "Unknown",
-            "device_area": device.area_id if device else "Unknown",
+            "device_name": device_location.device_name if device_location else "Unknown",
+            "device_area": device_location.area_id if device_location else "Unknown",
         }
         device_tags = [
             f"device_id:{device_data['device_id']}",
@@ -447,7 +541,8 @@ class CustomConversationEntity(
                 ) as session,
                 async_get_chat_log(self.hass, session, user_input) as chat_log,
             ):
-                result = await self._async_handle_message_with_hass(user_input)
+                with get_metrics(self.hass, self.entry).timed(STAGE_HASS_AGENT):
+                    result = await self._async_handle_message_with_hass(user_input)
                 LOGGER.debug("Received response: %s", result.response.speech)
                 if result.response.error_code is None:
                     await self._async_fire_conversation_ended(
@@ -462,7 +557,10 @@ class CustomConversationEntity(
                     if len(result.response.success_results) > 0:
                         for success_result in result.response.success_results:
                             new_tags.append(f"affected_entity:{success_result.id}")
-                    get_langfuse_client().update_current_span(output=result.as_dict())
+                    with loop_section(self.hass, SECTION_SPAN_OUTPUT):
+                        get_langfuse_client().update_current_span(
+                            output=result.as_dict()
+                        )
                     get_langfuse_client().update_current_span(metadata={"tags": new_tags})
                     return conversation.ConversationResult(
                         response=result.response,
@@ -477,36 +575,55 @@ class CustomConversationEntity(
         if options.get(CONF_AGENTS_SECTION, {}).get(CONF_ENABLE_LLM_AGENT):
             LOGGER.debug("Processing with LLM agent")
             try:
-                with (
-                    chat_session.async_get_chat_session(
-                        self.hass, user_input.conversation_id
-                    ) as session,
-                    async_get_chat_log(self.hass, session, user_input) as chat_log,
-                ):
-                    LOGGER.debug("Trying to handle the message with LLM")
-                    result, llm_data = await self._async_handle_message_with_llm(
-                        user_input, chat_log
-                    )
-                    LOGGER.debug("Received response: %s", result.response.speech)
-                    if result.response.error_code is None:
-                        await self._async_fire_conversation_ended(
-                            result,
-                            "LLM",
-                            user_input,
-                            llm_data=llm_data,
-                            device_data=device_data,
-                        )
-                        get_langfuse_client().update_current_span(
-                            metadata={"tags": ["handling_agent:llm"]}
-                        )
-                    else:
-                        await self._async_fire_conversation_error(
-                            result.response.error_code,
-                            "LLM",
-                            user_input,
-                            device_data=device_data,
-                        )
-            except RateLimitError as err:
+                async with asyncio.timeout(deadline.remaining()):
+                    with (
+                        chat_session.async_get_chat_session(
+                            self.hass, user_input.conversation_id
+                        ) as session,
+                        async_get_chat_log(self.hass, session, user_input) as chat_log,
+                    ):
+                        LOGGER.debug("Trying to handle the message with LLM")
+                        with get_metrics(self.hass, self.entry).timed(STAGE_LLM_AGENT):
+                            result, llm_data = await self._async_handle_message_with_llm(
+                                user_input, chat_log
+                            )
+                        LOGGER.debug("Received response: %s", result.response.speech)
+                        if result.response.error_code is None:
+                            await self._async_fire_conversation_ended(
+                                result,
+                                "LLM",
+                                user_input,
+                                llm_data=llm_data,
+                                device_data=device_data,
+                            )
+                            get_langfuse_client().update_current_span(
+                                metadata={"tags": ["handling_agent:llm"]}
+                            )
+                        else:
+                            await self._async_fire_conversation_error(
+                                result.response.error_code,
+                                "LLM",
+                                user_input,
+                                device_data=device_data,
+                            )
+            except (TimeoutError, litellm().Timeout) as err:
+                error_message = str(err) or "Turn deadline exceeded"
+                LOGGER.warning("Conversation timed out: %s", error_message)
+                await self._async_fire_conversation_error(
+                    error_message,
+                    "LLM",
+                    user_input,
+                    device_data=device_data,
+                )
+                intent_response = intent.IntentResponse(language=user_input.language)
+                intent_response.async_set_error(
+                    intent.IntentResponseErrorCode.UNKNOWN,
+                    TURN_TIMEOUT_RESPONSE,
+                )
+                result = conversation.ConversationResult(
+                    response=intent_response, conversation_id=user_input.conversation_id
+                )
+            except litellm().RateLimitError as err:
                 error_message = getattr(err, "body", str(err))
                 await self._async_fire_conversation_error(
                     error_message,
@@ -515,7 +632,7 @@ class CustomConversationEntity(
                     device_data=device_data,
                 )
                 raise HomeAssistantError("Rate limited or insufficient funds") from err
-            except OpenAIError as err:
+            except litellm().OpenAIError as err:
                 error_message = getattr(err, "body", str(err))
                 await self._async_fire_conversation_error(
                     error_message,
@@ -526,6 +643,80 @@ class CustomConversationEntity(
                 raise HomeAssistantError("Error talking to OpenAI API") from err
         return result
 
+    async def async_process_batch(
+        self, items: list[dict[str, Any]], max_parallel: int
+    ) -> list[dict[str, Any]]:
+        """Run prompts through the LLM agent, up to max_parallel at a time.
+
+        Each prompt starts a new conversation. Prompts for the same user and
+        device in the same language share one prepared system prompt and
+        tool list. A failed prompt gets an error instead of a response, so
+        one failure doesn't lose the other results.
+        """
+        await async_import(LITELLM)
+        metrics = get_metrics(self.hass, self.entry)
+        timeout = self.entry.options.get(CONF_PERFORMANCE_SECTION, {}).get(
+            CONF_TURN_TIMEOUT, DEFAULT_TURN_TIMEOUT
+        )
+        semaphore = asyncio.Semaphore(max_parallel)
+        shared_llm_data: dict[Hashable, asyncio.Future[PreparedLLMData | None]] = {}
+
+        async def process(item: dict[str, Any]) -> dict[str, Any]:
+            user_input = conversation.ConversationInput(
+                text=item["text"],
+                context=Context(user_id=item.get("user_id")),
+                conversation_id=None,
+                device_id=item.get("device_id"),
+                satellite_id=None,
+                language=item["language"],
+                agent_id=self.entity_id,
+            )
+            async with semaphore:
+                try:
+                    with (
+                        deadline.turn_deadline(timeout),
+                        metrics.timed(STAGE_TURN),
+                    ):
+                        async with asyncio.timeout(deadline.remaining()):
+                            with (
+                                chat_session.async_get_chat_session(
+                                    self.hass, None
+                                ) as session,
+                                async_get_chat_log(
+                                    self.hass, session, user_input
+                                ) as chat_log,
+                            ):
+                                result, _ = await self._async_handle_message_with_llm(
+                                    user_input, chat_log, shared_llm_data
+                                )
+                except (TimeoutError, litellm().Timeout) as err:
+                    return {
+                        "text": item["text"],
+                        "error": str(err) or "Turn deadline exceeded",
+                    }
+                except (HomeAssistantError, litellm().OpenAIError) as err:
+                    return {"text": item["text"], "error": str(err)}
+
+            response = result.response
+            if response.error_code is not None:
+                return {
+                    "text": item["text"],
+                    "conversation_id": result.conversation_id,
+                    "error": response.speech.get("plain", {}).get("speech"),
+                }
+            return {
+                "text": item["text"],
+                "conversation_id": result.conversation_id,
+                "response": response.speech.get("plain", {}).get("speech"),
+            }
+
+        try:
+            return await asyncio.gather(*(process(item) for item in items))
+        finally:
+            async_dispatcher_send(
+                self.hass, SIGNAL_METRICS_UPDATED.format(self.entry.entry_id)
+            )
+
     @observe(name="cc_handle_message_with_hass")
     async def _async_handle_message_with_hass(
         self,
@@ -539,9 +730,10 @@ class CustomConversationEntity(
                 intent.IntentResponseErrorCode.UNKNOWN,
                 "Sorry, I had a problem talking to Home Assistant",
             )
-            get_langfuse_client().update_current_span(
-                output=intent_response.as_dict()
-            )
+            with loop_section(self.hass, SECTION_SPAN_OUTPUT):
+                get_langfuse_client().update_current_span(
+                    output=intent_response.as_dict()
+                )
             return conversation.ConversationResult(
                 response=intent_response, conversation_id=user_input.conversation_id
             )
@@ -566,7 +758,8 @@ class CustomConversationEntity(
             LOGGER.debug(
                 "Hass agent responded with error_code: %s", response.response.error_code
             )
-        get_langfuse_client().update_current_span(output=response.as_dict())
+        with loop_section(self.hass, SECTION_SPAN_OUTPUT):
+            get_langfuse_client().update_current_span(output=response.as_dict())
         return response
 
     @observe(name="cc_handle_message_with_llm")
@@ -574,22 +767,18 @@ class CustomConversationEntity(
         self,
         user_input: conversation.ConversationInput,
         chat_log: conversation.ChatLog,
+        shared_llm_data: dict[Hashable, asyncio.Future[PreparedLLMData | None]]
+        | None = None,
     ) -> tuple[conversation.ConversationResult, dict]:
         """Process a sentence with the llm."""
+        metrics = get_metrics(self.hass, self.entry)
 
         try:
             LOGGER.debug("Updating LLM Data")
-            llm_api = self.entry.options.get(CONF_LLM_HASS_API)
-            if llm_api == "none":
-                llm_api = None
-            prompt_object = await async_update_llm_data(
-                self.hass,
-                user_input,
-                self.entry,
-                chat_log,
-                self.prompt_manager,
-                llm_api,
-            )
+            with metrics.timed(STAGE_PROMPT):
+                prompt_object = await self._async_update_llm_data(
+                    user_input, chat_log, shared_llm_data
+                )
             if prompt_object:
                 LOGGER.debug(
                     "Prompt name: %s, version: %s",
@@ -616,30 +805,31 @@ class CustomConversationEntity(
         ]
         # To prevent infinite loops, we limit the number of iterations
         for _iteration in range(MAX_TOOL_ITERATIONS):
-            LOGGER.debug("Iteration %s, messages: %s", _iteration, messages)
-            transformed_stream = await self._async_generate_completion(
-                entry=self.entry,
-                messages=messages,
-                tools=tools,
-                conversation_id=chat_log.conversation_id,
-                prompt=prompt_object,
-            )
-
-            try:
-                messages.extend(
-                    [
-                        _convert_content_to_param(content)
-                        async for content in chat_log.async_add_delta_content_stream(
-                            user_input.agent_id, transformed_stream
-                        )
-                    ]
+            with metrics.timed(STAGE_LLM_ITERATION):
+                LOGGER.debug("Iteration %s, messages: %s", _iteration, messages)
+                transformed_stream = await self._async_generate_completion(
+                    entry=self.entry,
+                    messages=messages,
+                    tools=tools,
+                    conversation_id=chat_log.conversation_id,
+                    prompt=prompt_object,
                 )
-            except HomeAssistantError as err:
-                LOGGER.error("Error processing LLM stream: %s", err)
-                raise
-            except Exception as err:
-                LOGGER.error("Unexpected error processing LLM stream: %s", err)
-                raise HomeAssistantError("Error processing LLM response") from err
+
+                try:
+                    messages.extend(
+                        [
+                            _convert_content_to_param(content)
+                            async for content in chat_log.async_add_delta_content_stream(
+                                user_input.agent_id, transformed_stream
+                            )
+                        ]
+                    )
+                except (HomeAssistantError, TimeoutError, litellm().Timeout) as err:
+                    LOGGER.error("Error processing LLM stream: %s", err)
+                    raise
+                except Exception as err:
+                    LOGGER.error("Unexpected error processing LLM stream: %s", err)
+                    raise HomeAssistantError("Error processing LLM response") from err
 
             if not chat_log.unresponded_tool_results:
                 break
@@ -665,6 +855,63 @@ class CustomConversationEntity(
             continue_conversation=chat_log.continue_conversation,
         ), llm_details
 
+    async def _async_update_llm_data(
+        self,
+        user_input: conversation.ConversationInput,
+        chat_log: conversation.ChatLog,
+        shared_llm_data: dict[Hashable, asyncio.Future[PreparedLLMData | None]]
+        | None = None,
+    ) -> Any:
+        """Prepare the system prompt and tools on the chat log.
+
+        With shared_llm_data, turns for the same user and device in the same
+        language prepare them once: the first one does, and the others wait
+        for it and copy the result. If the first one fails, the others each
+        prepare their own.
+        """
+        llm_api = self.entry.options.get(CONF_LLM_HASS_API)
+        if llm_api == "none":
+            llm_api = None
+        if shared_llm_data is None:
+            return await async_update_llm_data(
+                self.hass,
+                user_input,
+                self.entry,
+                chat_log,
+                self.prompt_manager,
+                llm_api,
+            )
+
+        key = (user_input.device_id, user_input.context.user_id, user_input.language)
+        if (future := shared_llm_data.get(key)) is not None:
+            if (prepared := await future) is not None:
+                prepared.apply(chat_log, user_input)
+                return prepared.prompt_object
+            return await async_update_llm_data(
+                self.hass,
+                user_input,
+                self.entry,
+                chat_log,
+                self.prompt_manager,
+                llm_api,
+            )
+
+        future = shared_llm_data[key] = self.hass.loop.create_future()
+        try:
+            prompt_object = await async_update_llm_data(
+                self.hass,
+                user_input,
+                self.entry,
+                chat_log,
+                self.prompt_manager,
+                llm_api,
+            )
+        except BaseException:
+            future.set_result(None)
+            raise
+        future.set_result(PreparedLLMData.from_chat_log(chat_log, prompt_object))
+        return prompt_object
+
     @observe(
         name="cc_generate_completion",
         as_type="generation",
@@ -677,56 +924,26 @@ class CustomConversationEntity(
         messages: list[ChatCompletionMessageParam],
         tools: list[ChatCompletionToolParam] | None,
         conversation_id: str,
-        prompt: Union["PromptClient", None] = None,
+        prompt: PromptClient | None = None,
     ) -> AsyncGenerator[AssistantContentDeltaDict, None]:
         """Generate a completion stream from the LLM."""
-        cleaned_input = {
-            "messages": messages,
-            "tools": tools,
-            "conversation_id": conversation_id,
-            "prompt": prompt.__dict__ if prompt else None,
-            "config_entry": {
-                "entry_id": entry.entry_id,
-                "title": entry.title,
-                "options": {**entry.options},
-            },
-        }
-        get_langfuse_client().update_current_span(
-            input=cleaned_input,
-        )
-        generation_id = get_langfuse_client().get_current_observation_id()
-        existing_trace_id = get_langfuse_client().get_current_trace_id()
-        primary_model = f"{entry.data.get(CONF_PRIMARY_PROVIDER)}/{entry.data.get(CONF_PRIMARY_CHAT_MODEL)}"
-        secondary_model = (
-            f"{entry.data.get(CONF_SECONDARY_PROVIDER)}/{entry.data.get(CONF_SECONDARY_CHAT_MODEL)}"
-            if entry.data.get(CONF_SECONDARY_PROVIDER_ENABLED)
-            else ""
-        )
-        fallbacks = []
-        model_list = [
-            {
-                "model_name": primary_model,
-                "litellm_params": {
-                    "model": primary_model,
-                    "api_base": entry.data.get(CONF_PRIMARY_BASE_URL),
-                    "api_key": entry.data.get(CONF_PRIMARY_API_KEY),
+        with loop_section(self.hass, SECTION_SPAN_INPUT):
+            cleaned_input = {
+                "messages": messages,
+                "tools": tools,
+                "conversation_id": conversation_id,
+                "prompt": prompt.__dict__ if prompt else None,
+                "config_entry": {
+                    "entry_id": entry.entry_id,
+                    "title": entry.title,
+                    "options": {**entry.options},
                 },
-            },
-        ]
-        if entry.data.get(CONF_SECONDARY_PROVIDER_ENABLED):
-            model_list.append(
-                {
-                    "model_name": secondary_model,
-                    "litellm_params": {
-                        "model": secondary_model,
-                        "api_base": entry.data.get(CONF_SECONDARY_BASE_URL),
-                        "api_key": entry.data.get(CONF_SECONDARY_API_KEY),
-                    },
-                }
+            }
+            get_langfuse_client().update_current_span(
+                input=cleaned_input,
             )
-            fallbacks = [{primary_model: [secondary_model]}]
-
-        router = Router(model_list=model_list, fallbacks=fallbacks)
+        generation_id = get_langfuse_client().get_current_observation_id()
+        existing_trace_id = get_langfuse_client().get_current_trace_id()
 
         temperature = entry.options.get(CONF_TEMPERATURE, DEFAULT_TEMPERATURE)
         top_p = entry.options.get(CONF_TOP_P, DEFAULT_TOP_P)
@@ -735,7 +952,6 @@ class CustomConversationEntity(
         langfuse_params = entry.options.get(CONF_LANGFUSE_SECTION, {})
 
         completion_kwargs = {
-            "model": primary_model,
             "messages": messages,
             "tools": tools,
             "max_tokens": max_tokens,
@@ -759,17 +975,32 @@ class CustomConversationEntity(
         }
 
         try:
+            started = time.perf_counter()
             raw_stream: AsyncGenerator[
                 StreamingChatCompletionChunk
-            ] = await router.acompletion(**completion_kwargs)
+            ] = await async_stream_completion(self.hass, entry, completion_kwargs)
+            if entry.options.get(CONF_PERFORMANCE_SECTION, {}).get(
+                CONF_RECORD_STREAMS, DEFAULT_RECORD_STREAMS
+            ):
+                raw_stream = async_record_stream(
+                    self.hass,
+                    raw_stream,
+                    recording_path(self.hass, conversation_id),
+                    started,
+                )
             get_langfuse_client().update_current_span(metadata={"prompt": prompt.__dict__ if prompt else None})
 
-            return _transform_litellm_stream(raw_stream)
+            return _transform_litellm_stream(
+                raw_stream, get_metrics(self.hass, entry).record_usage
+            )
 
-        except RateLimitError as err:
+        except TimeoutError:
+            LOGGER.error("Timed out waiting for the LLM to start responding")
+            raise
+        except litellm().RateLimitError as err:
             LOGGER.error("Rate limit error during acompletion: %s", err)
             raise
-        except OpenAIError as err:
+        except litellm().OpenAIError as err:
             LOGGER.error("API error during acompletion: %s", err)
             raise
         except Exception as err:
@@ -834,33 +1065,34 @@ class CustomConversationEntity(
         device_data: dict | None = None,
     ) -> None:
         """Fire an event to notify that a conversation has completed."""
-        event_data = {
-            "agent_id": user_input.agent_id,
-            "handling_agent": agent,
-            "device_id": user_input.device_id,
-            "device_name": device_data.get("device_name") if device_data else "Unknown",
-            "device_area": device_data.get("device_area") if device_data else "Unknown",
-            "request": user_input.text,
-            "result": result.as_dict(),
-        }
-        if llm_data:
-            # If there's any card in the llm_data, we attach one to the response
-            if any(
-                "card" in tool_call.get("tool_response", {})
-                for tool_call in llm_data.get("tool_calls", [])
-            ):
-                event_data["result"]["response"]["card"] = choose_card(
-                    llm_data["tool_calls"]
-                )
-            event_data["llm_data"] = llm_data
-            # If any of the tool calls has data matching intent entities, we attach it to the response
-            data_dict = {"targets": [], "success": [], "failed": []}
-            for tool_call in llm_data.get("tool_calls", []):
-                tool_response = tool_call.get("tool_response", {}).get("data", {})
-                for field in ("targets", "success", "failed"):
-                    if values := tool_response.get(field, False):
-                        data_dict[field].extend(values)
-            event_data["result"]["response"]["data"].update(data_dict)
+        with loop_section(self.hass, SECTION_EVENT_PAYLOAD):
+            event_data = {
+                "agent_id": user_input.agent_id,
+                "handling_agent": agent,
+                "device_id": user_input.device_id,
+                "device_name": device_data.get("device_name") if device_data else "Unknown",
+                "device_area": device_data.get("device_area") if device_data else "Unknown",
+                "request": user_input.text,
+                "result": result.as_dict(),
+            }
+            if llm_data:
+                # If there's any card in the llm_data, we attach one to the response
+                if any(
+                    "card" in tool_call.get("tool_response", {})
+                    for tool_call in llm_data.get("tool_calls", [])
+                ):
+                    event_data["result"]["response"]["card"] = choose_card(
+                        llm_data["tool_calls"]
+                    )
+                event_data["llm_data"] = llm_data
+                # If any of the tool calls has data matching intent entities, we attach it to the response
+                data_dict = {"targets": [], "success": [], "failed": []}
+                for tool_call in llm_data.get("tool_calls", []):
+                    tool_response = tool_call.get("tool_response", {}).get("data", {})
+                    for field in ("targets", "success", "failed"):
+                        if values := tool_response.get(field, False):
+                            data_dict[field].extend(values)
+                event_data["result"]["response"]["data"].update(data_dict)
         self.hass.bus.async_fire(CONVERSATION_ENDED_EVENT, event_data)
 
 
@@ -0,0 +1,48 @@
+"""Per-turn deadlines for the Custom Conversation integration.
+
+A conversation turn sets a deadline once, and everything it awaits (prompt
+fetches, completions and tool calls) asks for the time left instead of
+being handed a timeout explicitly. The deadline lives in a context
+variable, so tasks started during the turn, such as hedged requests, see
+the same budget.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+from .const import DOMAIN
+
+_TURN_DEADLINE: ContextVar[float | None] = ContextVar(
+    f"{DOMAIN}_turn_deadline", default=None
+)
+
+
+@contextmanager
+def turn_deadline(seconds: float | None) -> Iterator[None]:
+    """Set the deadline for the current turn, or clear it if seconds is None or 0."""
+    token = _TURN_DEADLINE.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _TURN_DEADLINE.reset(token)
+
+
+def remaining() -> float | None:
+    """Return the seconds left in the current turn, or None without a deadline."""
+    if (deadline := _TURN_DEADLINE.get()) is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def budget(limit: float | None = None) -> float | None:
+    """Return the smaller of limit and the time left in the current turn."""
+    left = remaining()
+    if left is None:
+        return limit
+    if limit is None:
+        return left
+    return min(limit, left)
@@ -0,0 +1,121 @@
+"""Cached resolution of a device to its area and floor.
+
+The conversation entity, the API prompt and intent tools all need the area
+and floor of the device a request came from. Resolving it takes three
+registry lookups, so the result is cached per device until the device,
+area or floor registry changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    floor_registry as fr,
+)
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .metrics import get_cache_stats
+
+CACHE_NAME = "device_location"
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceLocation:
+    """Where a device is."""
+
+    device_name: str | None
+    area_id: str | None = None
+    area_name: str | None = None
+    floor_id: str | None = None
+    floor_name: str | None = None
+
+
+class DeviceLocationCache:
+    """Device locations, dropped whenever a registry they come from changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._locations: dict[str, DeviceLocation | None] = {}
+        self._unsubscribes: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_get(self, device_id: str) -> DeviceLocation | None:
+        """Return the location of a device, or None if it doesn't exist."""
+        stats = get_cache_stats(self.hass, CACHE_NAME)
+        if device_id in self._locations:
+            stats.hit()
+            return self._locations[device_id]
+        stats.miss()
+        location = self._locations[device_id] = self._async_resolve(device_id)
+        stats.size = len(self._locations)
+        return location
+
+    @callback
+    def _async_resolve(self, device_id: str) -> DeviceLocation | None:
+        """Look a device's area and floor up in the registries."""
+        if (device := dr.async_get(self.hass).async_get(device_id)) is None:
+            return None
+        if not device.area_id or not (
+            area := ar.async_get(self.hass).async_get_area(device.area_id)
+        ):
+            return DeviceLocation(device.name)
+        floor = (
+            fr.async_get(self.hass).async_get_floor(area.floor_id)
+            if area.floor_id
+            else None
+        )
+        return DeviceLocation(
+            device.name,
+            area.id,
+            area.name,
+            floor.floor_id if floor else None,
+            floor.name if floor else None,
+        )
+
+    @callback
+    def async_invalidate(self, event: Event | None = None) -> None:
+        """Drop every cached location."""
+        self._locations.clear()
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for registry changes."""
+        bus = self.hass.bus
+        self._unsubscribes.extend(
+            bus.async_listen(event_type, self.async_invalidate)
+            for event_type in (
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                ar.EVENT_AREA_REGISTRY_UPDATED,
+                fr.EVENT_FLOOR_REGISTRY_UPDATED,
+            )
+        )
+        bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_stop)
+
+    @callback
+    def _async_stop(self, event: Event) -> None:
+        """Stop listening."""
+        while self._unsubscribes:
+            self._unsubscribes.pop()()
+
+
+DEVICE_LOCATIONS: HassKey[DeviceLocationCache] = HassKey(f"{DOMAIN}_device_locations")
+
+
+@callback
+def async_get_device_location(
+    hass: HomeAssistant, device_id: str | None
+) -> DeviceLocation | None:
+    """Return where a device is, or None if there is no such device."""
+    if device_id is None:
+        return None
+    if (cache := hass.data.get(DEVICE_LOCATIONS)) is None:
+        cache = hass.data[DEVICE_LOCATIONS] = DeviceLocationCache(hass)
+        cache.async_start()
+    return cache.async_get(device_id)
@@ -0,0 +1,50 @@
+"""Diagnostics support for Custom Conversation."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_LANGFUSE_PUBLIC_KEY,
+    CONF_LANGFUSE_SECRET_KEY,
+    CONF_PRIMARY_API_KEY,
+    CONF_SECONDARY_API_KEY,
+)
+from .loop_monitor import get_loop_monitor
+from .metrics import CACHE_STATS, get_metrics
+from .routing import get_health
+
+TO_REDACT = {
+    CONF_API_KEY,
+    CONF_PRIMARY_API_KEY,
+    CONF_SECONDARY_API_KEY,
+    CONF_LANGFUSE_PUBLIC_KEY,
+    CONF_LANGFUSE_SECRET_KEY,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    metrics = get_metrics(hass, entry)
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "counters": metrics.as_dict(),
+        "stages": metrics.stage_percentiles(),
+        "tools": metrics.tool_stats(),
+        "deployments": get_health(hass, entry).as_dict(),
+        "caches": {
+            name: stats.as_dict()
+            for name, stats in hass.data.get(CACHE_STATS, {}).items()
+        },
+        "loop_monitor": get_loop_monitor(hass).as_dict(),
+    }
@@ -0,0 +1,219 @@
+"""Lookup indexes over the entities exposed to an assistant.
+
+GetLiveContext filters by name, area and domain. Rather than matching every
+exposed entity on every call, the exposed set is indexed once per assistant
+by normalized name and alias, area name and alias, and domain. The index is
+dropped whenever something it was built from changes: the entity, device or
+area registries, which entities are exposed, or an entity being added,
+removed or renamed.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+import re
+
+from homeassistant.components.homeassistant import async_should_expose
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_listen_entity_updates,
+)
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .metrics import get_cache_stats
+
+CACHE_NAME = "exposed_entity_index"
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for lookups.
+
+    This is looser than Home Assistant's own matching, so a lookup finds at
+    least every entity that matching would accept.
+    """
+    return " ".join(_PUNCTUATION.sub("", name.casefold()).split())
+
+
+class ExposedEntityIndex:
+    """Entities exposed to an assistant, indexed by name, area and domain."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        # Dicts rather than sets keep entities in state machine order
+        self.entity_ids: dict[str, None] = {}
+        self.by_name: defaultdict[str, dict[str, None]] = defaultdict(dict)
+        self.by_area: defaultdict[str, dict[str, None]] = defaultdict(dict)
+        self.by_domain: defaultdict[str, dict[str, None]] = defaultdict(dict)
+
+    @classmethod
+    def build(cls, hass: HomeAssistant, assistant: str) -> ExposedEntityIndex:
+        """Index the entities currently exposed to an assistant."""
+        area_registry = ar.async_get(hass)
+        device_registry = dr.async_get(hass)
+        entity_registry = er.async_get(hass)
+        index = cls()
+
+        for state in hass.states.async_all():
+            entity_id = state.entity_id
+            if not async_should_expose(hass, assistant, entity_id):
+                continue
+            index.entity_ids[entity_id] = None
+            index.by_domain[state.domain][entity_id] = None
+            index.by_name[normalize_name(state.name)][entity_id] = None
+
+            if (entity_entry := entity_registry.async_get(entity_id)) is None:
+                continue
+            for alias in entity_entry.aliases:
+                if alias is not er.COMPUTED_NAME:
+                    index.by_name[normalize_name(alias)][entity_id] = None
+
+            area_id = entity_entry.area_id
+            if area_id is None and entity_entry.device_id:
+                device = device_registry.async_get(entity_entry.device_id)
+                area_id = device.area_id if device else None
+            if area_id and (area := area_registry.async_get_area(area_id)):
+                for area_name in (area.name, *area.aliases):
+                    index.by_area[normalize_name(area_name)][entity_id] = None
+
+        return index
+
+    def candidates(
+        self,
+        name: str | None = None,
+        area: str | None = None,
+        domains: list[str] | None = None,
+    ) -> list[str]:
+        """Return the exposed entities that could match the filters.
+
+        When the filters select nothing, every exposed entity is returned so
+        that Home Assistant's matching can explain why nothing matched. The
+        same goes for a name that is not in the index, since Home Assistant
+        may still match it in ways the index does not know about.
+        """
+        selected: list[dict[str, None]] = []
+        if name:
+            if not (by_name := self.by_name.get(normalize_name(name))):
+                return list(self.entity_ids)
+            selected.append(by_name)
+        if area:
+            selected.append(self.by_area.get(normalize_name(area), {}))
+        if domains:
+            by_domain: dict[str, None] = {}
+            for domain in domains:
+                by_domain.update(self.by_domain.get(domain, {}))
+            selected.append(by_domain)
+        if not selected:
+            return list(self.entity_ids)
+
+        # Start from the smallest selection and keep what the others share
+        selected.sort(key=len)
+        entity_ids = [
+            entity_id
+            for entity_id in selected[0]
+            if all(entity_id in other for other in selected[1:])
+        ]
+        return entity_ids or list(self.entity_ids)
+
+
+class ExposedEntityIndexCache:
+    """Indexes for each assistant, dropped when anything they depend on changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._indexes: dict[str, ExposedEntityIndex] = {}
+        self._listened_assistants: set[str] = set()
+        self._unsubscribes: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_get(self, assistant: str) -> ExposedEntityIndex:
+        """Return the index for an assistant, building it if needed."""
+        stats = get_cache_stats(self.hass, CACHE_NAME)
+        if (index := self._indexes.get(assistant)) is not None:
+            stats.hit()
+            return index
+        stats.miss()
+        if assistant not in self._listened_assistants:
+            self._listened_assistants.add(assistant)
+            self._unsubscribes.append(
+                async_listen_entity_updates(
+                    self.hass, assistant, self.async_invalidate
+                )
+            )
+        index = self._indexes[assistant] = ExposedEntityIndex.build(
+            self.hass, assistant
+        )
+        stats.size = sum(len(index.entity_ids) for index in self._indexes.values())
+        return index
+
+    @callback
+    def async_invalidate(self, event: Event | None = None) -> None:
+        """Drop every index."""
+        self._indexes.clear()
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for changes that make the indexes stale."""
+        bus = self.hass.bus
+        self._unsubscribes.extend(
+            (
+                bus.async_listen(
+                    er.EVENT_ENTITY_REGISTRY_UPDATED, self.async_invalidate
+                ),
+                bus.async_listen(
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED, self.async_invalidate
+                ),
+                bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self.async_invalidate),
+                bus.async_listen(
+                    EVENT_STATE_CHANGED,
+                    self.async_invalidate,
+                    event_filter=_entity_added_removed_or_renamed,
+                ),
+            )
+        )
+        bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_stop)
+
+    @callback
+    def _async_stop(self, event: Event) -> None:
+        """Stop listening."""
+        while self._unsubscribes:
+            self._unsubscribes.pop()()
+
+
+@callback
+def _entity_added_removed_or_renamed(event_data: EventStateChangedData) -> bool:
+    """Return whether a state change affects which entities are indexed, or how."""
+    old_state = event_data["old_state"]
+    new_state = event_data["new_state"]
+    return old_state is None or new_state is None or old_state.name != new_state.name
+
+
+EXPOSED_ENTITY_INDEX: HassKey[ExposedEntityIndexCache] = HassKey(
+    f"{DOMAIN}_exposed_entity_index"
+)
+
+
+@callback
+def async_get_exposed_entity_index(
+    hass: HomeAssistant, assistant: str
+) -> ExposedEntityIndex:
+    """Return the index of the entities exposed to an assistant."""
+    if (cache := hass.data.get(EXPOSED_ENTITY_INDEX)) is None:
+        cache = hass.data[EXPOSED_ENTITY_INDEX] = ExposedEntityIndexCache(hass)
+        cache.async_start()
+    return cache.async_get(assistant)
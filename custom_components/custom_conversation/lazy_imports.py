@@ -0,0 +1,104 @@
+"""LiteLLM and Langfuse, imported the first time they are needed.
+
+Both packages take long enough to import that loading them with the
+integration slowed every Home Assistant start, even though nothing uses
+them until the first completion, trace or action. Code paths that need
+one await async_import first, which imports it in the executor so the
+event loop isn't blocked; after that, litellm() and langfuse() are only a
+sys.modules lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+import functools
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, ParamSpec, TypeVar
+
+LITELLM = "litellm"
+LANGFUSE = "langfuse"
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+# Imports running in the executor, so concurrent callers wait for the same
+# one instead of seeing a partly initialized module in sys.modules
+_IMPORTING: dict[str, asyncio.Future[ModuleType]] = {}
+
+
+def _is_imported(module: ModuleType | None) -> bool:
+    """Return whether a module from sys.modules has finished importing."""
+    if module is None:
+        return False
+    # Set while another thread, such as another integration, is importing it
+    spec = getattr(module, "__spec__", None)
+    return getattr(spec, "_initializing", False) is not True
+
+
+async def async_import(name: str) -> ModuleType:
+    """Import a module in the executor, unless it has already been imported."""
+    # Shielded so a cancelled caller doesn't fail the import for the others
+    if (future := _IMPORTING.get(name)) is not None:
+        return await asyncio.shield(future)
+    if _is_imported(module := sys.modules.get(name)):
+        return module
+    future = _IMPORTING[name] = asyncio.get_running_loop().run_in_executor(
+        None, importlib.import_module, name
+    )
+    try:
+        return await asyncio.shield(future)
+    finally:
+        del _IMPORTING[name]
+
+
+def _get_module(name: str) -> ModuleType:
+    """Return an imported module, importing it now if nothing has yet."""
+    if (module := sys.modules.get(name)) is not None:
+        return module
+    return importlib.import_module(name)
+
+
+def litellm() -> ModuleType:
+    """Return the litellm module."""
+    return _get_module(LITELLM)
+
+
+def langfuse() -> ModuleType:
+    """Return the langfuse module."""
+    return _get_module(LANGFUSE)
+
+
+def get_langfuse_client() -> Any:
+    """Return the Langfuse client for the current trace."""
+    return langfuse().get_client()
+
+
+def observe(
+    **kwargs: Any,
+) -> Callable[
+    [Callable[_P, Coroutine[Any, Any, _R]]], Callable[_P, Coroutine[Any, Any, _R]]
+]:
+    """Trace a coroutine function with Langfuse's observe decorator.
+
+    The decorator is applied on the first call, after Langfuse has been
+    imported, rather than when the decorated function is defined.
+    """
+
+    def decorator(
+        func: Callable[_P, Coroutine[Any, Any, _R]],
+    ) -> Callable[_P, Coroutine[Any, Any, _R]]:
+        observed: Callable[_P, Coroutine[Any, Any, _R]] | None = None
+
+        @functools.wraps(func)
+        async def wrapper(*args: _P.args, **kw: _P.kwargs) -> _R:
+            nonlocal observed
+            if observed is None:
+                observed = (await async_import(LANGFUSE)).observe(**kwargs)(func)
+            return await observed(*args, **kw)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,150 @@
+"""Detection of slow synchronous work on the event loop.
+
+Some of what the integration does synchronously on the event loop grows with
+the size of the home: rendering prompt templates, dumping every exposed
+entity to YAML, copying options for tracing spans and building event
+payloads. When the loop monitor is turned on in an entry's performance
+options, these sections are timed, any section over the threshold is logged
+with its call site, and per-section counters are included in the entry's
+diagnostics.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import inspect
+import time
+from types import FrameType
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, LOGGER
+
+SECTION_RENDER_TEMPLATE = "render_template"
+SECTION_DUMP_ENTITIES = "dump_entities"
+SECTION_SPAN_INPUT = "span_input"
+SECTION_SPAN_OUTPUT = "span_output"
+SECTION_EVENT_PAYLOAD = "event_payload"
+
+# Frames in these files are skipped when looking for a section's call site
+_INTERNAL_FILES = frozenset({__file__, contextmanager.__code__.co_filename})
+
+
+@dataclass
+class SectionStats:
+    """Timings of one section."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    slow: int = 0
+    last_slow_call_site: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats for inspection, in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "max_ms": round(self.max * 1000, 2),
+            "slow": self.slow,
+            "last_slow_call_site": self.last_slow_call_site,
+        }
+
+
+class LoopMonitor:
+    """Time sections of synchronous work while any entry has it enabled."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self._thresholds: dict[str, float] = {}
+        self.sections: defaultdict[str, SectionStats] = defaultdict(SectionStats)
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether any entry has the monitor enabled."""
+        return bool(self._thresholds)
+
+    @property
+    def threshold(self) -> float:
+        """Return the lowest threshold of the entries that enabled it, in seconds."""
+        return min(self._thresholds.values())
+
+    def enable(self, entry_id: str, threshold_ms: float) -> None:
+        """Enable the monitor for an entry."""
+        self._thresholds[entry_id] = threshold_ms / 1000
+
+    def disable(self, entry_id: str) -> None:
+        """Disable the monitor for an entry."""
+        self._thresholds.pop(entry_id, None)
+
+    def record(self, section: str, seconds: float) -> None:
+        """Record a timed section, logging it with its call site if it was slow."""
+        stats = self.sections[section]
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        if seconds < self.threshold:
+            return
+        stats.slow += 1
+        stats.last_slow_call_site = call_site = _format_call_site(_find_caller())
+        LOGGER.warning(
+            "%s blocked the event loop for %.1f ms at %s",
+            section,
+            seconds * 1000,
+            call_site,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the monitor state for inspection."""
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": round(self.threshold * 1000, 2) if self.enabled else None,
+            "sections": {
+                section: stats.as_dict() for section, stats in self.sections.items()
+            },
+        }
+
+
+LOOP_MONITOR: HassKey[LoopMonitor] = HassKey(f"{DOMAIN}_loop_monitor")
+
+
+def get_loop_monitor(hass: HomeAssistant) -> LoopMonitor:
+    """Return the loop monitor, which is shared by all entries."""
+    if (monitor := hass.data.get(LOOP_MONITOR)) is None:
+        monitor = hass.data[LOOP_MONITOR] = LoopMonitor()
+    return monitor
+
+
+@contextmanager
+def loop_section(hass: HomeAssistant, section: str) -> Iterator[None]:
+    """Time the wrapped synchronous block if the loop monitor is enabled."""
+    monitor = hass.data.get(LOOP_MONITOR)
+    if monitor is None or not monitor.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        monitor.record(section, time.perf_counter() - started)
+
+
+def _find_caller() -> FrameType | None:
+    """Return the innermost frame outside this module and contextlib."""
+    frame = inspect.currentframe()
+    while frame is not None and frame.f_code.co_filename in _INTERNAL_FILES:
+        frame = frame.f_back
+    return frame
+
+
+def _format_call_site(frame: FrameType | None) -> str:
+    """Return the file, line and function of a frame."""
+    if frame is None:
+        return "unknown"
+    filename = frame.f_code.co_filename.rpartition("custom_components/")[2]
+    return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
@@ -0,0 +1,179 @@
+"""Runtime metrics for the Custom Conversation integration."""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import math
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+HEDGES_FIRED = "hedges_fired"
+HEDGES_WON = "hedges_won"
+FALLBACKS = "fallbacks"
+PROMPT_TOKENS = "prompt_tokens"
+COMPLETION_TOKENS = "completion_tokens"
+CACHED_TOKENS = "cached_tokens"
+PROMPTS_SUMMARIZED = "prompts_summarized"
+
+# Stages of a conversation turn that are timed
+STAGE_TURN = "turn"
+STAGE_HASS_AGENT = "hass_agent"
+STAGE_LLM_AGENT = "llm_agent"
+STAGE_PROMPT = "prompt"
+STAGE_FIRST_TOKEN = "first_token"
+STAGE_LLM_ITERATION = "llm_iteration"
+
+# Sent with the entry id whenever a conversation turn has finished
+SIGNAL_METRICS_UPDATED = f"{DOMAIN}_metrics_updated_{{}}"
+
+# Number of recent samples kept per stage
+TIMING_WINDOW = 100
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_timings(samples: list[float]) -> dict[str, Any]:
+    """Return the count and percentiles of samples, in milliseconds."""
+    summary: dict[str, Any] = {"count": len(samples)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(samples, pct) * 1000, 2)
+    return summary
+
+
+class Metrics:
+    """Counters and stage timings collected for a config entry while it is loaded."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.counters: Counter[str] = Counter()
+        self.timings: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=TIMING_WINDOW)
+        )
+        self.tool_calls: Counter[str] = Counter()
+        self.tool_errors: Counter[str] = Counter()
+        self.tool_timings: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=TIMING_WINDOW)
+        )
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] += amount
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        """Record how long a stage of a turn took."""
+        self.timings[stage].append(seconds)
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Time the wrapped block as a stage, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(stage, time.perf_counter() - started)
+
+    def record_usage(self, usage: Any) -> None:
+        """Add the token usage reported at the end of a stream."""
+        if prompt_tokens := getattr(usage, "prompt_tokens", None):
+            self.increment(PROMPT_TOKENS, prompt_tokens)
+        if completion_tokens := getattr(usage, "completion_tokens", None):
+            self.increment(COMPLETION_TOKENS, completion_tokens)
+        details = getattr(usage, "prompt_tokens_details", None)
+        if cached_tokens := getattr(details, "cached_tokens", None):
+            self.increment(CACHED_TOKENS, cached_tokens)
+
+    def record_tool_call(self, name: str, seconds: float, failed: bool) -> None:
+        """Record a tool call and how long it took."""
+        self.tool_calls[name] += 1
+        if failed:
+            self.tool_errors[name] += 1
+        self.tool_timings[name].append(seconds)
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters for inspection."""
+        return dict(self.counters)
+
+    def stage_percentiles(self) -> dict[str, dict[str, Any]]:
+        """Return the percentiles of the recent timings of each stage."""
+        return {
+            stage: summarize_timings(list(samples))
+            for stage, samples in self.timings.items()
+            if samples
+        }
+
+    def tool_stats(self) -> dict[str, dict[str, Any]]:
+        """Return the call and error counts and recent durations of each tool."""
+        return {
+            name: {
+                "calls": calls,
+                "errors": self.tool_errors[name],
+                **summarize_timings(list(self.tool_timings[name])),
+            }
+            for name, calls in self.tool_calls.items()
+        }
+
+
+def get_metrics(hass: HomeAssistant, entry: ConfigEntry) -> Metrics:
+    """Return the metrics for an entry."""
+    entry_data = hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {})
+    if (metrics := entry_data.get("metrics")) is None:
+        metrics = entry_data["metrics"] = Metrics()
+    return metrics
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts of a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+
+    def hit(self) -> None:
+        """Record a lookup that was served from the cache."""
+        self.hits += 1
+
+    def miss(self) -> None:
+        """Record a lookup that had to be computed."""
+        self.misses += 1
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Return the share of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats for inspection."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "hit_rate": round(self.hit_rate, 3) if self.hit_rate is not None else None,
+        }
+
+
+CACHE_STATS: HassKey[dict[str, CacheStats]] = HassKey(f"{DOMAIN}_cache_stats")
+
+
+def get_cache_stats(hass: HomeAssistant, name: str) -> CacheStats:
+    """Return the stats of a named cache, which are shared by all entries."""
+    caches = hass.data.setdefault(CACHE_STATS, {})
+    if (stats := caches.get(name)) is None:
+        stats = caches[name] = CacheStats()
+    return stats
@@ -2,25 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
-
-from langfuse import Langfuse
-from langfuse.api import CreateScoreConfigRequest, ScoreConfigDataType
-from langfuse.model import Prompt
-from langfuse import observe
+import math
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import template
-from homeassistant.util import yaml as yaml_util, dt as dt_util
+from homeassistant.util import dt as dt_util, yaml as yaml_util
 
+from . import deadline
 from .const import (
+    API_PROMPT_EXPOSED_ENTITIES_SUMMARY,
     CONF_API_PROMPT_BASE,
     CONF_CUSTOM_PROMPTS_SECTION,
     CONF_ENABLE_LANGFUSE,
+    CONF_ENTITY_ENCODING,
     CONF_INSTRUCTIONS_PROMPT,
     CONF_LANGFUSE_API_PROMPT_ID,
     CONF_LANGFUSE_API_PROMPT_LABEL,
@@ -32,26 +34,37 @@ from .const import (
     CONF_LANGFUSE_SECRET_KEY,
     CONF_LANGFUSE_SECTION,
     CONF_LANGFUSE_TRACING_ENABLED,
+    CONF_PERFORMANCE_SECTION,
     CONF_PROMPT_BASE,
     CONF_PROMPT_DEVICE_KNOWN_LOCATION,
     CONF_PROMPT_DEVICE_UNKNOWN_LOCATION,
     CONF_PROMPT_EXPOSED_ENTITIES,
     CONF_PROMPT_NO_ENABLED_ENTITIES,
     CONF_PROMPT_TIMERS_UNSUPPORTED,
+    CONF_PROMPT_TOKEN_LIMIT,
     DEFAULT_API_PROMPT_BASE,
     DEFAULT_API_PROMPT_DEVICE_KNOWN_LOCATION,
     DEFAULT_API_PROMPT_DEVICE_UNKNOWN_LOCATION,
     DEFAULT_API_PROMPT_EXPOSED_ENTITIES,
     DEFAULT_API_PROMPT_TIMERS_UNSUPPORTED,
     DEFAULT_BASE_PROMPT,
+    DEFAULT_ENTITY_ENCODING,
     DEFAULT_INSTRUCTIONS_PROMPT,
     DEFAULT_PROMPT_NO_ENABLED_ENTITIES,
+    DEFAULT_PROMPT_TOKEN_LIMIT,
+    ENTITY_ENCODING_COMPACT,
     LANGFUSE_SCORE_NAME,
     LANGFUSE_SCORE_NEGATIVE,
     LANGFUSE_SCORE_POSITIVE,
     LOGGER,
 )
+from .lazy_imports import LANGFUSE, async_import, observe
+from .loop_monitor import SECTION_DUMP_ENTITIES, SECTION_RENDER_TEMPLATE, loop_section
+from .metrics import PROMPTS_SUMMARIZED, get_metrics
 
+if TYPE_CHECKING:
+    from langfuse import Langfuse
+    from langfuse.model import Prompt
 
 class LangfuseError(Exception):
     """Base class for Langfuse errors."""
@@ -65,6 +78,74 @@ class LangfusePromptError(LangfuseError):
     """Error getting or compiling Langfuse prompt."""
 
 
+# Group heading for entities that are not in any area in the compact encoding
+NO_AREA = "No area"
+# Rough characters per token, good enough to keep a prompt under a limit
+CHARS_PER_TOKEN = 4
+
+
+def compile_chat_prompt(prompt_object: Prompt, variables: dict[str, Any]) -> str:
+    """Return the text of a compiled Langfuse chat prompt."""
+    return prompt_object.compile(**variables)[0]["content"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def encode_exposed_entities(entities: dict[str, dict[str, Any]], encoding: str) -> str:
+    """Return the exposed entities as text for the prompt."""
+    if encoding == ENTITY_ENCODING_COMPACT:
+        return _encode_compact(entities.values())
+    return yaml_util.dump(list(entities.values()))
+
+
+def _encode_compact(entities: Iterable[dict[str, Any]]) -> str:
+    """Group entities by area, then domain, one line per domain.
+
+    Kitchen, Cook Room:
+      light: Ceiling, Main Light; Counter Strip
+      script: Movie Night (Dims the lights)
+    """
+    areas: dict[str, dict[str, list[str]]] = {}
+    for info in entities:
+        domains = areas.setdefault(info.get("areas", NO_AREA), {})
+        domains.setdefault(info["domain"], []).append(_encode_compact_entity(info))
+    lines = []
+    for area, domains in areas.items():
+        lines.append(f"{area}:")
+        lines.extend(
+            f"  {domain}: {'; '.join(names)}" for domain, names in domains.items()
+        )
+    return "\n".join(lines) + "\n"
+
+
+def summarize_exposed_entities(entities: dict[str, dict[str, Any]]) -> str:
+    """Return the number of entities of each domain in each area."""
+    areas: dict[str, Counter[str]] = {}
+    for info in entities.values():
+        areas.setdefault(info.get("areas", NO_AREA), Counter())[info["domain"]] += 1
+    lines = [API_PROMPT_EXPOSED_ENTITIES_SUMMARY]
+    lines.extend(
+        f"{area}: " + ", ".join(f"{count} {domain}" for domain, count in domains.items())
+        for area, domains in areas.items()
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _encode_compact_entity(info: dict[str, Any]) -> str:
+    """Return an entity's names followed by whatever else is known about it."""
+    text = info["names"]
+    if description := info.get("description"):
+        text += f" ({description})"
+    if (state := info.get("state")) is not None:
+        text += f" = {state}"
+    if attributes := info.get("attributes"):
+        text += " {" + ", ".join(f"{k}: {v}" for k, v in attributes.items()) + "}"
+    return text
+
+
 @dataclass
 class PromptContext:
     """Context for prompt generation."""
@@ -97,6 +178,41 @@ class PromptManager:
             key, default
         )
 
+    def _encode_exposed_entities(
+        self,
+        context: PromptContext,
+        config_entry: ConfigEntry | None,
+        rest_of_prompt: str = "",
+    ) -> str:
+        """Encode the exposed entities in the format configured for the entry.
+
+        If the entities and the rest of the prompt together would pass the
+        entry's token limit, only a summary of the entities is returned.
+        """
+        performance = (
+            config_entry.options.get(CONF_PERFORMANCE_SECTION, {})
+            if config_entry
+            else {}
+        )
+        with loop_section(context.hass, SECTION_DUMP_ENTITIES):
+            encoded = encode_exposed_entities(
+                context.exposed_entities,
+                performance.get(CONF_ENTITY_ENCODING, DEFAULT_ENTITY_ENCODING),
+            )
+        limit = performance.get(CONF_PROMPT_TOKEN_LIMIT, DEFAULT_PROMPT_TOKEN_LIMIT)
+        tokens = estimate_tokens(rest_of_prompt) + estimate_tokens(encoded)
+        if not limit or tokens <= limit:
+            return encoded
+        LOGGER.info(
+            "API prompt would be about %d tokens, over the limit of %d; "
+            "summarizing %d exposed entities instead",
+            tokens,
+            limit,
+            len(context.exposed_entities),
+        )
+        get_metrics(context.hass, config_entry).increment(PROMPTS_SUMMARIZED)
+        return summarize_exposed_entities(context.exposed_entities)
+
     @observe(capture_input=False)
     async def _get_langfuse_prompt(
         self, prompt_id: str, variables: dict[str, Any]
@@ -143,17 +259,18 @@ class PromptManager:
                 config_entry, CONF_INSTRUCTIONS_PROMPT, DEFAULT_INSTRUCTIONS_PROMPT
             )
 
-            return template.Template(
-                base_prompt + "\n" + instructions_prompt,
-                context.hass,
-            ).async_render(
-                {
-                    "ha_name": context.ha_name,
-                    "user_name": context.user_name,
-                    "llm_context": context.llm_context,
-                },
-                parse_result=False,
-            )
+            with loop_section(context.hass, SECTION_RENDER_TEMPLATE):
+                return template.Template(
+                    base_prompt + "\n" + instructions_prompt,
+                    context.hass,
+                ).async_render(
+                    {
+                        "ha_name": context.ha_name,
+                        "user_name": context.user_name,
+                        "llm_context": context.llm_context,
+                    },
+                    parse_result=False,
+                )
         except TemplateError as err:
             LOGGER.error("Error rendering base prompt: %s", err)
             raise
@@ -166,32 +283,33 @@ class PromptManager:
         if config_entry and config_entry.options.get(CONF_LANGFUSE_SECTION, {}).get(
             CONF_ENABLE_LANGFUSE
         ):
+            variables = {
+                "current_time": dt_util.now().strftime("%H:%M"),
+                "current_date": dt_util.now().strftime("%Y-%m-%d"),
+                "ha_name": context.ha_name,
+                "user_name": (context.user_name if context.user_name else "unknown"),
+                "location": (context.location if context.location else "unknown"),
+                # Filled in once the rest of the prompt is known
+                "exposed_entities": "" if context.exposed_entities else None,
+                "supports_timers": (
+                    "This device is not able to start timers."
+                    if not context.supports_timers
+                    else ""
+                ),
+            }
             result = await self._get_langfuse_prompt(
                 config_entry.options.get(CONF_LANGFUSE_SECTION, {}).get(
                     CONF_LANGFUSE_API_PROMPT_ID
                 ),
-                {
-                    "current_time": dt_util.now().strftime("%H:%M"),
-                    "current_date": dt_util.now().strftime("%Y-%m-%d"),
-                    "ha_name": context.ha_name,
-                    "user_name": (
-                        context.user_name if context.user_name else "unknown"
-                    ),
-                    "location": (context.location if context.location else "unknown"),
-                    "exposed_entities": (
-                        yaml_util.dump(list(context.exposed_entities.values()))
-                        if context.exposed_entities
-                        else None
-                    ),
-                    "supports_timers": (
-                        "This device is not able to start timers."
-                        if not context.supports_timers
-                        else ""
-                    ),
-                },
+                variables,
             )
             if result is not None:
                 prompt_object, langfuse_prompt = result
+                if langfuse_prompt and context.exposed_entities:
+                    variables["exposed_entities"] = self._encode_exposed_entities(
+                        context, config_entry, langfuse_prompt
+                    )
+                    langfuse_prompt = compile_chat_prompt(prompt_object, variables)
                 if langfuse_prompt:
                     return prompt_object, langfuse_prompt
         prompt_parts = []
@@ -217,11 +335,12 @@ class PromptManager:
                 CONF_PROMPT_DEVICE_KNOWN_LOCATION,
                 DEFAULT_API_PROMPT_DEVICE_KNOWN_LOCATION,
             )
-            prompt_parts.append(
-                template.Template(location_prompt, context.hass).async_render(
-                    {"location": context.location}, parse_result=False
+            with loop_section(context.hass, SECTION_RENDER_TEMPLATE):
+                prompt_parts.append(
+                    template.Template(location_prompt, context.hass).async_render(
+                        {"location": context.location}, parse_result=False
+                    )
                 )
-            )
         else:
             prompt_parts.append(
                 self._get_prompt_config(
@@ -250,7 +369,11 @@ class PromptManager:
                     DEFAULT_API_PROMPT_EXPOSED_ENTITIES,
                 )
             )
-            prompt_parts.append(yaml_util.dump(list(context.exposed_entities.values())))
+            prompt_parts.append(
+                self._encode_exposed_entities(
+                    context, config_entry, "\n".join(prompt_parts)
+                )
+            )
 
         return "\n".join(prompt_parts)
 
@@ -299,9 +422,11 @@ class LangfuseClient:
             ),
         }
         try:
+            langfuse = await async_import(LANGFUSE)
+            langfuse_api = await async_import(f"{LANGFUSE}.api")
 
             def create_client() -> Langfuse:
-                return Langfuse(
+                return langfuse.Langfuse(
                     public_key=config_entry.options[CONF_LANGFUSE_SECTION][
                         CONF_LANGFUSE_PUBLIC_KEY
                     ],
@@ -335,9 +460,9 @@ class LangfuseClient:
                     None,
                 )
                 if not score_config:
-                    score_config_request = CreateScoreConfigRequest(
+                    score_config_request = langfuse_api.CreateScoreConfigRequest(
                         name=LANGFUSE_SCORE_NAME,
-                        data_type=ScoreConfigDataType.CATEGORICAL,
+                        data_type=langfuse_api.ScoreConfigDataType.CATEGORICAL,
                         categories=[
                             {
                                 "label": LANGFUSE_SCORE_POSITIVE,
@@ -364,16 +489,30 @@ class LangfuseClient:
     async def get_prompt(
         self, prompt_id: str, variables: dict[str, Any]
     ) -> tuple[Prompt, str]:
-        """Get and compile a prompt from Langfuse."""
+        """Get and compile a prompt from Langfuse.
+
+        With a turn deadline, the fetch is bounded by the time left in the
+        turn, and skipped if there is none left.
+        """
+        timeout = deadline.remaining()
+        if timeout is not None and timeout <= 0:
+            raise LangfusePromptError("No time left in the turn to get the prompt")
+        fetch_kwargs = (
+            {} if timeout is None else {"fetch_timeout_seconds": math.ceil(timeout)}
+        )
         try:
             # Get the prompt object in an executor
-            prompt_object = await self.hass.async_add_executor_job(
-                lambda: self._client.get_prompt(
-                    prompt_id, label=self.prompts[prompt_id], type="chat"
+            async with asyncio.timeout(timeout):
+                prompt_object = await self.hass.async_add_executor_job(
+                    lambda: self._client.get_prompt(
+                        prompt_id,
+                        label=self.prompts[prompt_id],
+                        type="chat",
+                        **fetch_kwargs,
+                    )
                 )
-            )
             # Compile the prompt in an executor
-            compiled_prompt = prompt_object.compile(**variables)[0]["content"]
+            compiled_prompt = compile_chat_prompt(prompt_object, variables)
         except Exception as err:
             LOGGER.error("Error getting Langfuse prompt: %s", err)
             raise LangfusePromptError(f"Failed to get Langfuse prompt: {err}") from err
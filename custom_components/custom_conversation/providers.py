@@ -1,9 +1,77 @@
 """Configuration for supported LiteLLM providers."""
 
-from litellm.utils import ProviderConfigManager
-import requests
+from __future__ import annotations
 
-from .const import LOGGER
+from collections.abc import Callable
+from functools import cached_property, partial
+from hashlib import sha256
+import time
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN, LOGGER
+from .lazy_imports import litellm
+from .metrics import get_cache_stats
+
+# How long a fetched model list is reused before asking the provider again
+MODEL_LIST_CACHE_TTL = 600
+MODEL_LIST_TIMEOUT = aiohttp.ClientTimeout(total=5)
+# Upper bound on pages followed for providers that paginate their model list
+MODEL_LIST_MAX_PAGES = 20
+
+MODEL_LIST_CACHE: HassKey[dict[tuple[str, str | None, str], tuple[float, list[str]]]] = (
+    HassKey(f"{DOMAIN}_model_list_cache")
+)
+
+
+class CannotConnect(HomeAssistantError):
+    """The provider could not be reached."""
+
+
+class InvalidAuth(HomeAssistantError):
+    """The provider rejected the API key."""
+
+
+def _hash_api_key(api_key: str | None) -> str:
+    """Hash an API key so it can be used in a cache key without being stored."""
+    if not api_key:
+        return ""
+    return sha256(api_key.encode()).hexdigest()
+
+
+async def _async_get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: dict[str, str] | None = None,
+    headers: dict[str, str] | None = None,
+) -> dict[str, Any] | None:
+    """Fetch a JSON document, logging and returning None on failure.
+
+    Raises InvalidAuth if the provider rejects the API key.
+    """
+    async with session.get(
+        url, params=params, headers=headers, timeout=MODEL_LIST_TIMEOUT
+    ) as response:
+        if response.status in (401, 403):
+            raise InvalidAuth(f"{response.status} - {await response.text()}")
+        if response.status != 200:
+            LOGGER.error(
+                "Error fetching models: %s - %s",
+                response.status,
+                await response.text(),
+            )
+            return None
+        try:
+            return await response.json(content_type=None)
+        except ValueError:
+            LOGGER.error("Error parsing JSON response")
+            return None
 
 
 class LiteLLMProvider:
@@ -21,42 +89,77 @@ class LiteLLMProvider:
         self.key = key
         self.provider_name = provider_name
         self.model_list_path = model_list_path
-        self.default_base_url = None
+        self.manual_default_base_url = manual_default_base_url
         self.supports_custom_base_url = supports_custom_base_url
-        provider_model_info = ProviderConfigManager.get_provider_model_info(
-            model="", provider=self.key
+
+    @cached_property
+    def default_base_url(self) -> str | None:
+        """Return the provider's default base URL, looked up on first use."""
+        provider_model_info = (
+            litellm().utils.ProviderConfigManager.get_provider_model_info(
+                model="", provider=self.key
+            )
         )
         if provider_model_info:
-            self.default_base_url = provider_model_info.get_api_base()
-        elif manual_default_base_url:
-            self.default_base_url = manual_default_base_url
+            return provider_model_info.get_api_base()
+        return self.manual_default_base_url
 
-    def get_supported_models(
-        self, base_url: str | None, api_key: str | None
+    async def async_get_supported_models(
+        self, hass: HomeAssistant, base_url: str | None, api_key: str | None
     ) -> list[str]:
-        """Get the supported models directly from the provider."""
+        """Get the supported models, using a cached list when one is available.
+
+        Raises InvalidAuth if the API key is rejected and CannotConnect if the
+        provider cannot be reached.
+        """
         # Get the default base URL if not provided
-        models = []
         if not base_url:
             base_url = self.default_base_url
 
-        response = requests.get(
-            f"{base_url}{self.model_list_path}",
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=5,
-        )
-        if response.status_code == 200:
-            try:
-                models = response.json().get("data", [])
-                return [model["id"] for model in models]
-            except ValueError:
-                LOGGER.error("Error parsing JSON response")
-        else:
-            LOGGER.error(
-                "Error fetching models: %s - %s",
-                response.status_code,
-                response.text,
+        cache = hass.data.setdefault(MODEL_LIST_CACHE, {})
+        cache_key = (self.key, base_url, _hash_api_key(api_key))
+        stats = get_cache_stats(hass, "model_list")
+        if (cached := cache.get(cache_key)) and cached[0] > time.monotonic():
+            stats.hit()
+            return list(cached[1])
+        stats.miss()
+
+        try:
+            models = await self._async_fetch_models(
+                async_get_clientsession(hass), base_url, api_key
             )
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise CannotConnect(f"Error fetching models: {err}") from err
+
+        if models:
+            cache[cache_key] = (time.monotonic() + MODEL_LIST_CACHE_TTL, models)
+            stats.size = len(cache)
+        return list(models)
+
+    async def _async_fetch_models(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str | None,
+        api_key: str | None,
+    ) -> list[str]:
+        """Fetch the model list directly from an OpenAI compatible provider."""
+        models: list[str] = []
+        params: dict[str, str] = {}
+        for _page in range(MODEL_LIST_MAX_PAGES):
+            body = await _async_get_json(
+                session,
+                f"{base_url}{self.model_list_path}",
+                params=params,
+                headers={"Authorization": f"Bearer {api_key}"},
+            )
+            if body is None:
+                return []
+            page = body.get("data", [])
+            models.extend(model["id"] for model in page)
+            # OpenAI compatible proxies may page the list with has_more/last_id
+            if not body.get("has_more") or not page:
+                break
+            params = {"after": body.get("last_id") or page[-1]["id"]}
         return models
 
 
@@ -72,86 +175,96 @@ class GeminiProvider(LiteLLMProvider):
             supports_custom_base_url=False,  # See: https://github.com/BerriAI/litellm/issues/7830
         )
 
-    def get_supported_models(
-        self, base_url: str | None, api_key: str | None
+    async def _async_fetch_models(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str | None,
+        api_key: str | None,
     ) -> list[str]:
-        """Get the supported models directly from the provider."""
-        # Get the default base URL if not provided
-        if not base_url:
-            base_url = self.default_base_url
-
-        response = requests.get(
-            f"{base_url}{self.model_list_path}?key={api_key}",
-            timeout=5,
-        )
-        if response.status_code == 200:
-            try:
-                models = response.json().get("models", [])
-                # Gemini models are prepended with "models/" which we need to remove
-                for model in models:
-                    model["name"] = model["name"].replace("models/", "")
-                return [model["name"] for model in models]
-            except ValueError:
-                LOGGER.error("Error parsing JSON response")
-        else:
-            LOGGER.error(
-                "Error fetching models: %s - %s",
-                response.status_code,
-                response.text,
+        """Fetch the model list directly from the Gemini API."""
+        models: list[str] = []
+        params = {"key": api_key or "", "pageSize": "1000"}
+        for _page in range(MODEL_LIST_MAX_PAGES):
+            body = await _async_get_json(
+                session, f"{base_url}{self.model_list_path}", params=params
+            )
+            if body is None:
+                return []
+            # Gemini models are prepended with "models/" which we need to remove
+            models.extend(
+                model["name"].replace("models/", "")
+                for model in body.get("models", [])
             )
-        return []
+            if not (page_token := body.get("nextPageToken")):
+                break
+            params = {**params, "pageToken": page_token}
+        return models
 
 
-openai = LiteLLMProvider(
-    key="openai",
-    provider_name="OpenAI",
-    model_list_path="/models",
-    supports_custom_base_url=True,
-)
+# Provider factories by key, in the order they are offered in the config flow
+_PROVIDER_FACTORIES: dict[str, Callable[[], LiteLLMProvider]] = {}
+# Providers that have been asked for, built by their factory on first use
+_PROVIDERS: dict[str, LiteLLMProvider] = {}
 
-gemini = GeminiProvider()
 
-openrouter = LiteLLMProvider(
-    key="openrouter",
-    provider_name="OpenRouter",
-    model_list_path="/models",
-    supports_custom_base_url=True,
-    manual_default_base_url="https://openrouter.ai/api/v1",
-)
+def register_provider(key: str, factory: Callable[[], LiteLLMProvider]) -> None:
+    """Register a provider, built by factory the first time it is needed.
 
-mistral = LiteLLMProvider(
-    key="mistral",
-    provider_name="Mistral",
-    model_list_path="/models",
-    supports_custom_base_url=True,
-    manual_default_base_url="https://api.mistral.ai/v1",
-)
+    Other custom components can call this to offer providers beyond the
+    built-in ones without changing this module.
+    """
+    if key in _PROVIDER_FACTORIES:
+        raise ValueError(f"Provider {key} is already registered")
+    _PROVIDER_FACTORIES[key] = factory
 
-ollama = LiteLLMProvider(
-    key="ollama",
-    provider_name="Ollama",
-    supports_custom_base_url=True,
-)
 
-ollama_chat = LiteLLMProvider(
-    key="ollama_chat",
-    provider_name="Ollama Chat",
-    supports_custom_base_url=True,
-)
+def get_provider(provider_key: str) -> LiteLLMProvider | None:
+    """Get the provider by key."""
+    if (provider := _PROVIDERS.get(provider_key)) is not None:
+        return provider
+    if (factory := _PROVIDER_FACTORIES.get(provider_key)) is None:
+        return None
+    provider = _PROVIDERS[provider_key] = factory()
+    return provider
 
-SUPPORTED_PROVIDERS = [
-    openai,
-    gemini,
-    openrouter,
-    mistral,
-    # ollama, disabled pending litellm fixes for https://github.com/BerriAI/litellm/issues/6135 and https://github.com/BerriAI/litellm/issues/9602
-    # ollama_chat
-]
 
+def get_supported_providers() -> list[LiteLLMProvider]:
+    """Return every registered provider, in the order they were registered."""
+    return [get_provider(provider_key) for provider_key in _PROVIDER_FACTORIES]
 
-def get_provider(provider_key: str) -> LiteLLMProvider | None:
-    """Get the provider by key."""
-    for provider in SUPPORTED_PROVIDERS:
-        if provider.key == provider_key:
-            return provider
-    return None
+
+register_provider(
+    "openai",
+    partial(
+        LiteLLMProvider,
+        key="openai",
+        provider_name="OpenAI",
+        model_list_path="/models",
+        supports_custom_base_url=True,
+    ),
+)
+register_provider("gemini", GeminiProvider)
+register_provider(
+    "openrouter",
+    partial(
+        LiteLLMProvider,
+        key="openrouter",
+        provider_name="OpenRouter",
+        model_list_path="/models",
+        supports_custom_base_url=True,
+        manual_default_base_url="https://openrouter.ai/api/v1",
+    ),
+)
+register_provider(
+    "mistral",
+    partial(
+        LiteLLMProvider,
+        key="mistral",
+        provider_name="Mistral",
+        model_list_path="/models",
+        supports_custom_base_url=True,
+        manual_default_base_url="https://api.mistral.ai/v1",
+    ),
+)
+# ollama and ollama_chat are disabled pending litellm fixes for
+# https://github.com/BerriAI/litellm/issues/6135 and https://github.com/BerriAI/litellm/issues/9602
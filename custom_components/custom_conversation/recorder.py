@@ -0,0 +1,77 @@
+"""Recording of provider streams for offline replay.
+
+Each completion is written to its own JSON lines file with one
+``{"delay": seconds, "chunk": {...}}`` record per chunk, where the delay is
+the time since the previous chunk, or since the request was sent for the
+first one. The benchmarks' fake LLM server replays these files, so
+production latency profiles can be reproduced without calling a provider.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+import json
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from litellm.types.utils import StreamingChatCompletionChunk
+
+RECORDINGS_DIR = f"{DOMAIN}_recordings"
+# Oldest recordings are removed once there are more than this many
+MAX_RECORDINGS = 200
+
+
+def recording_path(hass: HomeAssistant, conversation_id: str) -> Path:
+    """Return a new recording path; names sort in the order they were made."""
+    name = f"{dt_util.utcnow():%Y%m%dT%H%M%S%f}_{slugify(conversation_id)}.jsonl"
+    return Path(hass.config.path(RECORDINGS_DIR, name))
+
+
+async def async_record_stream(
+    hass: HomeAssistant,
+    stream: AsyncIterator[StreamingChatCompletionChunk],
+    path: Path,
+    started: float,
+) -> AsyncIterator[StreamingChatCompletionChunk]:
+    """Pass a stream through, writing it to path once it ends.
+
+    Started is the time.perf_counter() value when the request was sent.
+    """
+    records: list[dict[str, Any]] = []
+    last = started
+    try:
+        async for chunk in stream:
+            now = time.perf_counter()
+            records.append(
+                {
+                    "delay": round(now - last, 6),
+                    "chunk": chunk.model_dump(exclude_none=True),
+                }
+            )
+            last = now
+            yield chunk
+    finally:
+        if records:
+            hass.async_add_executor_job(_write_recording, path, records)
+
+
+def _write_recording(path: Path, records: list[dict[str, Any]]) -> None:
+    """Write a recording and remove the oldest ones over the limit."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as file:
+            file.writelines(
+                json.dumps(record, separators=(",", ":"), default=str) + "\n"
+                for record in records
+            )
+        for old in sorted(path.parent.glob("*.jsonl"))[:-MAX_RECORDINGS]:
+            old.unlink(missing_ok=True)
+    except OSError as err:
+        LOGGER.warning("Failed to write stream recording %s: %s", path, err)
@@ -0,0 +1,445 @@
+"""Model routing for the Custom Conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Coroutine
+from dataclasses import dataclass, field
+from functools import partial
+import inspect
+from statistics import median
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import deadline
+from .const import (
+    CONF_FIRST_TOKEN_TIMEOUT,
+    CONF_HEDGE_DELAY,
+    CONF_HEDGE_TARGET,
+    CONF_PERFORMANCE_SECTION,
+    CONF_PRIMARY_API_KEY,
+    CONF_PRIMARY_BASE_URL,
+    CONF_PRIMARY_CHAT_MODEL,
+    CONF_PRIMARY_PROVIDER,
+    CONF_ROUTING_MODE,
+    CONF_SECONDARY_API_KEY,
+    CONF_SECONDARY_BASE_URL,
+    CONF_SECONDARY_CHAT_MODEL,
+    CONF_SECONDARY_PROVIDER,
+    CONF_SECONDARY_PROVIDER_ENABLED,
+    DEFAULT_FIRST_TOKEN_TIMEOUT,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_TARGET,
+    DEFAULT_ROUTING_MODE,
+    DOMAIN,
+    HEDGE_TARGET_SECONDARY,
+    LOGGER,
+    ROUTING_MODE_LATENCY,
+)
+from .lazy_imports import litellm
+from .metrics import (
+    FALLBACKS,
+    HEDGES_FIRED,
+    HEDGES_WON,
+    STAGE_FIRST_TOKEN,
+    Metrics,
+    get_metrics,
+)
+
+if TYPE_CHECKING:
+    from litellm import Router
+    from litellm.types.utils import StreamingChatCompletionChunk
+
+# Number of recent requests kept per deployment for latency and error stats
+HEALTH_WINDOW = 20
+# A deployment is put in cooldown after this many failures in a row...
+COOLDOWN_CONSECUTIVE_FAILURES = 3
+# ...or when at least half of a reasonably sized window failed
+COOLDOWN_ERROR_RATE = 0.5
+COOLDOWN_MIN_SAMPLES = 5
+COOLDOWN_SECONDS = 60
+
+
+@dataclass(frozen=True, slots=True)
+class Deployment:
+    """A provider/model pair configured on an entry."""
+
+    provider: str
+    model_name: str
+    api_base: str | None
+    api_key: str | None
+
+    def as_model_list_entry(self) -> dict[str, Any]:
+        """Return the deployment in LiteLLM Router model_list format."""
+        return {
+            "model_name": self.model_name,
+            "litellm_params": {
+                "model": self.model_name,
+                "api_base": self.api_base,
+                "api_key": self.api_key,
+            },
+        }
+
+
+def get_deployments(entry: ConfigEntry) -> list[Deployment]:
+    """Return the configured deployments, primary first."""
+    deployments = [
+        Deployment(
+            provider=entry.data.get(CONF_PRIMARY_PROVIDER),
+            model_name=f"{entry.data.get(CONF_PRIMARY_PROVIDER)}/{entry.data.get(CONF_PRIMARY_CHAT_MODEL)}",
+            api_base=entry.data.get(CONF_PRIMARY_BASE_URL),
+            api_key=entry.data.get(CONF_PRIMARY_API_KEY),
+        )
+    ]
+    if entry.data.get(CONF_SECONDARY_PROVIDER_ENABLED):
+        deployments.append(
+            Deployment(
+                provider=entry.data.get(CONF_SECONDARY_PROVIDER),
+                model_name=f"{entry.data.get(CONF_SECONDARY_PROVIDER)}/{entry.data.get(CONF_SECONDARY_CHAT_MODEL)}",
+                api_base=entry.data.get(CONF_SECONDARY_BASE_URL),
+                api_key=entry.data.get(CONF_SECONDARY_API_KEY),
+            )
+        )
+    return deployments
+
+
+def get_router(hass: HomeAssistant, entry: ConfigEntry) -> Router:
+    """Return the LiteLLM router for an entry, creating it on first use.
+
+    The router is kept for the lifetime of the entry so its HTTP clients and
+    connection pools are reused between conversation turns. Reloading the
+    entry (which happens on every options or reconfigure change) drops it.
+    Fallback between deployments is handled by async_stream_completion so
+    that each attempt can be attributed to the deployment that served it.
+    """
+    entry_data = hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {})
+    if (router := entry_data.get("router")) is not None:
+        return router
+
+    router = litellm().Router(
+        model_list=[
+            deployment.as_model_list_entry() for deployment in get_deployments(entry)
+        ],
+    )
+    entry_data["router"] = router
+    return router
+
+
+@dataclass(slots=True)
+class DeploymentHealth:
+    """Rolling latency and error statistics for a single deployment."""
+
+    ttfts: deque[float] = field(default_factory=lambda: deque(maxlen=HEALTH_WINDOW))
+    outcomes: deque[bool] = field(
+        default_factory=lambda: deque(maxlen=HEALTH_WINDOW)
+    )
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    last_error: str | None = None
+    successes: int = 0
+    failures: int = 0
+
+    @property
+    def ttft(self) -> float | None:
+        """Return the median time to first token, in seconds."""
+        return median(self.ttfts) if self.ttfts else None
+
+    @property
+    def error_rate(self) -> float:
+        """Return the fraction of recent requests that failed."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def in_cooldown(self, now: float) -> bool:
+        """Return True if the deployment should be avoided right now."""
+        return now < self.cooldown_until
+
+    def record_success(self, ttft: float) -> None:
+        """Record a request that produced its first chunk after ttft seconds."""
+        self.ttfts.append(ttft)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.successes += 1
+
+    def record_failure(self, err: Exception, now: float) -> None:
+        """Record a failed request, starting a cooldown if it is unhealthy."""
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.failures += 1
+        self.last_error = repr(err)
+        if self.consecutive_failures >= COOLDOWN_CONSECUTIVE_FAILURES or (
+            len(self.outcomes) >= COOLDOWN_MIN_SAMPLES
+            and self.error_rate >= COOLDOWN_ERROR_RATE
+        ):
+            self.cooldown_until = now + COOLDOWN_SECONDS
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the current state for inspection."""
+        return {
+            "ttft": self.ttft,
+            "error_rate": self.error_rate,
+            "requests": len(self.outcomes),
+            "consecutive_failures": self.consecutive_failures,
+            "in_cooldown": self.in_cooldown(now),
+            "cooldown_remaining": max(self.cooldown_until - now, 0.0),
+            "last_error": self.last_error,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class RoutingHealth:
+    """Health of every deployment configured on an entry."""
+
+    def __init__(self) -> None:
+        """Initialize the health tracker."""
+        self._deployments: dict[str, DeploymentHealth] = {}
+
+    def get(self, deployment: Deployment) -> DeploymentHealth:
+        """Return the stats for a deployment, creating them if needed."""
+        return self._deployments.setdefault(
+            deployment.model_name, DeploymentHealth()
+        )
+
+    def ordered(self, deployments: list[Deployment]) -> list[Deployment]:
+        """Order deployments healthy first, then fastest first.
+
+        A deployment without samples sorts as if it were instant, so each one
+        is tried at least once before the faster one is preferred. Ties keep
+        the configured order.
+        """
+        now = time.monotonic()
+        return sorted(
+            deployments,
+            key=lambda deployment: (
+                self.get(deployment).in_cooldown(now),
+                self.get(deployment).ttft or 0.0,
+            ),
+        )
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the state of every deployment for inspection."""
+        now = time.monotonic()
+        return {
+            model_name: health.as_dict(now)
+            for model_name, health in self._deployments.items()
+        }
+
+
+def get_health(hass: HomeAssistant, entry: ConfigEntry) -> RoutingHealth:
+    """Return the routing health tracker for an entry."""
+    entry_data = hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {})
+    if (health := entry_data.get("health")) is None:
+        health = entry_data["health"] = RoutingHealth()
+    return health
+
+
+async def _async_tracked_stream(
+    first_chunk: StreamingChatCompletionChunk,
+    stream: AsyncIterator[StreamingChatCompletionChunk],
+    health: DeploymentHealth,
+) -> AsyncIterator[StreamingChatCompletionChunk]:
+    """Yield an already started stream, recording a failure if it breaks."""
+    yield first_chunk
+    try:
+        async for chunk in stream:
+            yield chunk
+    except Exception as err:
+        health.record_failure(err, time.monotonic())
+        raise
+
+
+async def _async_close_stream(stream: Any) -> None:
+    """Close a stream that will not be consumed so its connection is released."""
+    # LiteLLM's stream wrapper has no close of its own; close what it wraps
+    raw_stream = getattr(stream, "completion_stream", stream)
+    close = getattr(raw_stream, "aclose", None) or getattr(raw_stream, "close", None)
+    if close is None:
+        return
+    try:
+        if inspect.isawaitable(result := close()):
+            await result
+    except Exception as err:  # noqa: BLE001 - the stream is being discarded anyway
+        LOGGER.debug("Error closing discarded stream: %s", err)
+
+
+async def _async_attempt(
+    router: Router,
+    routing: RoutingHealth,
+    deployment: Deployment,
+    completion_kwargs: dict[str, Any],
+    first_token_timeout: float | None,
+) -> tuple[StreamingChatCompletionChunk, AsyncIterator, DeploymentHealth]:
+    """Start a stream on one deployment and wait for its first chunk.
+
+    The connect and read timeouts of the request are bounded by the time
+    left in the turn, and the wait for the first chunk additionally by
+    first_token_timeout.
+    """
+    health = routing.get(deployment)
+    started = time.monotonic()
+    stream = None
+    try:
+        async with asyncio.timeout(deadline.budget(first_token_timeout)):
+            stream = await router.acompletion(
+                **{
+                    **completion_kwargs,
+                    "model": deployment.model_name,
+                    "timeout": deadline.remaining(),
+                },
+                fallbacks=[],
+            )
+            first_chunk = await anext(aiter(stream))
+    except asyncio.CancelledError:
+        if stream is not None:
+            await _async_close_stream(stream)
+        raise
+    except Exception as err:
+        # Includes the first token timeout, which ends the block as TimeoutError
+        if stream is not None:
+            await _async_close_stream(stream)
+        health.record_failure(err, time.monotonic())
+        LOGGER.warning("Completion with %s failed: %s", deployment.model_name, err)
+        raise
+    health.record_success(time.monotonic() - started)
+    return first_chunk, stream, health
+
+
+async def _async_first_available(
+    metrics: Metrics,
+    router: Router,
+    routing: RoutingHealth,
+    deployments: list[Deployment],
+    completion_kwargs: dict[str, Any],
+    *,
+    first_token_timeout: float | None,
+) -> tuple[StreamingChatCompletionChunk, AsyncIterator, DeploymentHealth]:
+    """Try each deployment in turn, raising the last error if all fail."""
+    last_err: Exception | None = None
+    for deployment in deployments:
+        try:
+            result = await _async_attempt(
+                router, routing, deployment, completion_kwargs, first_token_timeout
+            )
+        except Exception as err:  # noqa: BLE001 - raised if every deployment fails
+            last_err = err
+            continue
+        if last_err is not None:
+            metrics.increment(FALLBACKS)
+        return result
+    assert last_err is not None
+    raise last_err
+
+
+async def _async_discard(task: asyncio.Task) -> None:
+    """Cancel a losing attempt and close its stream if it had already started."""
+    task.cancel()
+    await asyncio.wait({task})
+    if not task.cancelled() and task.exception() is None:
+        await _async_close_stream(task.result()[1])
+
+
+async def _async_hedged(
+    metrics: Metrics,
+    attempt: Coroutine[Any, Any, tuple],
+    hedge: Callable[[], Coroutine[Any, Any, tuple]],
+    delay: float,
+) -> tuple[StreamingChatCompletionChunk, AsyncIterator, DeploymentHealth]:
+    """Run an attempt, starting a hedge if it has no first chunk after delay.
+
+    Whichever of the two produces a first chunk first wins and the other is
+    cancelled. If both fail, the error from the original attempt is raised.
+    """
+    primary = asyncio.create_task(attempt)
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+
+        metrics.increment(HEDGES_FIRED)
+        backup = asyncio.create_task(hedge())
+        pending = {primary, backup}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is None:
+                continue
+            for task in done - {winner}:
+                await _async_discard(task)
+            if winner is backup:
+                metrics.increment(HEDGES_WON)
+            return winner.result()
+        return primary.result()
+    finally:
+        for task in pending:
+            await _async_discard(task)
+
+
+async def async_stream_completion(
+    hass: HomeAssistant, entry: ConfigEntry, completion_kwargs: dict[str, Any]
+) -> AsyncIterator[StreamingChatCompletionChunk]:
+    """Start a streaming completion on the best available deployment.
+
+    Deployments are tried in configured order, or fastest healthy first in
+    latency routing mode. A deployment counts as failed if it errors before
+    producing its first chunk, in which case the next one is tried; once a
+    chunk has arrived the stream is committed to that deployment. The error
+    from the last attempt is raised if every deployment fails. An attempt
+    with no first chunk within the first token timeout counts as failed.
+
+    With hedging enabled, a second request is sent to the hedge target if no
+    chunk has arrived after the hedge delay, and the first to answer is used.
+    """
+    router = get_router(hass, entry)
+    routing = get_health(hass, entry)
+    deployments = get_deployments(entry)
+    performance = entry.options.get(CONF_PERFORMANCE_SECTION, {})
+    if performance.get(CONF_ROUTING_MODE, DEFAULT_ROUTING_MODE) == ROUTING_MODE_LATENCY:
+        deployments = routing.ordered(deployments)
+
+    # 0 means no first token timeout
+    first_token_timeout = (
+        performance.get(CONF_FIRST_TOKEN_TIMEOUT, DEFAULT_FIRST_TOKEN_TIMEOUT) or None
+    )
+    metrics = get_metrics(hass, entry)
+    attempt = _async_first_available(
+        metrics,
+        router,
+        routing,
+        deployments,
+        completion_kwargs,
+        first_token_timeout=first_token_timeout,
+    )
+    with metrics.timed(STAGE_FIRST_TOKEN):
+        if not (hedge_delay := performance.get(CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY)):
+            first_chunk, stream, health = await attempt
+        else:
+            backup = deployments[0]
+            if (
+                performance.get(CONF_HEDGE_TARGET, DEFAULT_HEDGE_TARGET)
+                == HEDGE_TARGET_SECONDARY
+                and len(deployments) > 1
+            ):
+                backup = deployments[1]
+            first_chunk, stream, health = await _async_hedged(
+                metrics,
+                attempt,
+                partial(
+                    _async_attempt,
+                    router,
+                    routing,
+                    backup,
+                    completion_kwargs,
+                    first_token_timeout,
+                ),
+                hedge_delay / 1000,
+            )
+    return _async_tracked_stream(first_chunk, stream, health)
@@ -0,0 +1,242 @@
+"""Usage and latency sensors for Custom Conversation."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from . import CustomConversationConfigEntry
+from .const import DOMAIN
+from .metrics import (
+    CACHED_TOKENS,
+    COMPLETION_TOKENS,
+    FALLBACKS,
+    PROMPT_TOKENS,
+    SIGNAL_METRICS_UPDATED,
+    STAGE_FIRST_TOKEN,
+    STAGE_TURN,
+    Metrics,
+    get_metrics,
+    summarize_timings,
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DailyTotalSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor that totals a metrics counter over the current day."""
+
+    counter: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class LatencySensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor that reports the recent latency of a stage."""
+
+    stage: str
+
+
+DAILY_TOTAL_SENSORS = (
+    DailyTotalSensorEntityDescription(
+        key=PROMPT_TOKENS,
+        translation_key=PROMPT_TOKENS,
+        counter=PROMPT_TOKENS,
+    ),
+    DailyTotalSensorEntityDescription(
+        key=COMPLETION_TOKENS,
+        translation_key=COMPLETION_TOKENS,
+        counter=COMPLETION_TOKENS,
+    ),
+    DailyTotalSensorEntityDescription(
+        key=CACHED_TOKENS,
+        translation_key=CACHED_TOKENS,
+        counter=CACHED_TOKENS,
+    ),
+    DailyTotalSensorEntityDescription(
+        key=FALLBACKS,
+        translation_key=FALLBACKS,
+        counter=FALLBACKS,
+    ),
+)
+
+LATENCY_SENSORS = (
+    LatencySensorEntityDescription(
+        key="time_to_first_token",
+        translation_key="time_to_first_token",
+        stage=STAGE_FIRST_TOKEN,
+    ),
+    LatencySensorEntityDescription(
+        key="turn_latency",
+        translation_key="turn_latency",
+        stage=STAGE_TURN,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: CustomConversationConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up usage and latency sensors."""
+    entities: list[SensorEntity] = [
+        DailyTotalSensor(config_entry, description)
+        for description in DAILY_TOTAL_SENSORS
+    ]
+    entities.extend(
+        LatencySensor(config_entry, description) for description in LATENCY_SENSORS
+    )
+    async_add_entities(entities)
+
+
+class CustomConversationSensor(SensorEntity):
+    """A sensor fed by the metrics of a config entry."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        entry: CustomConversationConfigEntry,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entry = entry
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+        )
+        self._metrics: Metrics | None = None
+
+    @property
+    def metrics(self) -> Metrics:
+        """Return the entry's metrics.
+
+        They are kept once read so that a sensor being removed while its entry
+        unloads still sees the counters it was reporting.
+        """
+        if self._metrics is None:
+            self._metrics = get_metrics(self.hass, self.entry)
+        return self._metrics
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever a conversation turn finishes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_METRICS_UPDATED.format(self.entry.entry_id),
+                self._async_metrics_updated,
+            )
+        )
+
+    @callback
+    def _async_metrics_updated(self) -> None:
+        """Write the new state."""
+        self.async_write_ha_state()
+
+
+class DailyTotalSensor(CustomConversationSensor, RestoreSensor):
+    """Total of a counter since midnight, carried over restarts and reloads."""
+
+    entity_description: DailyTotalSensorEntityDescription
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+        self,
+        entry: CustomConversationConfigEntry,
+        description: DailyTotalSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(entry, description)
+        self._attr_last_reset = dt_util.start_of_local_day()
+        # Today's total from before the counters were last reset
+        self._carried_over = 0
+        # Counter value when the current day started
+        self._baseline = 0
+
+    @property
+    def _counter(self) -> int:
+        """Return the current value of the counter."""
+        return self.metrics.counters[self.entity_description.counter]
+
+    @property
+    def native_value(self) -> int:
+        """Return the total since midnight."""
+        return self._carried_over + self._counter - self._baseline
+
+    async def async_added_to_hass(self) -> None:
+        """Restore today's total and reset it at midnight."""
+        await super().async_added_to_hass()
+        self._baseline = self._counter
+        if (
+            (last_state := await self.async_get_last_state()) is not None
+            and (last_reset := last_state.attributes.get("last_reset")) is not None
+            and dt_util.parse_datetime(last_reset) == self._attr_last_reset
+            and (last_data := await self.async_get_last_sensor_data()) is not None
+        ):
+            self._carried_over = int(last_data.native_value or 0)
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_reset, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_reset(self, now: datetime) -> None:
+        """Start a new day."""
+        self._attr_last_reset = dt_util.start_of_local_day(now)
+        self._carried_over = 0
+        self._baseline = self._counter
+        self.async_write_ha_state()
+
+
+class LatencySensor(CustomConversationSensor):
+    """Median of the recent timings of a stage, with higher percentiles."""
+
+    entity_description: LatencySensorEntityDescription
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+
+    @property
+    def _summary(self) -> dict[str, Any] | None:
+        """Return the percentiles of the stage, if it has been timed."""
+        samples = self.metrics.timings.get(self.entity_description.stage)
+        return summarize_timings(list(samples)) if samples else None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the median latency in milliseconds."""
+        if (summary := self._summary) is None:
+            return None
+        return summary["p50_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the sample count and the higher percentiles."""
+        if (summary := self._summary) is None:
+            return None
+        return {
+            "samples": summary["count"],
+            "p90": summary["p90_ms"],
+            "p99": summary["p99_ms"],
+        }
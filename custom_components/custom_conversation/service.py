@@ -1,9 +1,11 @@
 """Services for Custom Conversation Integrations."""
 
-from litellm import OpenAIError, image_generation
+import asyncio
+from typing import Any
+
 import voluptuous as vol
 
-from homeassistant.const import CONF_API_KEY
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import (
     HomeAssistant,
     ServiceCall,
@@ -17,20 +19,103 @@ from homeassistant.helpers import (
     selector,
 )
 
+from .batch import async_track_batch, get_batch_client
 from .const import (
-    CONF_BASE_URL,
+    CONF_AGENTS_SECTION,
+    CONF_ENABLE_LLM_AGENT,
+    DEFAULT_BATCH_PARALLELISM,
+    DEFAULT_IMAGE_MODEL,
     DOMAIN,
+    IMAGE_GENERATION_CONCURRENCY,
+    IMAGE_GENERATION_TIMEOUT,
     LANGFUSE_SCORE_NEGATIVE,
     LANGFUSE_SCORE_POSITIVE,
+    MAX_BATCH_PARALLELISM,
+    MAX_IMAGES_PER_PROMPT,
     SERVICE_GENERATE_IMAGE,
+    SERVICE_GET_ROUTING_STATUS,
+    SERVICE_PROCESS_BATCH,
+    SERVICE_SUBMIT_BATCH_JOB,
 )
+from .lazy_imports import LITELLM, async_import, litellm
+from .metrics import get_metrics
+from .routing import get_deployments, get_health
+
+
+def get_image_semaphore(hass: HomeAssistant, entry: ConfigEntry) -> asyncio.Semaphore:
+    """Return the semaphore limiting concurrent image renders for an entry."""
+    entry_data = hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {})
+    if (semaphore := entry_data.get("image_semaphore")) is None:
+        semaphore = entry_data["image_semaphore"] = asyncio.Semaphore(
+            IMAGE_GENERATION_CONCURRENCY
+        )
+    return semaphore
+
+
+async def _async_render_image(
+    hass: HomeAssistant, entry: ConfigEntry, prompt: str, options: dict[str, Any]
+) -> dict[str, Any]:
+    """Render one image once the entry has a free slot."""
+    # Image models share the primary provider's credentials
+    deployment = get_deployments(entry)[0]
+    async with get_image_semaphore(hass, entry), asyncio.timeout(
+        IMAGE_GENERATION_TIMEOUT
+    ):
+        response = await litellm().aimage_generation(
+            api_key=deployment.api_key,
+            api_base=deployment.api_base,
+            prompt=prompt,
+            response_format="url",
+            n=1,
+            **options,
+        )
+    return response.data[0].model_dump(exclude={"b64_json"})
+
+
+def _image_error(err: Exception) -> str:
+    """Describe why an image could not be rendered."""
+    if isinstance(err, TimeoutError):
+        return f"timed out after {IMAGE_GENERATION_TIMEOUT} seconds"
+    return str(err)
+
+
+BATCH_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required("text"): cv.string,
+        vol.Optional("device_id"): cv.string,
+        vol.Optional("user_id"): cv.string,
+        vol.Optional("language"): cv.string,
+    }
+)
+
+
+def _batch_item(value: Any) -> dict[str, Any]:
+    """Validate a batch item, given either as a prompt or as a dict."""
+    if isinstance(value, str):
+        value = {"text": value}
+    return BATCH_ITEM_SCHEMA(value)
+
+
+BATCH_JOB_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required("text"): cv.string,
+        vol.Optional("id"): cv.string,
+    }
+)
+
+
+def _batch_job_item(value: Any) -> dict[str, Any]:
+    """Validate a batch job prompt, given either as text or as a dict."""
+    if isinstance(value, str):
+        value = {"text": value}
+    return BATCH_JOB_ITEM_SCHEMA(value)
 
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up the services for the Custom Conversation Integrations."""
 
     async def render_image(call: ServiceCall) -> ServiceResponse:
-        """Render an image with dall-e."""
+        """Render n images for each prompt, a few at a time."""
         entry_id = call.data["config_entry"]
         entry = hass.config_entries.async_get_entry(entry_id)
 
@@ -41,23 +126,39 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 translation_placeholders={"config_entry": entry_id},
             )
 
-        try:
-
-            response = await hass.async_add_executor_job(lambda: image_generation(
-                api_key=entry.data.get(CONF_API_KEY),
-                base_url=entry.data.get(CONF_BASE_URL),
-                model="dall-e-3",
-                prompt=call.data["prompt"],
-                size=call.data["size"],
-                quality=call.data["quality"],
-                style=call.data["style"],
-                response_format="url",
-                n=1,
-            ))
-        except OpenAIError as err:
-            raise HomeAssistantError(f"Error generating image: {err}") from err
+        options = {"model": call.data["model"], "size": call.data["size"]}
+        # Only some models, such as dall-e-3, accept a quality and style
+        options.update(
+            (key, call.data[key]) for key in ("quality", "style") if key in call.data
+        )
+        await async_import(LITELLM)
+        # Not every image model accepts n > 1, so each image is its own request
+        prompts = [
+            prompt for prompt in call.data["prompt"] for _ in range(call.data["n"])
+        ]
+        results = await asyncio.gather(
+            *(_async_render_image(hass, entry, prompt, options) for prompt in prompts),
+            return_exceptions=True,
+        )
+        # Images that rendered are paid for, so one failure does not fail the rest
+        images: list[dict[str, Any]] = []
+        errors: list[Exception] = []
+        for prompt, result in zip(prompts, results, strict=True):
+            if isinstance(result, Exception):
+                errors.append(result)
+                images.append({"prompt": prompt, "error": _image_error(result)})
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                images.append(result)
+        if len(errors) == len(images):
+            raise HomeAssistantError(
+                f"Error generating image: {_image_error(errors[0])}"
+            ) from errors[0]
 
-        return response.data[0].model_dump(exclude={"b64_json"})
+        # The first image stays at the top level for existing automations
+        first_image = next(image for image in images if "error" not in image)
+        return {**first_image, "images": images}
 
     hass.services.async_register(
         DOMAIN,
@@ -70,17 +171,155 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                         "integration": DOMAIN,
                     }
                 ),
-                vol.Required("prompt"): cv.string,
+                vol.Required("prompt"): vol.All(cv.ensure_list, [cv.string]),
+                vol.Optional("n", default=1): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=MAX_IMAGES_PER_PROMPT)
+                ),
+                vol.Optional("model", default=DEFAULT_IMAGE_MODEL): cv.string,
                 vol.Optional("size", default="1024x1024"): vol.In(
                     ("1024x1024", "1024x1792", "1792x1024")
                 ),
-                vol.Optional("quality", default="standard"): vol.In(("standard", "hd")),
-                vol.Optional("style", default="vivid"): vol.In(("vivid", "natural")),
+                vol.Optional("quality"): vol.In(("standard", "hd")),
+                vol.Optional("style"): vol.In(("vivid", "natural")),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def get_routing_status(call: ServiceCall) -> ServiceResponse:
+        """Return the routing health of each deployment on an entry."""
+        entry_id = call.data["config_entry"]
+        entry = hass.config_entries.async_get_entry(entry_id)
+
+        if entry is None or entry.domain != DOMAIN:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="invalid_config_entry",
+                translation_placeholders={"config_entry": entry_id},
+            )
+
+        return {
+            "deployments": get_health(hass, entry).as_dict(),
+            "metrics": get_metrics(hass, entry).as_dict(),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_ROUTING_STATUS,
+        get_routing_status,
+        schema=vol.Schema(
+            {
+                vol.Required("config_entry"): selector.ConfigEntrySelector(
+                    {
+                        "integration": DOMAIN,
+                    }
+                ),
             }
         ),
         supports_response=SupportsResponse.ONLY,
     )
 
+    async def process_batch(call: ServiceCall) -> ServiceResponse:
+        """Run several prompts through an entry's LLM agent at once."""
+        entry_id = call.data["config_entry"]
+        entry = hass.config_entries.async_get_entry(entry_id)
+
+        if entry is None or entry.domain != DOMAIN:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="invalid_config_entry",
+                translation_placeholders={"config_entry": entry_id},
+            )
+        if not entry.options.get(CONF_AGENTS_SECTION, {}).get(CONF_ENABLE_LLM_AGENT):
+            raise HomeAssistantError("The LLM agent is not enabled for this entry.")
+        if (agent := hass.data.get(DOMAIN, {}).get(entry_id, {}).get("agent")) is None:
+            raise HomeAssistantError("The conversation agent is not loaded.")
+
+        # Context given on an item overrides the one given for the whole batch
+        defaults = {
+            "device_id": call.data.get("device_id"),
+            "user_id": call.data.get("user_id") or call.context.user_id,
+            "language": call.data.get("language") or hass.config.language,
+        }
+        items = [
+            {**defaults, **{key: value for key, value in item.items() if value}}
+            for item in call.data["prompts"]
+        ]
+        return {
+            "results": await agent.async_process_batch(
+                items, call.data["max_parallel"]
+            )
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROCESS_BATCH,
+        process_batch,
+        schema=vol.Schema(
+            {
+                vol.Required("config_entry"): selector.ConfigEntrySelector(
+                    {
+                        "integration": DOMAIN,
+                    }
+                ),
+                vol.Required("prompts"): vol.All(cv.ensure_list, [_batch_item]),
+                vol.Optional("device_id"): cv.string,
+                vol.Optional("user_id"): cv.string,
+                vol.Optional("language"): cv.string,
+                vol.Optional("max_parallel", default=DEFAULT_BATCH_PARALLELISM): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=MAX_BATCH_PARALLELISM)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def submit_batch_job(call: ServiceCall) -> ServiceResponse:
+        """Send prompts to the primary provider as a batch job."""
+        entry_id = call.data["config_entry"]
+        entry = hass.config_entries.async_get_entry(entry_id)
+
+        if entry is None or entry.domain != DOMAIN:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="invalid_config_entry",
+                translation_placeholders={"config_entry": entry_id},
+            )
+
+        # Prompts without an id are identified by their position
+        prompts: dict[str, str] = {}
+        for index, item in enumerate(call.data["prompts"]):
+            prompt_id = item.get("id") or str(index)
+            if prompt_id in prompts:
+                raise ServiceValidationError(
+                    translation_domain=DOMAIN,
+                    translation_key="duplicate_batch_prompt_id",
+                    translation_placeholders={"id": prompt_id},
+                )
+            prompts[prompt_id] = item["text"]
+        client = get_batch_client(hass, entry, call.data.get("model"))
+        batch_id = await client.async_submit(prompts)
+        await async_track_batch(hass, entry, client, batch_id, list(prompts))
+        return {"batch_id": batch_id}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SUBMIT_BATCH_JOB,
+        submit_batch_job,
+        schema=vol.Schema(
+            {
+                vol.Required("config_entry"): selector.ConfigEntrySelector(
+                    {
+                        "integration": DOMAIN,
+                    }
+                ),
+                vol.Required("prompts"): vol.All(cv.ensure_list, [_batch_job_item]),
+                vol.Optional("model"): cv.string,
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     async def score_conversation(call: ServiceCall):
         """Score the most recent conversation processed by a device."""
         entry_id = call.data["config_entry"]
@@ -0,0 +1,94 @@
+"""Background warm-up of LiteLLM and provider connections."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from typing import TYPE_CHECKING
+
+from yarl import URL
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_PERFORMANCE_SECTION,
+    CONF_PREWARM_COMPLETION,
+    DEFAULT_PREWARM_COMPLETION,
+    LOGGER,
+)
+from .lazy_imports import LITELLM, async_import
+from .providers import get_provider
+from .routing import Deployment, get_deployments, get_router
+
+if TYPE_CHECKING:
+    from litellm import Router
+
+WARM_UP_TIMEOUT = 10
+
+
+def _get_api_base(deployment: Deployment) -> str | None:
+    """Return the configured api_base, or the provider default."""
+    if deployment.api_base:
+        return deployment.api_base
+    if provider := get_provider(deployment.provider):
+        return provider.default_base_url
+    return None
+
+
+async def _async_resolve(hass: HomeAssistant, deployment: Deployment) -> None:
+    """Resolve the host for a deployment so the OS resolver cache is warm."""
+    if not (api_base := _get_api_base(deployment)):
+        return
+    url = URL(api_base)
+    if not url.host:
+        return
+    try:
+        async with asyncio.timeout(WARM_UP_TIMEOUT):
+            await hass.loop.getaddrinfo(url.host, url.port, type=socket.SOCK_STREAM)
+    except (OSError, TimeoutError) as err:
+        LOGGER.debug("Unable to resolve %s during warm-up: %s", url.host, err)
+
+
+async def _async_warm_completion(router: Router, deployment: Deployment) -> None:
+    """Send a one-token completion so the router's client has an open connection."""
+    try:
+        async with asyncio.timeout(WARM_UP_TIMEOUT):
+            await router.acompletion(
+                model=deployment.model_name,
+                messages=[{"role": "user", "content": "Hi"}],
+                max_tokens=1,
+                fallbacks=[],
+                num_retries=0,
+            )
+    except Exception as err:  # noqa: BLE001 - warm-up is best effort
+        LOGGER.debug(
+            "Warm-up completion for %s failed: %s", deployment.model_name, err
+        )
+
+
+async def async_warm_up(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Warm up everything the first conversation turn would otherwise pay for.
+
+    Imports LiteLLM, builds the entry's router and resolves each configured
+    provider host. Resolving a host does not open a connection: LiteLLM's
+    clients only connect when they send a request, so a connection is only
+    warmed when the warm-up completion is enabled, which sends a tiny
+    completion through the router. Failures are only logged; the integration
+    works the same without them.
+    """
+    await async_import(LITELLM)
+    deployments = get_deployments(entry)
+    router = get_router(hass, entry)
+
+    await asyncio.gather(
+        *(_async_resolve(hass, deployment) for deployment in deployments)
+    )
+
+    if entry.options.get(CONF_PERFORMANCE_SECTION, {}).get(
+        CONF_PREWARM_COMPLETION, DEFAULT_PREWARM_COMPLETION
+    ):
+        await asyncio.gather(
+            *(_async_warm_completion(router, deployment) for deployment in deployments)
+        )
+    LOGGER.debug("Warm-up finished for %s", entry.title)
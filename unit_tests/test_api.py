@@ -7,20 +7,26 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 import voluptuous as vol
 
 from custom_components.custom_conversation.api import (
+    LIVE_CONTEXT_UNCHANGED,
     CustomLLMAPI,
     GetLiveContextTool,
     IntentTool,
     _get_exposed_entities,
+    async_get_intent_tool_catalog,
+    async_get_script_tool_cache,
 )
 from custom_components.custom_conversation.const import (
     CONF_IGNORED_INTENTS,
     CONF_IGNORED_INTENTS_SECTION,
     LLM_API_ID,
 )
+from custom_components.custom_conversation.metrics import get_cache_stats, get_metrics
 from custom_components.custom_conversation.prompt_manager import (
     PromptContext,
     PromptManager,
 )
+from homeassistant.components.conversation import ToolResultContent
+from homeassistant.const import EVENT_SERVICE_REMOVED
 from homeassistant.core import Context
 from homeassistant.helpers import (
     device_registry as dr,
@@ -120,6 +126,17 @@ def mock_script(entity_registry, hass):
     return entity
 
 
+@pytest.fixture
+def mock_entity_index(mock_target_entity):
+    """Fixture for an index over the mocked light."""
+    index = MagicMock(entity_ids={mock_target_entity.entity_id: None})
+    index.candidates.return_value = [mock_target_entity.entity_id]
+    with patch(
+        "custom_components.custom_conversation.api.async_get_exposed_entity_index",
+        return_value=index,
+    ):
+        yield index
+
 @pytest.fixture
 def mock_llm_context(mock_assist_device) -> MagicMock:
     """Fixture for a mocked LLMContext."""
@@ -152,15 +169,15 @@ def test_custom_llm_api_set_langfuse_client(custom_llm_api, mock_prompt_manager)
     mock_prompt_manager.set_langfuse_client.assert_called_once_with(mock_client)
 
 @pytest.mark.asyncio
-async def test_custom_llm_api_get_api_instance(custom_llm_api, mock_llm_context, mock_exposed_entities_data, mock_assist_device):
-    """Test getting an API instance."""
+async def test_custom_llm_api_get_api_instance(custom_llm_api, hass, config_entry, mock_llm_context, mock_exposed_entities_data, mock_assist_device):
+    """Test getting an API instance that records tool calls in the entry's metrics."""
     mock_api_prompt = "Test API Prompt"
     mock_tools = [MagicMock(spec=llm.Tool)]
 
     with patch("custom_components.custom_conversation.api._get_exposed_entities", return_value=mock_exposed_entities_data) as mock_get_exposed, \
          patch.object(custom_llm_api, "_async_get_api_prompt", return_value=mock_api_prompt) as mock_get_prompt, \
          patch.object(custom_llm_api, "_async_get_tools", return_value=mock_tools) as mock_get_tools, \
-         patch("homeassistant.helpers.llm.APIInstance") as mock_api_instance_cls, \
+         patch("custom_components.custom_conversation.api.MeteredAPIInstance") as mock_api_instance_cls, \
          patch("homeassistant.helpers.llm.selector_serializer") as mock_serializer:
 
         instance = await custom_llm_api.async_get_api_instance(mock_llm_context)
@@ -176,6 +193,7 @@ async def test_custom_llm_api_get_api_instance(custom_llm_api, mock_llm_context,
             llm_context=mock_llm_context,
             tools=mock_tools,
             custom_serializer=mock_serializer,
+            metrics=get_metrics(hass, config_entry),
         )
         assert instance is mock_api_instance_cls.return_value
 
@@ -250,6 +268,71 @@ async def test_custom_llm_api_get_tools_no_exposed_entities(custom_llm_api, hass
         assert not any(isinstance(tool, GetLiveContextTool) for tool in tools)
 
 
+@pytest.mark.asyncio
+async def test_intent_tool_catalog(hass):
+    """Test intent tool lists are shared until the registered intents change."""
+    turn_on = MagicMock(spec=intent.IntentHandler, intent_type="HassTurnOn", description=None, slot_schema=None, platforms=None)
+    light_set = MagicMock(spec=intent.IntentHandler, intent_type="HassLightSet", description=None, slot_schema=None, platforms={"light"})
+    handlers = [turn_on, light_set]
+    catalog = async_get_intent_tool_catalog(hass)
+
+    with patch("custom_components.custom_conversation.api.intent.async_get", return_value=handlers):
+        tools = catalog.async_get(set(), {"light"}, str)
+        assert [tool.name for tool in tools] == ["HassTurnOn", "HassLightSet"]
+        assert catalog.async_get(set(), {"light"}, str) is tools
+        assert [tool.name for tool in catalog.async_get(set(), {"switch"}, str)] == ["HassTurnOn"]
+        assert [tool.name for tool in catalog.async_get({"HassTurnOn"}, None, str)] == ["HassLightSet"]
+
+        handlers.pop()
+        assert [tool.name for tool in catalog.async_get(set(), {"light"}, str)] == ["HassTurnOn"]
+
+    stats = get_cache_stats(hass, "intent_tools")
+    assert (stats.hits, stats.misses) == (1, 4)
+
+
+@pytest.mark.asyncio
+async def test_custom_llm_api_get_tools_reuses_script_tools(custom_llm_api, hass, mock_llm_context, mock_script):
+    """Test script tools are built once and shared by later requests."""
+    with patch("custom_components.custom_conversation.api.intent.async_get", return_value=[]), \
+         patch("custom_components.custom_conversation.api.async_device_supports_timers", return_value=False), \
+         patch("custom_components.custom_conversation.api.async_should_expose", return_value=True), \
+         patch("custom_components.custom_conversation.api.llm.ScriptTool", side_effect=lambda hass, entity_id: MagicMock(entity_id=entity_id)) as mock_script_tool_cls:
+
+        first = custom_llm_api._async_get_tools(mock_llm_context, {})  # noqa: SLF001
+        second = custom_llm_api._async_get_tools(mock_llm_context, {})  # noqa: SLF001
+
+        assert first == second
+        assert first[0].entity_id == mock_script.entity_id
+        mock_script_tool_cls.assert_called_once_with(hass, mock_script.entity_id)
+
+    stats = get_cache_stats(hass, "script_tools")
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_script_tool_cache_warm_up(hass, mock_script):
+    """Test warming up builds every script, and reloading drops them."""
+    with patch("custom_components.custom_conversation.api.llm.ScriptTool") as mock_script_tool_cls, \
+         patch("custom_components.custom_conversation.api._get_cached_script_parameters") as mock_get_script_params:
+        cache = async_get_script_tool_cache(hass)
+        cache.async_warm_up()
+
+        mock_get_script_params.assert_called_once_with(hass, mock_script.entity_id)
+        mock_script_tool_cls.assert_called_once_with(hass, mock_script.entity_id)
+        assert cache.async_get(mock_script.entity_id) is mock_script_tool_cls.return_value
+        assert mock_script_tool_cls.call_count == 1
+
+        hass.bus.async_fire(EVENT_SERVICE_REMOVED, {"domain": "script", "service": "my_script"})
+        await hass.async_block_till_done()
+        cache.async_get(mock_script.entity_id)
+        assert mock_script_tool_cls.call_count == 2
+
+        hass.states.async_set(mock_script.entity_id, "unknown", {"friendly_name": "Renamed"})
+        await hass.async_block_till_done()
+        cache.async_get(mock_script.entity_id)
+        assert mock_script_tool_cls.call_count == 3
+
+
 def test_intent_tool_init():
     """Test IntentTool initialization."""
     mock_handler = MagicMock(
@@ -476,6 +559,47 @@ async def test_get_live_context_tool_no_filter(hass, mock_llm_context, mock_targ
         assert "Test Light" in response["result"]
 
 
+@pytest.mark.asyncio
+async def test_get_live_context_tool_repeated_call(hass, mock_llm_context, mock_target_entity):
+    """Test a repeated call in the same conversation only reports what changed."""
+    mock_entities = {
+        mock_target_entity.entity_id: {
+            "names": "Test Light",
+            "domain": "light",
+            "state": "on",
+        }
+    }
+    chat_log = MagicMock(conversation_id="conversation_1", content=[])
+    tool = GetLiveContextTool(chat_log)
+
+    with patch(
+        "custom_components.custom_conversation.api._get_exposed_entities",
+        return_value=mock_entities,
+    ):
+        first_input = llm.ToolInput(tool_name="GetLiveContext", tool_args={})
+        first = await tool.async_call(hass, first_input, mock_llm_context)
+        chat_log.content.append(
+            ToolResultContent(
+                agent_id="conversation.test",
+                tool_call_id=first_input.id,
+                tool_name="GetLiveContext",
+                tool_result=first,
+            )
+        )
+        second = await tool.async_call(
+            hass, llm.ToolInput(tool_name="GetLiveContext", tool_args={}), mock_llm_context
+        )
+        full = await tool.async_call(
+            hass,
+            llm.ToolInput(tool_name="GetLiveContext", tool_args={"full": True}),
+            mock_llm_context,
+        )
+
+    assert "Test Light" in first["result"]
+    assert second == {"success": True, "result": LIVE_CONTEXT_UNCHANGED}
+    assert "Test Light" in full["result"]
+
+
 @pytest.mark.asyncio
 async def test_get_live_context_tool_no_exposed_entities(hass, mock_llm_context):
     """Test GetLiveContextTool when nothing is exposed."""
@@ -492,37 +616,44 @@ async def test_get_live_context_tool_no_exposed_entities(hass, mock_llm_context)
 
 
 @pytest.mark.asyncio
-async def test_get_live_context_tool_filter_no_match(hass, mock_llm_context, mock_target_entity):
+async def test_get_live_context_tool_filter_no_match(hass, mock_llm_context, mock_target_entity, mock_entity_index):
     """Test GetLiveContextTool returns an error when the name filter matches nothing."""
     tool_input = llm.ToolInput(
         tool_name="GetLiveContext", tool_args={"name": "Nonexistent Entity"}
     )
-    mock_entities = {
-        mock_target_entity.entity_id: {
-            "names": "Test Light",
-            "domain": "light",
-            "state": "on",
-        }
-    }
 
     with patch(
         "custom_components.custom_conversation.api._get_exposed_entities",
-        return_value=mock_entities,
-    ):
+    ) as mock_get_exposed:
         tool = GetLiveContextTool()
         response = await tool.async_call(hass, tool_input, mock_llm_context)
 
+        mock_entity_index.candidates.assert_called_once_with(
+            "Nonexistent Entity", None, None
+        )
+        mock_get_exposed.assert_not_called()
         assert response["success"] is False
         assert "Nonexistent Entity" in response["error"]
 
 
 @pytest.mark.asyncio
-async def test_get_live_context_tool_domain_filter_match(hass, mock_llm_context, mock_target_entity):
-    """Test GetLiveContextTool with a string domain filter returns the matched subset."""
+async def test_get_live_context_tool_filter_nothing_exposed(hass, mock_llm_context, mock_entity_index):
+    """Test GetLiveContextTool with a filter when nothing is exposed."""
+    tool_input = llm.ToolInput(tool_name="GetLiveContext", tool_args={"domain": "light"})
+    mock_entity_index.entity_ids = {}
+
+    tool = GetLiveContextTool()
+    response = await tool.async_call(hass, tool_input, mock_llm_context)
+
+    assert response == {"success": False, "error": "No entities are exposed"}
+
+
+@pytest.mark.asyncio
+async def test_get_live_context_tool_domain_filter_match(hass, mock_llm_context, mock_target_entity, mock_entity_index):
+    """Test GetLiveContextTool with a string domain filter only serializes the matches."""
     tool_input = llm.ToolInput(tool_name="GetLiveContext", tool_args={"domain": "light"})
     mock_entities = {
         mock_target_entity.entity_id: {"names": "Test Light", "domain": "light", "state": "on"},
-        "sensor.other": {"names": "Other", "domain": "sensor", "state": "5"},
     }
     mock_match_result = MagicMock(
         is_match=True,
@@ -532,21 +663,30 @@ async def test_get_live_context_tool_domain_filter_match(hass, mock_llm_context,
     with patch(
         "custom_components.custom_conversation.api._get_exposed_entities",
         return_value=mock_entities,
-    ), patch(
+    ) as mock_get_exposed, patch(
         "custom_components.custom_conversation.api.intent.async_match_targets",
         return_value=mock_match_result,
     ) as mock_match:
         tool = GetLiveContextTool()
         response = await tool.async_call(hass, tool_input, mock_llm_context)
 
+        mock_entity_index.candidates.assert_called_once_with(None, None, ["light"])
         assert mock_match.call_args.args[1].domains == ["light"]
+        assert [state.entity_id for state in mock_match.call_args.kwargs["states"]] == [
+            mock_target_entity.entity_id
+        ]
+        mock_get_exposed.assert_called_once_with(
+            hass,
+            mock_llm_context.assistant,
+            include_state=True,
+            states=mock_match_result.states,
+        )
         assert response["success"] is True
         assert "Test Light" in response["result"]
-        assert "Other" not in response["result"]
 
 
 @pytest.mark.asyncio
-async def test_get_live_context_tool_domain_filter_list_strips_blanks(hass, mock_llm_context, mock_target_entity):
+async def test_get_live_context_tool_domain_filter_list_strips_blanks(hass, mock_llm_context, mock_target_entity, mock_entity_index):
     """Test GetLiveContextTool normalizes a list domain filter, dropping blank entries."""
     tool_input = llm.ToolInput(
         tool_name="GetLiveContext", tool_args={"domain": ["Light", "  ", "Sensor"]}
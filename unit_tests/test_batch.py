@@ -0,0 +1,363 @@
+"""Tests for Custom Conversation provider batch jobs."""
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.batch import (
+    BATCH_STATUS_COMPLETED,
+    BATCH_STATUS_EXPIRED,
+    BATCH_STATUS_FAILED,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    BatchError,
+    BatchJob,
+    GeminiBatchClient,
+    OpenAIBatchClient,
+    async_get_pending_batches,
+    async_resume_batches,
+    async_track_batch,
+    async_wait_for_batch,
+    get_batch_client,
+)
+from custom_components.custom_conversation.const import (
+    BATCH_COMPLETED_EVENT,
+    CONF_PRIMARY_API_KEY,
+    CONF_PRIMARY_CHAT_MODEL,
+    CONF_PRIMARY_PROVIDER,
+    CONFIG_VERSION,
+    DOMAIN,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+OPENAI_URL = "https://api.openai.com/v1"
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+def _openai_output_line(custom_id: str, content: str) -> str:
+    """Return one line of an OpenAI batch output file."""
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": content}}]},
+            },
+            "error": None,
+        }
+    )
+
+
+async def test_openai_batch(hass: HomeAssistant, aioclient_mock) -> None:
+    """Test a batch is uploaded, started and read back from the stub endpoints."""
+    aioclient_mock.post(f"{OPENAI_URL}/files", json={"id": "file-in"})
+    aioclient_mock.post(
+        f"{OPENAI_URL}/batches", json={"id": "batch_1", "status": "validating"}
+    )
+    aioclient_mock.get(
+        f"{OPENAI_URL}/batches/batch_1",
+        json={
+            "id": "batch_1",
+            "status": "completed",
+            "output_file_id": "file-out",
+            "error_file_id": "file-err",
+        },
+    )
+    aioclient_mock.get(
+        f"{OPENAI_URL}/files/file-out/content",
+        text=_openai_output_line("morning", "Good morning!"),
+    )
+    aioclient_mock.get(
+        f"{OPENAI_URL}/files/file-err/content",
+        text=json.dumps(
+            {
+                "custom_id": "evening",
+                "response": None,
+                "error": {"message": "Model overloaded"},
+            }
+        ),
+    )
+    client = OpenAIBatchClient(
+        async_get_clientsession(hass), "test-api-key", None, "gpt-4o-mini"
+    )
+
+    batch_id = await client.async_submit(
+        {"morning": "Say good morning", "evening": "Say good evening"}
+    )
+    job = await client.async_check(batch_id)
+
+    assert batch_id == "batch_1"
+    assert aioclient_mock.mock_calls[0][3] == {"Authorization": "Bearer test-api-key"}
+    assert aioclient_mock.mock_calls[1][2] == {
+        "input_file_id": "file-in",
+        "endpoint": "/v1/chat/completions",
+        "completion_window": "24h",
+    }
+    assert job.status == BATCH_STATUS_COMPLETED
+    assert job.results == {
+        "morning": {"response": "Good morning!"},
+        "evening": {"error": "Model overloaded"},
+    }
+
+
+async def test_openai_batch_in_progress(hass: HomeAssistant, aioclient_mock) -> None:
+    """Test a running batch has no status or results yet."""
+    aioclient_mock.get(
+        f"{OPENAI_URL}/batches/batch_1", json={"id": "batch_1", "status": "in_progress"}
+    )
+    client = OpenAIBatchClient(
+        async_get_clientsession(hass), "test-api-key", None, "gpt-4o-mini"
+    )
+
+    assert await client.async_check("batch_1") == BatchJob("batch_1")
+
+
+async def test_openai_batch_unreadable_lines(
+    hass: HomeAssistant, aioclient_mock
+) -> None:
+    """Test bad output lines don't stop the readable results being collected."""
+    aioclient_mock.get(
+        f"{OPENAI_URL}/batches/batch_1",
+        json={"id": "batch_1", "status": "completed", "output_file_id": "file-out"},
+    )
+    aioclient_mock.get(
+        f"{OPENAI_URL}/files/file-out/content",
+        text="\n".join(
+            [
+                "not json",
+                json.dumps({"response": {"body": {}}}),
+                json.dumps({"custom_id": "empty", "response": {"body": {}}}),
+                _openai_output_line("morning", "Good morning!"),
+            ]
+        ),
+    )
+    client = OpenAIBatchClient(
+        async_get_clientsession(hass), "test-api-key", None, "gpt-4o-mini"
+    )
+
+    job = await client.async_check("batch_1")
+
+    assert job.results == {
+        "empty": {"error": "No answer in the batch output"},
+        "morning": {"response": "Good morning!"},
+    }
+
+
+async def test_gemini_batch(hass: HomeAssistant, aioclient_mock) -> None:
+    """Test a Gemini batch is started inline and its inline results are read."""
+    aioclient_mock.post(
+        f"{GEMINI_URL}/models/gemini-2.0-flash:batchGenerateContent",
+        json={"name": "batches/123"},
+    )
+    aioclient_mock.get(
+        f"{GEMINI_URL}/batches/123",
+        json={
+            "name": "batches/123",
+            "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+            "done": True,
+            "response": {
+                "inlinedResponses": {
+                    "inlinedResponses": [
+                        {
+                            "response": {
+                                "candidates": [
+                                    {"content": {"parts": [{"text": "Hello"}]}}
+                                ]
+                            },
+                            "metadata": {"key": "0"},
+                        },
+                        {"error": {"message": "Blocked"}, "metadata": {"key": "1"}},
+                        {
+                            "response": {"promptFeedback": {"blockReason": "SAFETY"}},
+                            "metadata": {"key": "2"},
+                        },
+                    ]
+                }
+            },
+        },
+    )
+    client = GeminiBatchClient(
+        async_get_clientsession(hass), "test-api-key", None, "gemini-2.0-flash"
+    )
+
+    batch_id = await client.async_submit({"0": "Say hello", "1": "Say something"})
+    job = await client.async_check(batch_id)
+
+    request = aioclient_mock.mock_calls[0][2]["batch"]["input_config"]["requests"]
+    assert request["requests"][1]["metadata"] == {"key": "1"}
+    assert aioclient_mock.mock_calls[0][3] == {"x-goog-api-key": "test-api-key"}
+    assert job.status == BATCH_STATUS_COMPLETED
+    assert job.results == {
+        "0": {"response": "Hello"},
+        "1": {"error": "Blocked"},
+        "2": {"error": "No answer: SAFETY"},
+    }
+
+
+async def test_batch_error_status(hass: HomeAssistant, aioclient_mock) -> None:
+    """Test an error status from the provider raises BatchError."""
+    aioclient_mock.post(f"{OPENAI_URL}/files", status=401, text="Unauthorized")
+    client = OpenAIBatchClient(
+        async_get_clientsession(hass), "bad-key", None, "gpt-4o-mini"
+    )
+
+    with pytest.raises(BatchError, match="401"):
+        await client.async_submit({"0": "Hello"})
+
+
+def test_get_batch_client(hass: HomeAssistant, config_entry) -> None:
+    """Test the client matches the entry's primary provider."""
+    client = get_batch_client(hass, config_entry)
+    assert isinstance(client, OpenAIBatchClient)
+    assert client.model == "gpt-4o-mini"
+    assert get_batch_client(hass, config_entry, "gpt-4o").model == "gpt-4o"
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=CONFIG_VERSION,
+        data={
+            CONF_PRIMARY_PROVIDER: "mistral",
+            CONF_PRIMARY_API_KEY: "test-api-key",
+            CONF_PRIMARY_CHAT_MODEL: "mistral-small",
+        },
+    )
+    with pytest.raises(BatchError, match="not supported"):
+        get_batch_client(hass, entry)
+
+
+async def test_wait_for_batch_fires_event(hass: HomeAssistant, config_entry) -> None:
+    """Test polling backs off, survives errors and fires an event with results."""
+    client = AsyncMock()
+    client.async_check.side_effect = [
+        BatchJob("batch_1"),
+        BatchError("Service unavailable"),
+        BatchJob(
+            "batch_1",
+            BATCH_STATUS_COMPLETED,
+            {"morning": {"response": "Good morning!"}},
+        ),
+    ]
+    events = []
+    hass.bus.async_listen(BATCH_COMPLETED_EVENT, events.append)
+
+    with patch(
+        "custom_components.custom_conversation.batch.asyncio.sleep"
+    ) as mock_sleep:
+        await async_wait_for_batch(
+            hass, config_entry, client, "batch_1", ["morning", "evening"]
+        )
+    await hass.async_block_till_done()
+
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [30, 60, 120]
+    assert events[0].data == {
+        "config_entry": config_entry.entry_id,
+        "batch_id": "batch_1",
+        "status": BATCH_STATUS_COMPLETED,
+        "error": None,
+        "results": [
+            {"id": "morning", "response": "Good morning!"},
+            {"id": "evening", "error": "No result returned"},
+        ],
+    }
+
+
+async def test_wait_for_batch_gives_up(hass: HomeAssistant, config_entry) -> None:
+    """Test polling stops once the job has taken longer than providers allow."""
+    client = AsyncMock()
+    client.async_check.return_value = BatchJob("batch_1")
+    events = []
+    hass.bus.async_listen(BATCH_COMPLETED_EVENT, events.append)
+
+    with (
+        patch("custom_components.custom_conversation.batch.asyncio.sleep"),
+        patch("custom_components.custom_conversation.batch.BATCH_MAX_WAIT", 0),
+    ):
+        await async_wait_for_batch(hass, config_entry, client, "batch_1", ["0"])
+    await hass.async_block_till_done()
+
+    assert events[0].data["status"] == BATCH_STATUS_EXPIRED
+    client.async_check.assert_not_called()
+
+
+async def test_wait_for_batch_unexpected_error(
+    hass: HomeAssistant, config_entry
+) -> None:
+    """Test an unexpected error ends polling with a failed event."""
+    client = AsyncMock()
+    client.async_check.side_effect = KeyError("candidates")
+    events = []
+    hass.bus.async_listen(BATCH_COMPLETED_EVENT, events.append)
+
+    with patch("custom_components.custom_conversation.batch.asyncio.sleep"):
+        await async_wait_for_batch(hass, config_entry, client, "batch_1", ["0"])
+    await hass.async_block_till_done()
+
+    assert events[0].data["status"] == BATCH_STATUS_FAILED
+    assert events[0].data["results"] == [{"id": "0", "error": "No result returned"}]
+
+
+async def test_batch_is_saved_until_it_finishes(
+    hass: HomeAssistant, config_entry, hass_storage
+) -> None:
+    """Test a tracked batch is saved while polling and forgotten afterwards."""
+    client = AsyncMock(model="gpt-4o-mini")
+    client.async_check.return_value = BatchJob("batch_1", BATCH_STATUS_COMPLETED)
+
+    with patch(
+        "custom_components.custom_conversation.batch._async_start_polling"
+    ) as mock_start:
+        await async_track_batch(hass, config_entry, client, "batch_1", ["0"])
+
+    mock_start.assert_called_once()
+    assert hass_storage[STORAGE_KEY]["data"]["batch_1"]["prompt_ids"] == ["0"]
+
+    with patch("custom_components.custom_conversation.batch.asyncio.sleep"):
+        await async_wait_for_batch(hass, config_entry, client, "batch_1", ["0"])
+    assert hass_storage[STORAGE_KEY]["data"] == {}
+
+
+async def test_resume_batches(
+    hass: HomeAssistant, config_entry, hass_storage
+) -> None:
+    """Test batches saved before a restart are polled again."""
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "batch_1": {
+                "entry_id": config_entry.entry_id,
+                "model": "gpt-4o",
+                "prompt_ids": ["morning"],
+                "submitted_at": time.time(),
+            }
+        },
+    }
+    client = AsyncMock()
+    client.async_check.return_value = BatchJob(
+        "batch_1", BATCH_STATUS_COMPLETED, {"morning": {"response": "Hi"}}
+    )
+    events = []
+    hass.bus.async_listen(BATCH_COMPLETED_EVENT, events.append)
+
+    with (
+        patch(
+            "custom_components.custom_conversation.batch.get_batch_client",
+            return_value=client,
+        ) as mock_get_client,
+        patch(
+            "custom_components.custom_conversation.batch.BATCH_POLL_INITIAL_INTERVAL",
+            0,
+        ),
+    ):
+        await async_resume_batches(hass, config_entry)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert mock_get_client.call_args.args[2] == "gpt-4o"
+    assert events[0].data["results"] == [{"id": "morning", "response": "Hi"}]
+    pending = await async_get_pending_batches(hass)
+    assert pending.for_entry(config_entry.entry_id) == {}
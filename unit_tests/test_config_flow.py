@@ -1,7 +1,6 @@
 """Test the Custom Conversation config flow."""
 from unittest.mock import patch
 
-from litellm.exceptions import APIConnectionError, AuthenticationError
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.custom_conversation.config_flow import DEFAULT_OPTIONS
@@ -50,6 +49,7 @@ from custom_components.custom_conversation.const import (
     DEFAULT_TOP_P,
     DOMAIN,
 )
+from custom_components.custom_conversation.providers import CannotConnect, InvalidAuth
 from homeassistant import config_entries
 from homeassistant.const import CONF_LLM_HASS_API
 from homeassistant.core import HomeAssistant
@@ -168,7 +168,7 @@ async def test_config_flow_validation_errors(hass: HomeAssistant):
 
     with patch(
         "custom_components.custom_conversation.config_flow.CustomConversationConfigFlow._validate_credentials_and_get_models",
-        side_effect=AuthenticationError(message="Invalid API Key", llm_provider="openai", model="model"),
+        side_effect=InvalidAuth("Invalid API Key"),
     ):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"], {CONF_PRIMARY_API_KEY: "bad-key"}
@@ -179,7 +179,7 @@ async def test_config_flow_validation_errors(hass: HomeAssistant):
 
     with patch(
         "custom_components.custom_conversation.config_flow.CustomConversationConfigFlow._validate_credentials_and_get_models",
-        side_effect=APIConnectionError(message="Cannot connect", llm_provider="openai", model="model"),
+        side_effect=CannotConnect("Cannot connect"),
     ):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"], {CONF_PRIMARY_API_KEY: "good-key"} # Use same flow ID
@@ -0,0 +1,82 @@
+"""Tests for the Custom Conversation live context memory."""
+
+from custom_components.custom_conversation.context_memory import (
+    LIVE_CONTEXT_MEMORY,
+    MAX_CONVERSATIONS,
+    LiveContextMemory,
+    get_live_context_memory,
+)
+from homeassistant.core import HomeAssistant
+
+FILTERS = (None, "Kitchen", ("light",))
+LAMP = {"names": "Lamp", "domain": "light", "state": "on"}
+LAMP_OFF = {"names": "Lamp", "domain": "light", "state": "off"}
+STRIP = {"names": "Strip", "domain": "light", "state": "on"}
+SPOT = {"names": "Spot", "domain": "light", "state": "on"}
+PENDANT = {"names": "Pendant", "domain": "light", "state": "off"}
+
+
+def test_first_call_is_full():
+    """Test the first call with some filters gets the full result."""
+    memory = LiveContextMemory()
+
+    assert memory.remember(FILTERS, {"light.lamp": LAMP}, "call_1", set()) is None
+
+
+def test_unchanged_and_delta():
+    """Test later calls only get what changed while earlier results are visible."""
+    memory = LiveContextMemory()
+    entities = {
+        "light.lamp": LAMP,
+        "light.strip": STRIP,
+        "light.spot": SPOT,
+        "light.pendant": PENDANT,
+    }
+    memory.remember(FILTERS, entities, "call_1", set())
+
+    delta = memory.remember(FILTERS, dict(entities), "call_2", {"call_1"})
+    assert delta is not None
+    assert (delta.changed, delta.removed) == ({}, [])
+
+    delta = memory.remember(
+        FILTERS,
+        {"light.lamp": LAMP_OFF, "light.strip": STRIP, "light.pendant": PENDANT},
+        "call_3",
+        {"call_1", "call_2"},
+    )
+    assert delta is not None
+    assert delta.changed == {"light.lamp": LAMP_OFF}
+    assert delta.removed == ["Spot"]
+
+
+def test_full_when_earlier_result_is_gone_or_asked_for():
+    """Test a full result is sent when the model can no longer see the basis."""
+    memory = LiveContextMemory()
+    entities = {"light.lamp": LAMP, "light.strip": STRIP}
+    memory.remember(FILTERS, entities, "call_1", set())
+    memory.remember(FILTERS, entities, "call_2", {"call_1"})
+
+    # call_1 was trimmed from the history, so call_2's "unchanged" means nothing
+    assert memory.remember(FILTERS, entities, "call_3", {"call_2"}) is None
+    assert memory.remember(FILTERS, entities, "call_4", {"call_3"}, full=True) is None
+    assert memory.remember(FILTERS, entities, "call_5", {"call_4"}) is not None
+
+
+def test_full_when_most_changed():
+    """Test a full result is sent when most entities changed anyway."""
+    memory = LiveContextMemory()
+    memory.remember(FILTERS, {"light.lamp": LAMP}, "call_1", set())
+
+    assert memory.remember(FILTERS, {"light.lamp": LAMP_OFF}, "call_2", {"call_1"}) is None
+
+
+async def test_conversations_are_bounded(hass: HomeAssistant) -> None:
+    """Test only the most recently used conversations are remembered."""
+    first = get_live_context_memory(hass, "conversation_0")
+    for number in range(1, MAX_CONVERSATIONS):
+        get_live_context_memory(hass, f"conversation_{number}")
+
+    assert get_live_context_memory(hass, "conversation_0") is first
+    get_live_context_memory(hass, "one_too_many")
+    assert get_live_context_memory(hass, "conversation_0") is first
+    assert "conversation_1" not in hass.data[LIVE_CONTEXT_MEMORY]
@@ -1,23 +1,28 @@
 """Unit tests for the Custom Conversation component."""
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 from litellm import RateLimitError
 import pytest
 
 from custom_components.custom_conversation import CustomConversationConfigEntry
+from custom_components.custom_conversation.cc_llm import build_llm_context
 from custom_components.custom_conversation.const import (
     CONF_AGENTS_SECTION,
     CONF_ENABLE_HASS_AGENT,
     CONF_ENABLE_LLM_AGENT,
+    CONF_PERFORMANCE_SECTION,
+    CONF_TURN_TIMEOUT,
     CONVERSATION_ERROR_EVENT,
     LLM_API_ID,
+    TURN_TIMEOUT_RESPONSE,
 )
 from custom_components.custom_conversation.conversation import CustomConversationEntity
 from homeassistant.components import conversation
 from homeassistant.const import CONF_LLM_HASS_API
 from homeassistant.core import Context, HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import intent
+from homeassistant.helpers import intent, llm
 from homeassistant.setup import async_setup_component
 
 
@@ -133,6 +138,44 @@ async def test_custom_conversation_rate_limit_error(hass: HomeAssistant, config_
         assert call_args[0] == str(rate_limit_error)  # Now checking the string value
         assert call_args[1] == "LLM"
 
+async def test_custom_conversation_turn_timeout(hass: HomeAssistant, config_entry: CustomConversationConfigEntry):
+    """Test that a turn exceeding its deadline gets a graceful reply and error event."""
+    assert await async_setup_component(hass, "custom_conversation", {})
+    await hass.async_block_till_done()
+
+    async def stalled_llm(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    with patch(
+        "custom_components.custom_conversation.conversation.CustomConversationEntity._async_handle_message_with_llm",
+        side_effect=stalled_llm,
+    ), patch(
+        "custom_components.custom_conversation.conversation.CustomConversationEntity._async_fire_conversation_error",
+        AsyncMock()
+    ) as mock_fire_error:
+
+        hass.config_entries.async_update_entry(
+            config_entry,
+            options={
+                **config_entry.options,
+                CONF_AGENTS_SECTION: {
+                    CONF_ENABLE_HASS_AGENT: False,
+                    CONF_ENABLE_LLM_AGENT: True,
+                },
+                CONF_PERFORMANCE_SECTION: {CONF_TURN_TIMEOUT: 0.05},
+            },
+        )
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        response = await conversation.async_converse(
+                hass, "hello", "test-conversation-id", Context(), agent_id=config_entry.entry_id
+            )
+
+        assert response.response.speech["plain"]["speech"] == TURN_TIMEOUT_RESPONSE
+        assert mock_fire_error.called
+        call_args = mock_fire_error.call_args[0]
+        assert call_args[0] == "Turn deadline exceeded"
+        assert call_args[1] == "LLM"
+
 async def test_custom_conversation_openai_error(hass: HomeAssistant, config_entry: CustomConversationConfigEntry):
     """Test that general OpenAI errors are properly handled and event is fired."""
     assert await async_setup_component(hass, "custom_conversation", {})
@@ -237,3 +280,62 @@ async def test_async_fire_conversation_error(hass: HomeAssistant, config_entry:
     assert event_data["device_area"] == "Living Room"
     assert event_data["request"] == "Turn on the lights"
     assert event_data["error"] == "Test error message"
+
+
+async def test_shared_llm_data_is_prepared_once(hass: HomeAssistant, config_entry: CustomConversationConfigEntry):
+    """Test batch turns with the same context share one prepared prompt.
+
+    Tools still run with the context of the turn that calls them.
+    """
+    entity = CustomConversationEntity(config_entry, Mock(), hass)
+    entity.hass = hass
+    shared_llm_data = {}
+    prepared = asyncio.Event()
+
+    async def fake_update_llm_data(hass, user_input, entry, chat_log, prompt_manager, llm_api):
+        await prepared.wait()
+        chat_log.content[0] = conversation.SystemContent(content="Prepared prompt")
+        chat_log.extra_system_prompt = None
+        chat_log.llm_api = llm.APIInstance(
+            api=Mock(),
+            api_prompt="",
+            llm_context=build_llm_context(user_input),
+            tools=[],
+        )
+        return "prompt-object"
+
+    def make_turn(device_id):
+        user_input = conversation.ConversationInput(
+            text="Good morning",
+            context=Context(),
+            conversation_id=None,
+            device_id=device_id,
+            satellite_id=None,
+            language="en",
+            agent_id=config_entry.entry_id,
+        )
+        chat_log = conversation.ChatLog(
+            hass,
+            conversation_id=f"conversation-{device_id}-{id(user_input)}",
+            content=[conversation.SystemContent(content="initial")],
+        )
+        return user_input, chat_log
+
+    turns = [make_turn("kitchen"), make_turn("kitchen"), make_turn("bedroom")]
+    with patch(
+        "custom_components.custom_conversation.conversation.async_update_llm_data",
+        side_effect=fake_update_llm_data,
+    ) as mock_update:
+        tasks = [
+            asyncio.create_task(entity._async_update_llm_data(user_input, chat_log, shared_llm_data))  # noqa: SLF001
+            for user_input, chat_log in turns
+        ]
+        await asyncio.sleep(0)
+        prepared.set()
+        results = await asyncio.gather(*tasks)
+
+    assert results == ["prompt-object"] * 3
+    assert mock_update.call_count == 2
+    assert all(chat_log.content[0].content == "Prepared prompt" for _, chat_log in turns)
+    for user_input, chat_log in turns:
+        assert chat_log.llm_api.llm_context.context is user_input.context
@@ -0,0 +1,42 @@
+"""Tests for the Custom Conversation turn deadlines."""
+
+from unittest.mock import patch
+
+from custom_components.custom_conversation import deadline
+
+
+def test_no_deadline() -> None:
+    """Test limits pass through when no turn deadline is set."""
+    assert deadline.remaining() is None
+    assert deadline.budget() is None
+    assert deadline.budget(5) == 5
+
+
+def test_turn_deadline() -> None:
+    """Test the budget is the smaller of the limit and the time left."""
+    with (
+        patch.object(deadline.time, "monotonic", return_value=100.0),
+        deadline.turn_deadline(10),
+    ):
+        assert deadline.remaining() == 10
+        assert deadline.budget(5) == 5
+        assert deadline.budget(30) == 10
+        assert deadline.budget() == 10
+
+        with deadline.turn_deadline(None):
+            assert deadline.remaining() is None
+        with deadline.turn_deadline(0):
+            assert deadline.remaining() is None
+
+        assert deadline.remaining() == 10
+
+    assert deadline.remaining() is None
+
+
+def test_expired_deadline() -> None:
+    """Test the time left never goes negative."""
+    with (
+        patch.object(deadline.time, "monotonic", side_effect=[100.0, 200.0]),
+        deadline.turn_deadline(1),
+    ):
+        assert deadline.remaining() == 0
@@ -0,0 +1,75 @@
+"""Tests for the Custom Conversation device location cache."""
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.device_location import (
+    CACHE_NAME,
+    DeviceLocation,
+    async_get_device_location,
+)
+from custom_components.custom_conversation.metrics import get_cache_stats
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    floor_registry as fr,
+)
+
+
+@pytest.fixture
+def satellite(hass: HomeAssistant) -> str:
+    """Create a voice satellite in the kitchen on the ground floor."""
+    floor = fr.async_get(hass).async_create("Ground Floor")
+    kitchen = ar.async_get(hass).async_create("Kitchen", floor_id=floor.floor_id)
+    config_entry = MockConfigEntry(domain="test")
+    config_entry.add_to_hass(hass)
+    device_registry = dr.async_get(hass)
+    device = device_registry.async_get_or_create(
+        config_entry_id=config_entry.entry_id,
+        identifiers={("test", "satellite")},
+        name="Satellite",
+    )
+    device_registry.async_update_device(device.id, area_id=kitchen.id)
+    return device.id
+
+
+async def test_device_location(hass: HomeAssistant, satellite: str) -> None:
+    """Test a device is resolved to its area and floor."""
+    location = async_get_device_location(hass, satellite)
+    assert location == DeviceLocation(
+        "Satellite",
+        location.area_id,
+        "Kitchen",
+        location.floor_id,
+        "Ground Floor",
+    )
+    assert location.area_id is not None
+    assert location.floor_id is not None
+
+    assert async_get_device_location(hass, None) is None
+    assert async_get_device_location(hass, "missing") is None
+
+
+async def test_device_location_is_cached_until_registries_change(
+    hass: HomeAssistant, satellite: str
+) -> None:
+    """Test locations are reused until a device, area or floor changes."""
+    location = async_get_device_location(hass, satellite)
+    assert async_get_device_location(hass, satellite) is location
+
+    area_registry = ar.async_get(hass)
+    area_registry.async_update(location.area_id, name="Galley")
+    await hass.async_block_till_done()
+    assert async_get_device_location(hass, satellite).area_name == "Galley"
+
+    fr.async_get(hass).async_update(location.floor_id, name="Main Floor")
+    await hass.async_block_till_done()
+    assert async_get_device_location(hass, satellite).floor_name == "Main Floor"
+
+    dr.async_get(hass).async_update_device(satellite, area_id=None)
+    await hass.async_block_till_done()
+    assert async_get_device_location(hass, satellite) == DeviceLocation("Satellite")
+
+    stats = get_cache_stats(hass, CACHE_NAME)
+    assert (stats.hits, stats.misses) == (1, 4)
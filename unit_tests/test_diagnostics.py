@@ -0,0 +1,36 @@
+"""Tests for the Custom Conversation diagnostics."""
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.const import CONF_PRIMARY_API_KEY
+from custom_components.custom_conversation.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.custom_conversation.metrics import (
+    PROMPT_TOKENS,
+    STAGE_TURN,
+    get_cache_stats,
+    get_metrics,
+)
+from homeassistant.core import HomeAssistant
+
+
+async def test_diagnostics(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the diagnostics include metrics and caches, without secrets."""
+    metrics = get_metrics(hass, config_entry)
+    metrics.record_timing(STAGE_TURN, 0.25)
+    metrics.increment(PROMPT_TOKENS, 120)
+    metrics.record_tool_call("GetLiveContext", 0.002, failed=False)
+    get_cache_stats(hass, "script_parameters").hit()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["entry"]["data"][CONF_PRIMARY_API_KEY] == "**REDACTED**"
+    assert "test-api-key" not in str(diagnostics)
+    assert diagnostics["counters"] == {PROMPT_TOKENS: 120}
+    assert diagnostics["stages"][STAGE_TURN]["p50_ms"] == 250.0
+    assert diagnostics["tools"]["GetLiveContext"]["calls"] == 1
+    assert diagnostics["caches"]["script_parameters"]["hits"] == 1
+    assert "loop_monitor" in diagnostics
@@ -0,0 +1,132 @@
+"""Tests for the Custom Conversation exposed entity index."""
+
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.entity_index import (
+    CACHE_NAME,
+    ExposedEntityIndex,
+    async_get_exposed_entity_index,
+    normalize_name,
+)
+from custom_components.custom_conversation.metrics import get_cache_stats
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+ASSISTANT = "conversation"
+
+
+@pytest.fixture(autouse=True)
+def mock_exposure():
+    """Expose every entity except those named hidden."""
+    with (
+        patch(
+            "custom_components.custom_conversation.entity_index.async_should_expose",
+            side_effect=lambda hass, assistant, entity_id: "hidden" not in entity_id,
+        ),
+        patch(
+            "custom_components.custom_conversation.entity_index.async_listen_entity_updates",
+        ),
+    ):
+        yield
+
+
+@pytest.fixture
+def home(hass: HomeAssistant) -> None:
+    """Create a kitchen light on a device, an aliased sensor and a hidden switch."""
+    area_registry = ar.async_get(hass)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    kitchen = area_registry.async_create("Kitchen", aliases={"Cook Room"})
+    area_registry.async_create("Garden")
+
+    config_entry = MockConfigEntry(domain="test")
+    config_entry.add_to_hass(hass)
+    device = device_registry.async_get_or_create(
+        config_entry_id=config_entry.entry_id, identifiers={("test", "lamp")}
+    )
+    device_registry.async_update_device(device.id, area_id=kitchen.id)
+    entity_registry.async_get_or_create(
+        "light", "test", "lamp", suggested_object_id="lamp", device_id=device.id
+    )
+    sensor = entity_registry.async_get_or_create(
+        "sensor", "test", "temp", suggested_object_id="temp"
+    )
+    entity_registry.async_update_entity(
+        sensor.entity_id, aliases={"Thermometer"}, area_id=kitchen.id
+    )
+
+    hass.states.async_set("light.lamp", "on", {"friendly_name": "Counter Lamp"})
+    hass.states.async_set("sensor.temp", "21", {"friendly_name": "Kitchen Temp"})
+    hass.states.async_set("switch.hidden", "off", {"friendly_name": "Counter Lamp"})
+    hass.states.async_set("light.porch", "off", {"friendly_name": "Porch Light"})
+
+
+def test_normalize_name():
+    """Test names are compared without case, punctuation or extra spaces."""
+    assert normalize_name("  Kid's   Room ") == "kids room"
+
+
+async def test_candidates(hass: HomeAssistant, home: None) -> None:
+    """Test filters select entities by name, alias, area, domain and together."""
+    index = ExposedEntityIndex.build(hass, ASSISTANT)
+
+    assert list(index.entity_ids) == ["light.lamp", "sensor.temp", "light.porch"]
+    assert index.candidates(name="counter lamp") == ["light.lamp"]
+    assert index.candidates(name="Thermometer") == ["sensor.temp"]
+    assert index.candidates(area="cook room") == ["light.lamp", "sensor.temp"]
+    assert index.candidates(domains=["light"]) == ["light.lamp", "light.porch"]
+    assert index.candidates(area="Kitchen", domains=["light"]) == ["light.lamp"]
+
+
+async def test_candidates_fall_back_to_everything(
+    hass: HomeAssistant, home: None
+) -> None:
+    """Test filters that select nothing return every exposed entity."""
+    index = ExposedEntityIndex.build(hass, ASSISTANT)
+    everything = ["light.lamp", "sensor.temp", "light.porch"]
+
+    assert index.candidates() == everything
+    assert index.candidates(area="Garden") == everything
+    assert index.candidates(name="Porch Light", area="Kitchen") == everything
+
+
+async def test_candidates_unknown_name_ignores_other_filters(
+    hass: HomeAssistant, home: None
+) -> None:
+    """Test a name missing from the index returns every exposed entity."""
+    index = ExposedEntityIndex.build(hass, ASSISTANT)
+    everything = ["light.lamp", "sensor.temp", "light.porch"]
+
+    assert index.candidates(name="Fridge", area="Kitchen") == everything
+    assert index.candidates(name="Fridge", domains=["light"]) == everything
+
+
+async def test_index_is_cached_until_invalidated(
+    hass: HomeAssistant, home: None
+) -> None:
+    """Test the index is reused until an entity is renamed or added."""
+    index = async_get_exposed_entity_index(hass, ASSISTANT)
+
+    hass.states.async_set("light.lamp", "off", {"friendly_name": "Counter Lamp"})
+    await hass.async_block_till_done()
+    assert async_get_exposed_entity_index(hass, ASSISTANT) is index
+
+    hass.states.async_set("light.lamp", "off", {"friendly_name": "Island Lamp"})
+    await hass.async_block_till_done()
+    renamed = async_get_exposed_entity_index(hass, ASSISTANT)
+    assert renamed is not index
+    assert renamed.candidates(name="Island Lamp") == ["light.lamp"]
+
+    hass.states.async_set("light.new", "on", {"friendly_name": "New Light"})
+    await hass.async_block_till_done()
+    assert "light.new" in async_get_exposed_entity_index(hass, ASSISTANT).entity_ids
+
+    stats = get_cache_stats(hass, CACHE_NAME)
+    assert (stats.hits, stats.misses) == (1, 3)
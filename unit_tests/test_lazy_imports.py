@@ -0,0 +1,58 @@
+"""Tests for the Custom Conversation lazy imports."""
+
+import asyncio
+import sys
+from types import ModuleType
+from unittest.mock import MagicMock, patch
+
+from custom_components.custom_conversation.lazy_imports import (
+    LANGFUSE,
+    async_import,
+    observe,
+)
+from homeassistant.core import HomeAssistant
+
+
+async def test_async_import_shares_one_import(hass: HomeAssistant) -> None:
+    """Test concurrent callers wait for a single executor import."""
+    module = ModuleType("lazy_test_module")
+
+    with patch(
+        "custom_components.custom_conversation.lazy_imports.importlib.import_module",
+        return_value=module,
+    ) as mock_import:
+        results = await asyncio.gather(
+            async_import("lazy_test_module"), async_import("lazy_test_module")
+        )
+
+    assert results == [module, module]
+    mock_import.assert_called_once_with("lazy_test_module")
+
+
+async def test_async_import_reuses_loaded_module(hass: HomeAssistant) -> None:
+    """Test a module that has already been imported is returned as is."""
+    with patch(
+        "custom_components.custom_conversation.lazy_imports.importlib.import_module"
+    ) as mock_import:
+        assert await async_import("json") is sys.modules["json"]
+
+    mock_import.assert_not_called()
+
+
+async def test_observe_applies_decorator_on_first_call(hass: HomeAssistant) -> None:
+    """Test Langfuse's decorator is applied once, when first called."""
+    langfuse = MagicMock()
+    langfuse.observe.return_value = lambda func: func
+
+    @observe(name="lazy_test")
+    async def traced(value: int) -> int:
+        """Return the value doubled."""
+        return value * 2
+
+    assert traced.__name__ == "traced"
+    with patch.dict(sys.modules, {LANGFUSE: langfuse}):
+        langfuse.observe.assert_not_called()
+        assert await traced(2) == 4
+        assert await traced(3) == 6
+
+    langfuse.observe.assert_called_once_with(name="lazy_test")
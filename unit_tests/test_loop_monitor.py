@@ -0,0 +1,75 @@
+"""Tests for the Custom Conversation event loop monitor."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.custom_conversation.loop_monitor import (
+    SECTION_DUMP_ENTITIES,
+    get_loop_monitor,
+    loop_section,
+)
+from homeassistant.core import HomeAssistant
+
+
+async def test_loop_section_disabled(hass: HomeAssistant) -> None:
+    """Test nothing is recorded unless an entry enables the monitor."""
+    with loop_section(hass, SECTION_DUMP_ENTITIES):
+        pass
+
+    assert get_loop_monitor(hass).as_dict() == {
+        "enabled": False,
+        "threshold_ms": None,
+        "sections": {},
+    }
+
+
+async def test_loop_section_logs_slow_sections(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test slow sections are counted and logged with their call site."""
+    monitor = get_loop_monitor(hass)
+    monitor.enable("entry_1", 5)
+    monitor.enable("entry_2", 50)
+
+    # The first section takes 1 ms and the second 10 ms
+    mock_time = MagicMock()
+    mock_time.perf_counter.side_effect = [0.0, 0.001, 1.0, 1.01]
+    with patch(
+        "custom_components.custom_conversation.loop_monitor.time", mock_time
+    ):
+        with loop_section(hass, SECTION_DUMP_ENTITIES):
+            pass
+        with loop_section(hass, SECTION_DUMP_ENTITIES):
+            pass
+
+    stats = monitor.as_dict()["sections"][SECTION_DUMP_ENTITIES]
+    assert monitor.as_dict()["threshold_ms"] == 5
+    assert stats["count"] == 2
+    assert stats["slow"] == 1
+    assert stats["max_ms"] >= 10
+    assert "test_loop_monitor.py" in stats["last_slow_call_site"]
+    assert "test_loop_section_logs_slow_sections" in stats["last_slow_call_site"]
+    assert "dump_entities blocked the event loop" in caplog.text
+
+    monitor.disable("entry_1")
+    monitor.disable("entry_2")
+    assert not monitor.enabled
+
+
+async def test_diagnostics(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the loop monitor counters are in the diagnostics."""
+    get_loop_monitor(hass).enable(config_entry.entry_id, 20)
+    with loop_section(hass, SECTION_DUMP_ENTITIES):
+        pass
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["loop_monitor"]["enabled"]
+    assert diagnostics["loop_monitor"]["sections"][SECTION_DUMP_ENTITIES]["count"] == 1
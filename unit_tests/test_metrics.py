@@ -0,0 +1,101 @@
+"""Tests for the Custom Conversation metrics."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.custom_conversation.metrics import (
+    CACHED_TOKENS,
+    COMPLETION_TOKENS,
+    PROMPT_TOKENS,
+    STAGE_PROMPT,
+    TIMING_WINDOW,
+    CacheStats,
+    Metrics,
+)
+
+
+def test_timed_records_stage_even_when_raising():
+    """Test a timed block is recorded whether or not it raises."""
+    metrics = Metrics()
+
+    with metrics.timed(STAGE_PROMPT):
+        pass
+    with pytest.raises(ValueError), metrics.timed(STAGE_PROMPT):
+        raise ValueError
+
+    assert len(metrics.timings[STAGE_PROMPT]) == 2
+    assert all(seconds >= 0 for seconds in metrics.timings[STAGE_PROMPT])
+
+
+def test_timings_keep_recent_samples():
+    """Test only the most recent samples are kept per stage."""
+    metrics = Metrics()
+
+    for sample in range(TIMING_WINDOW + 5):
+        metrics.record_timing(STAGE_PROMPT, sample)
+
+    assert len(metrics.timings[STAGE_PROMPT]) == TIMING_WINDOW
+    assert metrics.timings[STAGE_PROMPT][0] == 5
+
+
+def test_stage_percentiles():
+    """Test stage percentiles are reported in milliseconds."""
+    metrics = Metrics()
+
+    for sample in range(1, 101):
+        metrics.record_timing(STAGE_PROMPT, sample / 1000)
+
+    assert metrics.stage_percentiles() == {
+        STAGE_PROMPT: {"count": 100, "p50_ms": 50.0, "p90_ms": 90.0, "p99_ms": 99.0}
+    }
+
+
+def test_record_usage():
+    """Test token usage is added up, skipping missing details."""
+    metrics = Metrics()
+
+    metrics.record_usage(
+        SimpleNamespace(
+            prompt_tokens=100,
+            completion_tokens=20,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=80),
+        )
+    )
+    metrics.record_usage(
+        SimpleNamespace(
+            prompt_tokens=50, completion_tokens=5, prompt_tokens_details=None
+        )
+    )
+
+    assert metrics.as_dict() == {
+        PROMPT_TOKENS: 150,
+        COMPLETION_TOKENS: 25,
+        CACHED_TOKENS: 80,
+    }
+
+
+def test_tool_stats():
+    """Test tool calls are counted per tool."""
+    metrics = Metrics()
+
+    metrics.record_tool_call("HassTurnOn", 0.01, failed=False)
+    metrics.record_tool_call("HassTurnOn", 0.03, failed=True)
+
+    stats = metrics.tool_stats()["HassTurnOn"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["p99_ms"] == 30.0
+
+
+def test_cache_stats():
+    """Test the cache hit rate."""
+    stats = CacheStats()
+    assert stats.as_dict()["hit_rate"] is None
+
+    stats.miss()
+    stats.hit()
+    stats.hit()
+    stats.hit()
+
+    assert stats.as_dict() == {"hits": 3, "misses": 1, "size": 0, "hit_rate": 0.75}
@@ -1,15 +1,32 @@
 """Tests for the Custom Conversation prompt manager."""
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from homeassistant.helpers import entity_registry as er
 
+from custom_components.custom_conversation.metrics import (
+    PROMPTS_SUMMARIZED,
+    get_metrics,
+)
+from custom_components.custom_conversation import deadline
 from custom_components.custom_conversation.prompt_manager import (
-    PromptContext, PromptManager
+    LangfuseClient,
+    LangfusePromptError,
+    PromptContext,
+    PromptManager,
+    compile_chat_prompt,
+    encode_exposed_entities,
 )
 from custom_components.custom_conversation.const import (
     CONF_CUSTOM_PROMPTS_SECTION,
+    CONF_ENABLE_LANGFUSE,
+    CONF_ENTITY_ENCODING,
+    CONF_LANGFUSE_API_PROMPT_ID,
+    CONF_LANGFUSE_SECTION,
+    CONF_PERFORMANCE_SECTION,
+    CONF_PROMPT_TOKEN_LIMIT,
+    ENTITY_ENCODING_COMPACT,
     CONF_PROMPT_BASE,
     CONF_API_PROMPT_BASE,
     DEFAULT_BASE_PROMPT,
@@ -96,6 +113,164 @@ async def test_get_api_prompt_no_timers(prompt_manager, hass):
     assert "This device is not able to start timers" in prompt
 
 
+async def test_get_api_prompt_compact_entities(prompt_manager, hass, config_entry):
+    """Test the exposed entities can be listed in the compact encoding."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_PERFORMANCE_SECTION: {CONF_ENTITY_ENCODING: ENTITY_ENCODING_COMPACT},
+        },
+    )
+    context = PromptContext(
+        hass=hass,
+        ha_name="Test Home",
+        exposed_entities={
+            "light.ceiling": {"names": "Ceiling", "domain": "light", "areas": "Kitchen"},
+        },
+    )
+
+    prompt = await prompt_manager.get_api_prompt(context, config_entry)
+
+    assert "Kitchen:\n  light: Ceiling\n" in prompt
+    assert "names:" not in prompt
+
+
+def test_encode_exposed_entities_compact():
+    """Test the compact encoding groups entities by area and domain."""
+    entities = {
+        "light.ceiling": {
+            "names": "Ceiling, Main Light",
+            "domain": "light",
+            "areas": "Kitchen, Cook Room",
+        },
+        "light.strip": {"names": "Strip", "domain": "light", "areas": "Kitchen, Cook Room"},
+        "script.movie": {
+            "names": "Movie Night",
+            "domain": "script",
+            "description": "Dims the lights",
+        },
+        "sensor.outside": {
+            "names": "Outside",
+            "domain": "sensor",
+            "areas": "Kitchen, Cook Room",
+            "state": "12.5",
+            "attributes": {"unit_of_measurement": "°C"},
+        },
+    }
+
+    assert encode_exposed_entities(entities, ENTITY_ENCODING_COMPACT) == (
+        "Kitchen, Cook Room:\n"
+        "  light: Ceiling, Main Light; Strip\n"
+        "  sensor: Outside = 12.5 {unit_of_measurement: °C}\n"
+        "No area:\n"
+        "  script: Movie Night (Dims the lights)\n"
+    )
+
+
+async def test_get_api_prompt_over_token_limit(prompt_manager, hass, config_entry):
+    """Test entities are only summarized once the prompt passes the token limit."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_PERFORMANCE_SECTION: {CONF_PROMPT_TOKEN_LIMIT: 200},
+        },
+    )
+    context = PromptContext(
+        hass=hass,
+        ha_name="Test Home",
+        exposed_entities={
+            f"light.lamp_{i}": {
+                "names": f"Lamp {i}",
+                "domain": "light",
+                "areas": "Kitchen",
+            }
+            for i in range(50)
+        },
+    )
+
+    prompt = await prompt_manager.get_api_prompt(context, config_entry)
+
+    assert "Lamp 0" not in prompt
+    assert "Kitchen: 50 light" in prompt
+    assert "GetLiveContext" in prompt
+    assert get_metrics(hass, config_entry).as_dict() == {PROMPTS_SUMMARIZED: 1}
+
+
+async def test_get_langfuse_api_prompt_over_token_limit(
+    prompt_manager, hass, config_entry
+):
+    """Test the Langfuse prompt text counts toward the token limit."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_LANGFUSE_SECTION: {
+                CONF_ENABLE_LANGFUSE: True,
+                CONF_LANGFUSE_API_PROMPT_ID: "api",
+            },
+            CONF_PERFORMANCE_SECTION: {CONF_PROMPT_TOKEN_LIMIT: 200},
+        },
+    )
+    prompt_object = Mock()
+    prompt_object.compile.side_effect = lambda **variables: [
+        {"content": "Instructions " * 60 + f"\n{variables['exposed_entities']}"}
+    ]
+    langfuse_client = Mock()
+    langfuse_client.get_prompt = AsyncMock(
+        side_effect=lambda prompt_id, variables: (
+            prompt_object,
+            compile_chat_prompt(prompt_object, variables),
+        )
+    )
+    prompt_manager.set_langfuse_client(langfuse_client)
+    context = PromptContext(
+        hass=hass,
+        ha_name="Test Home",
+        exposed_entities={
+            f"light.lamp_{i}": {
+                "names": f"Lamp {i}",
+                "domain": "light",
+                "areas": "Kitchen",
+            }
+            for i in range(5)
+        },
+    )
+
+    result, prompt = await prompt_manager.get_api_prompt(context, config_entry)
+
+    assert result is prompt_object
+    assert prompt.startswith("Instructions ")
+    assert "Lamp 0" not in prompt
+    assert "Kitchen: 5 light" in prompt
+    assert get_metrics(hass, config_entry).as_dict() == {PROMPTS_SUMMARIZED: 1}
+
+
+async def test_langfuse_get_prompt_deadline(hass):
+    """Test a prompt fetch is only bounded by a turn deadline."""
+    client = Mock()
+    client.get_prompt.return_value.compile.return_value = [{"content": "Prompt"}]
+    langfuse_client = LangfuseClient(hass, client, {"api": "production"})
+
+    _, prompt = await langfuse_client.get_prompt("api", {})
+    assert prompt == "Prompt"
+    assert "fetch_timeout_seconds" not in client.get_prompt.call_args.kwargs
+
+    with patch.object(deadline.time, "monotonic", return_value=100.0):
+        with deadline.turn_deadline(2.5):
+            await langfuse_client.get_prompt("api", {})
+        assert client.get_prompt.call_args.kwargs["fetch_timeout_seconds"] == 3
+
+    client.get_prompt.reset_mock()
+    with (
+        patch.object(deadline.time, "monotonic", side_effect=[100.0, 200.0]),
+        deadline.turn_deadline(1),
+        pytest.raises(LangfusePromptError),
+    ):
+        await langfuse_client.get_prompt("api", {})
+    client.get_prompt.assert_not_called()
+
 
 def test_get_prompt_config_no_config_entry(prompt_manager):
     """Test getting prompt config with no config entry."""
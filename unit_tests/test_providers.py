@@ -2,30 +2,26 @@
 
 from unittest.mock import MagicMock, patch
 
+import aiohttp
 import pytest
 
 from custom_components.custom_conversation.providers import (
-    SUPPORTED_PROVIDERS,
+    MODEL_LIST_CACHE,
+    MODEL_LIST_CACHE_TTL,
+    CannotConnect,
     GeminiProvider,
+    InvalidAuth,
     LiteLLMProvider,
-    gemini,
     get_provider,
-    mistral,
-    openai,
-    openrouter,
+    get_supported_providers,
+    register_provider,
 )
 
 
-@pytest.fixture
-def mock_requests_get():
-    """Fixture to mock requests.get."""
-    with patch("requests.get") as mock_get:
-        yield mock_get
-
 @pytest.fixture
 def mock_provider_config_manager():
     """Fixture to mock ProviderConfigManager."""
-    with patch("custom_components.custom_conversation.providers.ProviderConfigManager") as mock_pcm:
+    with patch("litellm.utils.ProviderConfigManager") as mock_pcm:
         yield mock_pcm
 
 
@@ -53,7 +49,7 @@ class TestLiteLLMProvider:
         )
         assert provider.default_base_url == "http://manual.base.url"
 
-    def test_get_supported_models_success(self, mock_requests_get):
+    async def test_get_supported_models_success(self, hass, aioclient_mock):
         """Test successful retrieval of models."""
         provider = LiteLLMProvider(
             key="test",
@@ -61,20 +57,19 @@ class TestLiteLLMProvider:
             model_list_path="/models",
             manual_default_base_url="http://test.url"
         )
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": [{"id": "model1"}, {"id": "model2"}]}
-        mock_requests_get.return_value = mock_response
-
-        models = provider.get_supported_models(base_url=None, api_key="test_key")
-        assert models == ["model1", "model2"]
-        mock_requests_get.assert_called_once_with(
+        aioclient_mock.get(
             "http://test.url/models",
-            headers={"Authorization": "Bearer test_key"},
-            timeout=5,
+            json={"data": [{"id": "model1"}, {"id": "model2"}]},
         )
 
-    def test_get_supported_models_success_with_base_url(self, mock_requests_get):
+        models = await provider.async_get_supported_models(
+            hass, base_url=None, api_key="test_key"
+        )
+        assert models == ["model1", "model2"]
+        assert aioclient_mock.call_count == 1
+        assert aioclient_mock.mock_calls[0][3] == {"Authorization": "Bearer test_key"}
+
+    async def test_get_supported_models_success_with_base_url(self, hass, aioclient_mock):
         """Test successful retrieval with explicit base_url."""
         provider = LiteLLMProvider(
             key="test",
@@ -82,20 +77,76 @@ class TestLiteLLMProvider:
             model_list_path="/models",
             manual_default_base_url="http://default.url"
         )
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"data": [{"id": "model3"}]}
-        mock_requests_get.return_value = mock_response
+        aioclient_mock.get("http://custom.url/models", json={"data": [{"id": "model3"}]})
 
-        models = provider.get_supported_models(base_url="http://custom.url", api_key="test_key")
+        models = await provider.async_get_supported_models(
+            hass, base_url="http://custom.url", api_key="test_key"
+        )
         assert models == ["model3"]
-        mock_requests_get.assert_called_once_with(
-            "http://custom.url/models",
-            headers={"Authorization": "Bearer test_key"},
-            timeout=5,
+        assert aioclient_mock.call_count == 1
+
+    async def test_get_supported_models_paginated(self, hass, aioclient_mock):
+        """Test that has_more/last_id pagination is followed."""
+        provider = LiteLLMProvider(
+            key="test",
+            provider_name="Test",
+            model_list_path="/models",
+            manual_default_base_url="http://test.url"
+        )
+        aioclient_mock.get(
+            "http://test.url/models?after=model2",
+            json={"data": [{"id": "model3"}], "has_more": False},
         )
+        aioclient_mock.get(
+            "http://test.url/models",
+            json={"data": [{"id": "model1"}, {"id": "model2"}], "has_more": True, "last_id": "model2"},
+        )
+
+        models = await provider.async_get_supported_models(
+            hass, base_url=None, api_key="test_key"
+        )
+        assert models == ["model1", "model2", "model3"]
+        assert aioclient_mock.call_count == 2
 
-    def test_get_supported_models_api_error(self, mock_requests_get, caplog):
+    async def test_get_supported_models_cached(self, hass, aioclient_mock):
+        """Test that a model list is reused for the same provider, URL and key."""
+        provider = LiteLLMProvider(
+            key="test",
+            provider_name="Test",
+            model_list_path="/models",
+            manual_default_base_url="http://test.url"
+        )
+        aioclient_mock.get("http://test.url/models", json={"data": [{"id": "model1"}]})
+
+        first = await provider.async_get_supported_models(hass, base_url=None, api_key="key")
+        second = await provider.async_get_supported_models(hass, base_url=None, api_key="key")
+        assert first == second == ["model1"]
+        assert aioclient_mock.call_count == 1
+
+        # A different key must not be served from the cache
+        await provider.async_get_supported_models(hass, base_url=None, api_key="other")
+        assert aioclient_mock.call_count == 2
+
+    async def test_get_supported_models_cache_expires(self, hass, aioclient_mock):
+        """Test that a cached model list is refetched once the TTL has passed."""
+        provider = LiteLLMProvider(
+            key="test",
+            provider_name="Test",
+            model_list_path="/models",
+            manual_default_base_url="http://test.url"
+        )
+        aioclient_mock.get("http://test.url/models", json={"data": [{"id": "model1"}]})
+
+        with patch("custom_components.custom_conversation.providers.time.monotonic", return_value=1000):
+            await provider.async_get_supported_models(hass, base_url=None, api_key="key")
+        with patch(
+            "custom_components.custom_conversation.providers.time.monotonic",
+            return_value=1000 + MODEL_LIST_CACHE_TTL + 1,
+        ):
+            await provider.async_get_supported_models(hass, base_url=None, api_key="key")
+        assert aioclient_mock.call_count == 2
+
+    async def test_get_supported_models_api_error(self, hass, aioclient_mock, caplog):
         """Test handling of API errors."""
         provider = LiteLLMProvider(
             key="test",
@@ -103,16 +154,13 @@ class TestLiteLLMProvider:
             model_list_path="/models",
             manual_default_base_url="http://test.url"
         )
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.text = "Not Found"
-        mock_requests_get.return_value = mock_response
+        aioclient_mock.get("http://test.url/models", status=404, text="Not Found")
 
-        models = provider.get_supported_models(base_url=None, api_key="test_key")
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="test_key")
         assert models == []
         assert "Error fetching models: 404 - Not Found" in caplog.text
 
-    def test_get_supported_models_json_error(self, mock_requests_get, caplog):
+    async def test_get_supported_models_json_error(self, hass, aioclient_mock, caplog):
         """Test handling of JSON parsing errors."""
         provider = LiteLLMProvider(
             key="test",
@@ -120,21 +168,48 @@ class TestLiteLLMProvider:
             model_list_path="/models",
             manual_default_base_url="http://test.url"
         )
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_requests_get.return_value = mock_response
+        aioclient_mock.get("http://test.url/models", text="not json")
 
-        models = provider.get_supported_models(base_url=None, api_key="test_key")
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="test_key")
         assert models == []
         assert "Error parsing JSON response" in caplog.text
 
+    @pytest.mark.parametrize("status", [401, 403])
+    async def test_get_supported_models_invalid_auth(self, hass, aioclient_mock, status):
+        """Test a rejected API key raises InvalidAuth."""
+        provider = LiteLLMProvider(
+            key="test",
+            provider_name="Test",
+            model_list_path="/models",
+            manual_default_base_url="http://test.url"
+        )
+        aioclient_mock.get("http://test.url/models", status=status, text="Bad key")
+
+        with pytest.raises(InvalidAuth):
+            await provider.async_get_supported_models(hass, base_url=None, api_key="bad_key")
+        assert not hass.data.get(MODEL_LIST_CACHE)
+
+    @pytest.mark.parametrize("exc", [aiohttp.ClientError("boom"), TimeoutError()])
+    async def test_get_supported_models_connection_error(self, hass, aioclient_mock, exc):
+        """Test that connection errors raise CannotConnect and are not cached."""
+        provider = LiteLLMProvider(
+            key="test",
+            provider_name="Test",
+            model_list_path="/models",
+            manual_default_base_url="http://test.url"
+        )
+        aioclient_mock.get("http://test.url/models", exc=exc)
+
+        with pytest.raises(CannotConnect):
+            await provider.async_get_supported_models(hass, base_url=None, api_key="test_key")
+        assert not hass.data.get(MODEL_LIST_CACHE)
+
 
 
 class TestGeminiProvider:
     """Tests for the GeminiProvider class."""
 
-    @patch("custom_components.custom_conversation.providers.ProviderConfigManager")
+    @patch("litellm.utils.ProviderConfigManager")
     def test_init(self, mock_pcm):
         """Test GeminiProvider initialization."""
         mock_pcm.get_provider_model_info.return_value.get_api_base.return_value = "https://generativelanguage.googleapis.com"
@@ -145,63 +220,72 @@ class TestGeminiProvider:
         assert provider.supports_custom_base_url is False
         assert provider.default_base_url == "https://generativelanguage.googleapis.com"
 
-    def test_get_supported_models_success(self, mock_requests_get):
+    async def test_get_supported_models_success(self, hass, aioclient_mock):
         """Test successful retrieval of Gemini models."""
         provider = GeminiProvider()
         provider.default_base_url = "http://gemini.test"
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "models": [
-                {"name": "models/gemini-pro"},
-                {"name": "models/gemini-ultra"},
-                {"name": "models/other-model"},
-            ]
-        }
-        mock_requests_get.return_value = mock_response
-
-        models = provider.get_supported_models(base_url=None, api_key="gemini_key")
-        assert models == ["gemini-pro", "gemini-ultra", "other-model"]
-        mock_requests_get.assert_called_once_with(
+        aioclient_mock.get(
             "http://gemini.test/v1beta/models?key=gemini_key",
-            timeout=5,
+            json={
+                "models": [
+                    {"name": "models/gemini-pro"},
+                    {"name": "models/gemini-ultra"},
+                    {"name": "models/other-model"},
+                ]
+            },
         )
 
-    def test_get_supported_models_api_error(self, mock_requests_get, caplog):
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="gemini_key")
+        assert models == ["gemini-pro", "gemini-ultra", "other-model"]
+        assert aioclient_mock.call_count == 1
+
+    async def test_get_supported_models_paginated(self, hass, aioclient_mock):
+        """Test that Gemini's nextPageToken pagination is followed."""
+        provider = GeminiProvider()
+        provider.default_base_url = "http://gemini.test"
+
+        aioclient_mock.get(
+            "http://gemini.test/v1beta/models?pageToken=page2",
+            json={"models": [{"name": "models/gemini-ultra"}]},
+        )
+        aioclient_mock.get(
+            "http://gemini.test/v1beta/models",
+            json={"models": [{"name": "models/gemini-pro"}], "nextPageToken": "page2"},
+        )
+
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="gemini_key")
+        assert models == ["gemini-pro", "gemini-ultra"]
+        assert aioclient_mock.call_count == 2
+
+    async def test_get_supported_models_api_error(self, hass, aioclient_mock, caplog):
         """Test handling of API errors for Gemini."""
         provider = GeminiProvider()
         provider.default_base_url = "http://gemini.test"
 
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Server Error"
-        mock_requests_get.return_value = mock_response
+        aioclient_mock.get("http://gemini.test/v1beta/models", status=500, text="Server Error")
 
-        models = provider.get_supported_models(base_url=None, api_key="gemini_key")
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="gemini_key")
         assert models == []
         assert "Error fetching models: 500 - Server Error" in caplog.text
 
-    def test_get_supported_models_json_error(self, mock_requests_get, caplog):
+    async def test_get_supported_models_json_error(self, hass, aioclient_mock, caplog):
         """Test handling of JSON parsing errors for Gemini."""
         provider = GeminiProvider()
         provider.default_base_url = "http://gemini.test"
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = ValueError("Bad JSON")
-        mock_requests_get.return_value = mock_response
+        aioclient_mock.get("http://gemini.test/v1beta/models", text="Bad JSON")
 
-        models = provider.get_supported_models(base_url=None, api_key="gemini_key")
+        models = await provider.async_get_supported_models(hass, base_url=None, api_key="gemini_key")
         assert models == []
         assert "Error parsing JSON response" in caplog.text
 
 
 def test_get_provider_exists():
-    """Test retrieving an existing provider."""
-    assert get_provider("openai") is openai
-    assert get_provider("gemini") is gemini
-    assert get_provider("openrouter") is openrouter
+    """Test retrieving an existing provider returns the same instance each time."""
+    assert get_provider("openai") is get_provider("openai")
+    assert isinstance(get_provider("gemini"), GeminiProvider)
+    assert get_provider("openrouter").key == "openrouter"
 
 def test_get_provider_not_exists():
     """Test retrieving a non-existent provider."""
@@ -209,7 +293,10 @@ def test_get_provider_not_exists():
 
 
 def test_provider_instances():
-    """Test basic attributes of the global provider instances."""
+    """Test basic attributes of the built-in providers."""
+    openai = get_provider("openai")
+    gemini = get_provider("gemini")
+    openrouter = get_provider("openrouter")
     assert openai.key == "openai"
     assert openai.provider_name == "OpenAI"
     assert openai.supports_custom_base_url is True
@@ -224,7 +311,33 @@ def test_provider_instances():
     assert openrouter.default_base_url == "https://openrouter.ai/api/v1"
 
 def test_supported_providers_list():
-    """Check if the SUPPORTED_PROVIDERS list contains the expected instances."""
-    expected_providers = [openai, gemini, openrouter, mistral]
-    assert expected_providers == SUPPORTED_PROVIDERS
+    """Check the built-in providers are offered in order."""
+    assert [provider.key for provider in get_supported_providers()] == [
+        "openai",
+        "gemini",
+        "openrouter",
+        "mistral",
+    ]
+
+
+def test_register_provider():
+    """Test a registered provider is only built when first asked for."""
+    provider = LiteLLMProvider(key="custom", provider_name="Custom")
+    factory = MagicMock(return_value=provider)
+    with (
+        patch.dict(
+            "custom_components.custom_conversation.providers._PROVIDER_FACTORIES"
+        ),
+        patch.dict("custom_components.custom_conversation.providers._PROVIDERS"),
+    ):
+        register_provider("custom", factory)
+        factory.assert_not_called()
+
+        assert get_provider("custom") is provider
+        assert get_provider("custom") is provider
+        assert get_supported_providers()[-1] is provider
+        factory.assert_called_once()
+
+        with pytest.raises(ValueError, match="already registered"):
+            register_provider("custom", factory)
 
@@ -0,0 +1,68 @@
+"""Tests for the Custom Conversation stream recorder."""
+
+import json
+from pathlib import Path
+import time
+from unittest.mock import MagicMock, patch
+
+from custom_components.custom_conversation.recorder import (
+    RECORDINGS_DIR,
+    async_record_stream,
+    recording_path,
+)
+from homeassistant.core import HomeAssistant
+
+
+def _chunk(content: str) -> MagicMock:
+    """Return a chunk that dumps to a minimal OpenAI chunk."""
+    chunk = MagicMock()
+    chunk.model_dump.return_value = {
+        "choices": [{"index": 0, "delta": {"content": content}}]
+    }
+    return chunk
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_record_stream(hass: HomeAssistant) -> None:
+    """Test chunks are passed through and written with their delays."""
+    chunks = [_chunk("Hello"), _chunk(" world")]
+    path = recording_path(hass, "conversation-1")
+
+    received = [
+        chunk
+        async for chunk in async_record_stream(
+            hass, _stream(*chunks), path, time.perf_counter() - 0.5
+        )
+    ]
+    await hass.async_block_till_done()
+
+    assert received == chunks
+    assert path.parent == Path(hass.config.path(RECORDINGS_DIR))
+    assert path.name.endswith("_conversation_1.jsonl")
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["chunk"]["choices"][0]["delta"]["content"] for r in records] == [
+        "Hello",
+        " world",
+    ]
+    # The first delay includes the time before the stream started
+    assert records[0]["delay"] >= 0.5
+    assert records[1]["delay"] < 0.5
+
+
+async def test_record_stream_keeps_latest(hass: HomeAssistant) -> None:
+    """Test only the most recent recordings are kept."""
+    paths = [recording_path(hass, f"conversation-{n}") for n in range(3)]
+
+    with patch("custom_components.custom_conversation.recorder.MAX_RECORDINGS", 2):
+        for path in paths:
+            async for _ in async_record_stream(
+                hass, _stream(_chunk("Hi")), path, time.perf_counter()
+            ):
+                pass
+            await hass.async_block_till_done()
+
+    assert sorted(Path(hass.config.path(RECORDINGS_DIR)).glob("*.jsonl")) == paths[1:]
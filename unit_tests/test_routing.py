@@ -0,0 +1,268 @@
+"""Tests for the Custom Conversation routing."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.const import (
+    CONF_FIRST_TOKEN_TIMEOUT,
+    CONF_HEDGE_DELAY,
+    CONF_HEDGE_TARGET,
+    CONF_PERFORMANCE_SECTION,
+    CONF_ROUTING_MODE,
+    CONF_SECONDARY_API_KEY,
+    CONF_SECONDARY_CHAT_MODEL,
+    CONF_SECONDARY_PROVIDER,
+    CONF_SECONDARY_PROVIDER_ENABLED,
+    DOMAIN,
+    HEDGE_TARGET_SAME,
+    ROUTING_MODE_LATENCY,
+)
+from custom_components.custom_conversation.metrics import (
+    FALLBACKS,
+    HEDGES_FIRED,
+    HEDGES_WON,
+    get_metrics,
+)
+from custom_components.custom_conversation.routing import (
+    COOLDOWN_CONSECUTIVE_FAILURES,
+    DeploymentHealth,
+    async_stream_completion,
+    get_deployments,
+    get_health,
+    get_router,
+)
+from homeassistant.core import HomeAssistant
+
+PRIMARY = "openai/gpt-4o-mini"
+SECONDARY = "gemini/gemini-2.0-flash"
+
+
+@pytest.fixture
+def secondary_entry(hass: HomeAssistant, config_entry: MockConfigEntry) -> MockConfigEntry:
+    """Add a secondary provider to the config entry."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        data={
+            **config_entry.data,
+            CONF_SECONDARY_PROVIDER_ENABLED: True,
+            CONF_SECONDARY_PROVIDER: "gemini",
+            CONF_SECONDARY_API_KEY: "gemini-key",
+            CONF_SECONDARY_CHAT_MODEL: "gemini-2.0-flash",
+        },
+    )
+    return config_entry
+
+
+def _stream(*chunks):
+    """Return an async iterator over chunks."""
+
+    async def _gen():
+        for chunk in chunks:
+            yield chunk
+
+    return _gen()
+
+
+def _mock_router(hass: HomeAssistant, entry: MockConfigEntry, **responses) -> MagicMock:
+    """Install a router whose acompletion answers per model."""
+
+    async def _acompletion(model, **kwargs):
+        response = responses[model]
+        if isinstance(response, Exception):
+            raise response
+        return _stream(*response)
+
+    router = MagicMock(acompletion=AsyncMock(side_effect=_acompletion))
+    hass.data[DOMAIN].setdefault(entry.entry_id, {})["router"] = router
+    return router
+
+
+def test_get_deployments(secondary_entry: MockConfigEntry) -> None:
+    """Test deployments are returned primary first."""
+    deployments = get_deployments(secondary_entry)
+
+    assert [d.model_name for d in deployments] == [PRIMARY, SECONDARY]
+    assert deployments[0].api_base == "https://api.openai.com/v1"
+    assert deployments[1].api_base is None
+
+
+async def test_get_router_is_cached(
+    hass: HomeAssistant, secondary_entry: MockConfigEntry
+) -> None:
+    """Test the router is built once per entry with every deployment."""
+    with patch("litellm.Router") as mock_router:
+        first = get_router(hass, secondary_entry)
+        second = get_router(hass, secondary_entry)
+
+    assert first is second
+    mock_router.assert_called_once()
+    assert [
+        model["model_name"] for model in mock_router.call_args.kwargs["model_list"]
+    ] == [PRIMARY, SECONDARY]
+
+
+def test_deployment_health_cooldown() -> None:
+    """Test repeated failures put a deployment in cooldown."""
+    health = DeploymentHealth()
+    health.record_success(0.5)
+    health.record_success(1.5)
+    assert health.ttft == 1.0
+
+    for _ in range(COOLDOWN_CONSECUTIVE_FAILURES):
+        assert not health.in_cooldown(100)
+        health.record_failure(Exception("boom"), 100)
+
+    assert health.in_cooldown(100)
+    assert health.as_dict(100)["last_error"] == "Exception('boom')"
+    assert health.error_rate == 0.6
+
+
+async def test_stream_completion_falls_back(
+    hass: HomeAssistant, secondary_entry: MockConfigEntry
+) -> None:
+    """Test the secondary deployment is used when the primary fails."""
+    router = _mock_router(
+        hass,
+        secondary_entry,
+        **{PRIMARY: Exception("down"), SECONDARY: ["a", "b"]},
+    )
+
+    stream = await async_stream_completion(hass, secondary_entry, {"stream": True})
+
+    assert [chunk async for chunk in stream] == ["a", "b"]
+    assert [call.kwargs["model"] for call in router.acompletion.call_args_list] == [
+        PRIMARY,
+        SECONDARY,
+    ]
+    status = get_health(hass, secondary_entry).as_dict()
+    assert status[PRIMARY]["error_rate"] == 1.0
+    assert status[PRIMARY]["failures"] == 1
+    assert status[SECONDARY]["requests"] == 1
+    assert status[SECONDARY]["successes"] == 1
+    assert get_metrics(hass, secondary_entry).as_dict() == {FALLBACKS: 1}
+
+
+async def test_stream_completion_raises_last_error(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the error is raised when every deployment fails."""
+    _mock_router(hass, config_entry, **{PRIMARY: ValueError("down")})
+
+    with pytest.raises(ValueError, match="down"):
+        await async_stream_completion(hass, config_entry, {"stream": True})
+
+
+async def test_latency_mode_prefers_faster_deployment(
+    hass: HomeAssistant, secondary_entry: MockConfigEntry
+) -> None:
+    """Test latency routing sends requests to the faster healthy deployment."""
+    hass.config_entries.async_update_entry(
+        secondary_entry,
+        options={
+            **secondary_entry.options,
+            CONF_PERFORMANCE_SECTION: {CONF_ROUTING_MODE: ROUTING_MODE_LATENCY},
+        },
+    )
+    router = _mock_router(hass, secondary_entry, **{PRIMARY: ["p"], SECONDARY: ["s"]})
+    deployments = get_deployments(secondary_entry)
+    health = get_health(hass, secondary_entry)
+    health.get(deployments[0]).record_success(3.0)
+    health.get(deployments[1]).record_success(0.5)
+
+    stream = await async_stream_completion(hass, secondary_entry, {"stream": True})
+
+    assert [chunk async for chunk in stream] == ["s"]
+    assert router.acompletion.call_args.kwargs["model"] == SECONDARY
+
+
+class _StalledStream:
+    """A stream that never produces a chunk."""
+
+    def __init__(self) -> None:
+        """Initialize the stream."""
+        self.aclose = AsyncMock()
+
+    def __aiter__(self):
+        """Return the stream itself."""
+        return self
+
+    async def __anext__(self):
+        """Wait forever."""
+        await asyncio.Event().wait()
+
+
+async def test_first_token_timeout_closes_stream(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a stream with no first chunk in time is closed and counts as failed."""
+    _set_performance(hass, config_entry, **{CONF_FIRST_TOKEN_TIMEOUT: 0.01})
+    stalled = _StalledStream()
+    router = MagicMock(acompletion=AsyncMock(return_value=stalled))
+    hass.data[DOMAIN].setdefault(config_entry.entry_id, {})["router"] = router
+
+    with pytest.raises(TimeoutError):
+        await async_stream_completion(hass, config_entry, {"stream": True})
+
+    stalled.aclose.assert_awaited_once()
+    assert get_health(hass, config_entry).as_dict()[PRIMARY]["failures"] == 1
+
+
+def _set_performance(hass: HomeAssistant, entry: MockConfigEntry, **options) -> None:
+    """Update the performance options of an entry."""
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_PERFORMANCE_SECTION: options}
+    )
+
+
+async def test_hedge_wins_when_primary_stalls(
+    hass: HomeAssistant, secondary_entry: MockConfigEntry
+) -> None:
+    """Test a hedge is sent to the secondary and wins when the primary stalls."""
+    _set_performance(hass, secondary_entry, **{CONF_HEDGE_DELAY: 10})
+    stalled = asyncio.Event()
+    closed = MagicMock()
+
+    async def _stalled_stream():
+        try:
+            await stalled.wait()
+            yield "late"
+        finally:
+            closed()
+
+    async def _acompletion(model, **kwargs):
+        if model == PRIMARY:
+            return _stalled_stream()
+        return _stream("fast")
+
+    router = MagicMock(acompletion=AsyncMock(side_effect=_acompletion))
+    hass.data[DOMAIN].setdefault(secondary_entry.entry_id, {})["router"] = router
+
+    stream = await async_stream_completion(hass, secondary_entry, {"stream": True})
+
+    assert [chunk async for chunk in stream] == ["fast"]
+    closed.assert_called_once()
+    assert get_metrics(hass, secondary_entry).as_dict() == {
+        HEDGES_FIRED: 1,
+        HEDGES_WON: 1,
+    }
+
+
+async def test_hedge_not_fired_for_fast_primary(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test no hedge is sent when the first chunk arrives before the delay."""
+    _set_performance(
+        hass,
+        config_entry,
+        **{CONF_HEDGE_DELAY: 1000, CONF_HEDGE_TARGET: HEDGE_TARGET_SAME},
+    )
+    router = _mock_router(hass, config_entry, **{PRIMARY: ["a"]})
+
+    stream = await async_stream_completion(hass, config_entry, {"stream": True})
+
+    assert [chunk async for chunk in stream] == ["a"]
+    router.acompletion.assert_awaited_once()
+    assert get_metrics(hass, config_entry).as_dict() == {}
@@ -0,0 +1,81 @@
+"""Tests for the Custom Conversation sensors."""
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.custom_conversation.const import DOMAIN
+from custom_components.custom_conversation.metrics import (
+    PROMPT_TOKENS,
+    SIGNAL_METRICS_UPDATED,
+    STAGE_TURN,
+    get_metrics,
+)
+from custom_components.custom_conversation.sensor import LATENCY_SENSORS, LatencySensor
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+
+async def test_daily_total_sensor(
+    hass: HomeAssistant, config_entry: MockConfigEntry, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a daily total counts from midnight and carries over reloads."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{config_entry.entry_id}_{PROMPT_TOKENS}"
+    )
+    signal = SIGNAL_METRICS_UPDATED.format(config_entry.entry_id)
+
+    get_metrics(hass, config_entry).increment(PROMPT_TOKENS, 100)
+    async_dispatcher_send(hass, signal)
+    assert hass.states.get(entity_id).state == "100"
+
+    await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "100"
+
+    get_metrics(hass, config_entry).increment(PROMPT_TOKENS, 25)
+    async_dispatcher_send(hass, signal)
+    assert hass.states.get(entity_id).state == "125"
+
+    midnight = dt_util.start_of_local_day() + timedelta(days=1)
+    freezer.move_to(midnight)
+    async_fire_time_changed(hass, midnight)
+    await hass.async_block_till_done()
+    state = hass.states.get(entity_id)
+    assert state.state == "0"
+    assert state.attributes["last_reset"] == midnight.isoformat()
+
+    get_metrics(hass, config_entry).increment(PROMPT_TOKENS, 10)
+    async_dispatcher_send(hass, signal)
+    assert hass.states.get(entity_id).state == "10"
+
+
+async def test_latency_sensor(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test a latency sensor reports the median and higher percentiles."""
+    description = next(d for d in LATENCY_SENSORS if d.stage == STAGE_TURN)
+    sensor = LatencySensor(config_entry, description)
+    sensor.hass = hass
+    assert sensor.native_value is None
+    assert sensor.extra_state_attributes is None
+
+    metrics = get_metrics(hass, config_entry)
+    for seconds in (0.1, 0.2, 0.3, 0.4, 1.0):
+        metrics.record_timing(STAGE_TURN, seconds)
+
+    assert sensor.native_value == 300.0
+    assert sensor.extra_state_attributes == {
+        "samples": 5,
+        "p90": 1000.0,
+        "p99": 1000.0,
+    }
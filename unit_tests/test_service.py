@@ -0,0 +1,210 @@
+"""Tests for the Custom Conversation services."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.custom_conversation.const import (
+    CONF_AGENTS_SECTION,
+    CONF_ENABLE_LLM_AGENT,
+    DOMAIN,
+    IMAGE_GENERATION_CONCURRENCY,
+    SERVICE_GENERATE_IMAGE,
+    SERVICE_PROCESS_BATCH,
+    SERVICE_SUBMIT_BATCH_JOB,
+)
+from custom_components.custom_conversation.service import async_setup_services
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+
+
+def _image_response(prompt: str) -> MagicMock:
+    """Return an image generation response for a prompt."""
+    image = MagicMock()
+    image.model_dump.return_value = {"url": f"https://example.com/{prompt}.png"}
+    return MagicMock(data=[image])
+
+
+async def test_generate_image_renders_concurrently(
+    hass: HomeAssistant, config_entry
+) -> None:
+    """Test every image is rendered, no more than a few at a time."""
+    await async_setup_services(hass)
+    running = 0
+    most_running = 0
+
+    async def fake_aimage_generation(**kwargs):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return _image_response(kwargs["prompt"])
+
+    with patch(
+        "litellm.aimage_generation",
+        side_effect=fake_aimage_generation,
+    ) as mock_generate:
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GENERATE_IMAGE,
+            {
+                "config_entry": config_entry.entry_id,
+                "prompt": ["dog", "cat"],
+                "n": 2,
+                "model": "gpt-image-1",
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    assert mock_generate.call_count == 4
+    assert most_running == IMAGE_GENERATION_CONCURRENCY
+    call_kwargs = mock_generate.call_args.kwargs
+    assert call_kwargs["model"] == "gpt-image-1"
+    assert call_kwargs["api_key"] == "test-api-key"
+    assert call_kwargs["n"] == 1
+    assert "quality" not in call_kwargs
+    assert "style" not in call_kwargs
+    assert response["url"] == "https://example.com/dog.png"
+    assert [image["url"] for image in response["images"]] == [
+        "https://example.com/dog.png",
+        "https://example.com/dog.png",
+        "https://example.com/cat.png",
+        "https://example.com/cat.png",
+    ]
+
+
+async def test_generate_image_keeps_rendered_images(
+    hass: HomeAssistant, config_entry
+) -> None:
+    """Test an image that fails is reported without losing the others."""
+    await async_setup_services(hass)
+
+    async def fake_aimage_generation(**kwargs):
+        if kwargs["prompt"] == "dog":
+            raise ValueError("content policy")
+        return _image_response(kwargs["prompt"])
+
+    with patch(
+        "litellm.aimage_generation",
+        side_effect=fake_aimage_generation,
+    ) as mock_generate:
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GENERATE_IMAGE,
+            {
+                "config_entry": config_entry.entry_id,
+                "prompt": ["dog", "cat"],
+                "quality": "hd",
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    assert mock_generate.call_args.kwargs["quality"] == "hd"
+    assert response["url"] == "https://example.com/cat.png"
+    assert response["images"] == [
+        {"prompt": "dog", "error": "content policy"},
+        {"url": "https://example.com/cat.png"},
+    ]
+
+
+async def test_generate_image_timeout(hass: HomeAssistant, config_entry) -> None:
+    """Test a render that takes too long fails the action."""
+    await async_setup_services(hass)
+
+    with (
+        patch(
+            "litellm.aimage_generation",
+            side_effect=TimeoutError,
+        ),
+        pytest.raises(HomeAssistantError, match="timed out"),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GENERATE_IMAGE,
+            {"config_entry": config_entry.entry_id, "prompt": "dog"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_process_batch(hass: HomeAssistant, config_entry) -> None:
+    """Test a batch is handed to the agent with each prompt's context filled in."""
+    await async_setup_services(hass)
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_AGENTS_SECTION: {CONF_ENABLE_LLM_AGENT: True},
+        },
+    )
+    agent = MagicMock()
+    agent.async_process_batch = AsyncMock(return_value=[{"response": "Hi"}] * 2)
+    hass.data[DOMAIN].setdefault(config_entry.entry_id, {})["agent"] = agent
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PROCESS_BATCH,
+        {
+            "config_entry": config_entry.entry_id,
+            "prompts": ["Good morning", {"text": "Hello", "device_id": "bedroom"}],
+            "device_id": "kitchen",
+            "language": "en",
+            "max_parallel": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"results": [{"response": "Hi"}] * 2}
+    items, max_parallel = agent.async_process_batch.call_args.args
+    assert max_parallel == 2
+    assert [(item["text"], item["device_id"], item["language"]) for item in items] == [
+        ("Good morning", "kitchen", "en"),
+        ("Hello", "bedroom", "en"),
+    ]
+
+
+async def test_process_batch_requires_llm_agent(
+    hass: HomeAssistant, config_entry
+) -> None:
+    """Test a batch is refused when the entry's LLM agent is disabled."""
+    await async_setup_services(hass)
+
+    with pytest.raises(HomeAssistantError, match="LLM agent is not enabled"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROCESS_BATCH,
+            {"config_entry": config_entry.entry_id, "prompts": ["Good morning"]},
+            blocking=True,
+            return_response=True,
+        )
+
+
+async def test_submit_batch_job_duplicate_ids(
+    hass: HomeAssistant, config_entry
+) -> None:
+    """Test a batch whose prompt ids clash is refused before it is sent."""
+    await async_setup_services(hass)
+
+    with (
+        patch(
+            "custom_components.custom_conversation.service.get_batch_client"
+        ) as mock_get_client,
+        pytest.raises(ServiceValidationError),
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SUBMIT_BATCH_JOB,
+            {
+                "config_entry": config_entry.entry_id,
+                "prompts": ["Good morning", {"id": "0", "text": "Good evening"}],
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    mock_get_client.assert_not_called()
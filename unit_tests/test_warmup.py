@@ -0,0 +1,56 @@
+"""Tests for the Custom Conversation warm-up."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.custom_conversation.const import (
+    CONF_PERFORMANCE_SECTION,
+    CONF_PREWARM_COMPLETION,
+)
+from custom_components.custom_conversation.warmup import async_warm_up
+from homeassistant.core import HomeAssistant
+
+
+async def test_warm_up_resolves_hosts(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test warm-up resolves provider hosts and skips the completion by default."""
+    router = MagicMock(acompletion=AsyncMock())
+    with (
+        patch(
+            "custom_components.custom_conversation.warmup.get_router",
+            return_value=router,
+        ),
+        patch.object(hass.loop, "getaddrinfo", AsyncMock()) as mock_resolve,
+    ):
+        await async_warm_up(hass, config_entry)
+
+    assert mock_resolve.call_args.args[0] == "api.openai.com"
+    router.acompletion.assert_not_called()
+
+
+async def test_warm_up_completion(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the optional warm-up completion and that failures are swallowed."""
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={
+            **config_entry.options,
+            CONF_PERFORMANCE_SECTION: {CONF_PREWARM_COMPLETION: True},
+        },
+    )
+    router = MagicMock(acompletion=AsyncMock(side_effect=Exception("boom")))
+    with (
+        patch(
+            "custom_components.custom_conversation.warmup.get_router",
+            return_value=router,
+        ),
+        patch.object(hass.loop, "getaddrinfo", AsyncMock(side_effect=OSError)),
+    ):
+        await async_warm_up(hass, config_entry)
+
+    router.acompletion.assert_awaited_once()
+    assert router.acompletion.call_args.kwargs["max_tokens"] == 1
+    assert router.acompletion.call_args.kwargs["model"] == "openai/gpt-4o-mini"